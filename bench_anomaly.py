@@ -0,0 +1,78 @@
+"""
+Per-tick cost of the streaming anomaly stage.
+
+Scores a synthetic sensor stream (with an injected overheating + vibration
+spike every 500 ticks) through each detector and reports microseconds per tick
+and traced memory at increasing stream lengths: both should stay flat.
+Run: python bench_anomaly.py [ticks]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.perception.anomaly import DETECTORS, AnomalyStage, create_anomaly_detector
+from src.schema import PerceptionState
+
+CHECKPOINTS = (1_000, 10_000, 50_000)
+SPIKE_EVERY = 500
+
+
+def _stream(n, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now()
+    for i in range(n):
+        sensors = {"temperature": rng.uniform(20, 35), "vibration": rng.uniform(0, 1), "proximity": rng.uniform(2, 50)}
+        spike = i % SPIKE_EVERY == SPIKE_EVERY - 1
+        if spike:
+            sensors["temperature"], sensors["vibration"] = 45.0, 1.8
+        yield spike, PerceptionState(timestamp=now, entities=[], sensor_data=sensors)
+
+
+def _checkpoints(n):
+    return [c for c in CHECKPOINTS if c < n] + [n]
+
+
+def bench_time(name, n):
+    """(ticks, us/tick over the stretch since the previous checkpoint), spikes caught, flag rate."""
+    stage = AnomalyStage(create_anomaly_detector(name))
+    frames = list(_stream(n)) # built up front so only scoring is timed
+    marks = set(_checkpoints(n))
+    rows, caught = [], 0
+    last_t = time.perf_counter()
+    last_i = 0
+    for i, (spike, frame) in enumerate(frames, 1):
+        stage.process(frame)
+        caught += spike and frame.anomalies_detected
+        if i in marks:
+            now = time.perf_counter()
+            rows.append((i, (now - last_t) / (i - last_i) * 1e6))
+            last_t, last_i = now, i
+    return rows, caught, stage.stats()["rate"]
+
+
+def bench_memory(name, n):
+    """(ticks, KiB allocated by the stage and still alive) at each checkpoint."""
+    tracemalloc.start()
+    stage = AnomalyStage(create_anomaly_detector(name))
+    marks = set(_checkpoints(n))
+    rows = []
+    for i, (_, frame) in enumerate(_stream(n), 1):
+        stage.process(frame)
+        del frame
+        if i in marks:
+            rows.append((i, tracemalloc.get_traced_memory()[0] / 1024))
+    tracemalloc.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else CHECKPOINTS[-1]
+    for name in DETECTORS:
+        times, caught, rate = bench_time(name, n)
+        memory = dict(bench_memory(name, n))
+        print(f"{name}:")
+        for i, us in times:
+            print(f"  up to {i:>7} ticks: {us:7.1f} us/tick, {memory[i]:8.1f} KiB live")
+        print(f"  spikes caught {caught}/{n // SPIKE_EVERY}, flag rate {rate:.4f}")
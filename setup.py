@@ -16,6 +16,7 @@ setup(
         "uvicorn",
         "pydantic",
         "numpy",
+        "scipy",
         "pandas",
         "opencv-python",
         "torch",
@@ -27,6 +28,15 @@ setup(
         "ultralytics",
         "pyttsx3"
     ],
+    extras_require={
+        "export": ["pyarrow"],
+        "onnx": ["onnx", "onnxruntime"],
+    },
+    entry_points={
+        "console_scripts": [
+            "ra3-export-history=src.database.export:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import traceback
+from typing import Any, Set
+from .serializer import EncodedState
+
+
+class TelemetryHub:
+    """
+    Fan-out of control-loop states to WebSocket clients.
+
+    Every subscriber gets its own bounded queue. When a slow client's queue is
+    full the oldest state is dropped, so one stalled dashboard never blocks the
+    control loop or the other viewers.
+    """
+
+    def __init__(self, queue_size: int = 4):
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.dropped = 0
+        self.latest = None
+
+    def subscribe(self) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.queue_size)
+        if self.latest is not None:
+            q.put_nowait(self.latest)
+        self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self.subscribers.discard(q)
+
+    def publish(self, item: Any):
+        self.latest = item
+        for q in self.subscribers:
+            if q.full():
+                q.get_nowait() # Drop oldest
+                self.dropped += 1
+            q.put_nowait(item)
+
+
+class ControlLoop:
+    """Runs agent.run_step() at a fixed rate, independent of how many clients are connected."""
+
+    def __init__(self, agent, hub: TelemetryHub, rate_hz: float = 2.0):
+        self.agent = agent
+        self.hub = hub
+        self.period = 1.0 / rate_hz
+        self.task = None
+        self.ticks = 0
+        self.overruns = 0
+        self.last_step_ms = 0.0
+
+    def start(self):
+        self.agent.running = True
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.agent.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self.agent.running:
+            started = time.perf_counter()
+            try:
+                state = await self.agent.run_step()
+                # Encoded lazily, once per tick, however many clients read it
+                self.hub.publish(EncodedState(state))
+            except Exception as e:
+                print(f"[ERROR] Control Loop Error: {e}")
+                traceback.print_exc()
+            self.last_step_ms = (time.perf_counter() - started) * 1000
+            self.ticks += 1
+
+            deadline += self.period
+            delay = deadline - loop.time()
+            if delay < 0:
+                # Missed the deadline: skip the lost ticks instead of bursting to catch up
+                self.overruns += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "rate_hz": 1.0 / self.period,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "last_step_ms": round(self.last_step_ms, 3),
+            "clients": len(self.hub.subscribers),
+            "dropped_frames": self.hub.dropped,
+        }
@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class EncodedState:
+    """
+    A published state with its JSON encoding computed once and shared by every
+    client. model_dump_json() runs Pydantic's Rust serializer over the model
+    (datetimes included), so no intermediate dict walk is needed for full frames.
+    """
+
+    __slots__ = ("state", "_json", "_data")
+
+    def __init__(self, state: BaseModel):
+        self.state = state
+        self._json: Optional[bytes] = None
+        self._data: Optional[Dict[str, Any]] = None
+
+    def json(self) -> bytes:
+        if self._json is None:
+            self._json = self.state.model_dump_json().encode("utf-8")
+        return self._json
+
+    def data(self) -> Dict[str, Any]:
+        """JSON-compatible dict (parsed back from the shared encoding), used for deltas."""
+        if self._data is None:
+            self._data = loads(self.json())
+        return self._data
+
+
+_MISSING = object()
+
+
+def merge_patch(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """RFC 7386 merge patch turning `old` into `new` (lists are replaced whole, null deletes a key)."""
+    patch = {}
+    for key, value in new.items():
+        prev = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(prev, dict):
+            sub = merge_patch(prev, value)
+            if sub:
+                patch[key] = sub
+        elif prev != value:
+            patch[key] = value
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch
+
+
+def _has_null(patch: Dict[str, Any]) -> bool:
+    return any(v is None or (isinstance(v, dict) and _has_null(v)) for v in patch.values())
+
+
+class DeltaEncoder:
+    """
+    Per-client delta framing. Sends a keyframe with the whole state first and
+    then every `keyframe_interval` frames; in between only a merge patch of the
+    fields that changed since this client's previous frame is sent. A patch
+    containing null would make clients delete the key (RFC 7386), which is
+    wrong for a field that merely became None, so such frames go out as
+    keyframes instead.
+
+    Frames: {"type": "keyframe", "seq": n, "state": {...}}
+            {"type": "delta", "seq": n, "patch": {...}}
+    """
+
+    def __init__(self, keyframe_interval: int = 20):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def encode(self, frame: EncodedState) -> bytes:
+        data = frame.data()
+        patch = None
+        if self.last is not None and self.seq % self.keyframe_interval != 0:
+            patch = merge_patch(self.last, data)
+            if _has_null(patch):
+                patch = None
+        if patch is None:
+            body = b'{"type":"keyframe","seq":%d,"state":' % self.seq + frame.json() + b"}"
+        else:
+            body = dumps({"type": "delta", "seq": self.seq, "patch": patch})
+        self.last = data
+        self.seq += 1
+        return body
@@ -1,14 +1,31 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import asyncio
-import json
 import os
 import traceback
-from datetime import datetime
+from typing import Optional
+from contextlib import asynccontextmanager
 from ..main import RA3Agent
+from .broadcast import ControlLoop, TelemetryHub
+from .serializer import DeltaEncoder
+from ..database.history import parse_utc
 
-app = FastAPI(title="RA3 Advisor API")
+mode = os.getenv("RA3_MODE", "sim").strip().lower()
+print(f"[SYSTEM] Starting RA3 in {mode.upper()} mode...")
+agent = RA3Agent(mode=mode)
+
+# One control loop drives the agent; WebSocket clients only subscribe to its output
+hub = TelemetryHub(queue_size=int(os.getenv("RA3_CLIENT_QUEUE", "4")))
+control = ControlLoop(agent, hub, rate_hz=float(os.getenv("RA3_CONTROL_HZ", "2.0")))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    control.start()
+    yield
+    await control.stop()
+    agent.shutdown()
+
+app = FastAPI(title="RA3 Advisor API", lifespan=lifespan)
 
 # Enable CORS for the dashboard
 app.add_middleware(
@@ -19,13 +36,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-mode = os.getenv("RA3_MODE", "sim").strip().lower()
-print(f"[SYSTEM] Starting RA3 in {mode.upper()} mode...")
-agent = RA3Agent(mode=mode)
-
 @app.get("/")
 async def root():
-    return {"status": "RA3 API is running", "agent_active": agent.running, "mode": mode}
+    return {"status": "RA3 API is running", "agent_active": agent.running, "mode": mode, "control": control.stats()}
 
 class SetGoalRequest(BaseModel):
     x: float
@@ -43,32 +56,57 @@ async def set_goal(request: SetGoalRequest):
     print(f"[SYSTEM] User set new goal: {agent.goal_pos}")
     return {"status": "success", "new_goal": agent.goal_pos}
 
+def _check_bounds(**bounds):
+    """422 for any time bound that is not ISO 8601 (see parse_utc)."""
+    for name, value in bounds.items():
+        if value is not None:
+            try:
+                parse_utc(value)
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"{name} must be an ISO 8601 timestamp, got {value!r}")
+
+@app.get("/history")
+async def history(start: Optional[str] = None, end: Optional[str] = None,
+                  alert: Optional[str] = None, alert_prefix: Optional[str] = None,
+                  min_safety: Optional[float] = None, max_safety: Optional[float] = None,
+                  before_id: Optional[int] = None, limit: int = Query(50, ge=1, le=1000),
+                  mission_id: Optional[str] = None):
+    """Mission log rows, newest first. Continue with before_id=<next_before_id>."""
+    _check_bounds(start=start, end=end)
+    return agent.db.query_history(start=start, end=end, alert=alert, alert_prefix=alert_prefix,
+                                  min_safety=min_safety, max_safety=max_safety,
+                                  before_id=before_id, limit=limit, mission_id=mission_id)
+
+@app.get("/history/series")
+async def history_series(start: Optional[str] = None, end: Optional[str] = None,
+                         max_points: int = Query(500, ge=1, le=10000)):
+    """Downsampled safety/MAE buckets; resolution is chosen from the requested span."""
+    _check_bounds(start=start, end=end)
+    return agent.db.query_series(start=start, end=end, max_points=max_points)
+
 @app.websocket("/ws/telemetry")
 async def websocket_telemetry(websocket: WebSocket):
     await websocket.accept()
+    # ?delta=1 opts into keyframe + merge-patch frames; default is the full state per frame
+    delta = websocket.query_params.get("delta", "").lower() in ("1", "true", "yes")
+    encoder = None
+    if delta:
+        # Validate ?keyframe= before subscribing, so a bad value never leaves a queue behind
+        try:
+            encoder = DeltaEncoder(keyframe_interval=int(websocket.query_params.get("keyframe", "20")))
+        except ValueError:
+            await websocket.close(code=1008, reason="keyframe must be an integer >= 1")
+            return
+    queue = hub.subscribe()
     try:
         while True:
-            # Run one simulation step
+            # Wait for the next state from the control loop
             try:
-                state = await agent.run_step()
-                
-                # Convert to dict
-                data = state.model_dump()
-                
-                # Robust timestamp serialization
-                def serialize_dates(obj):
-                    if isinstance(obj, dict):
-                        return {k: serialize_dates(v) for k, v in obj.items()}
-                    elif isinstance(obj, list):
-                        return [serialize_dates(i) for i in obj]
-                    elif isinstance(obj, datetime):
-                        return obj.isoformat()
-                    return obj
-
-                data = serialize_dates(data)
-                
-                await websocket.send_text(json.dumps(data))
-                await asyncio.sleep(0.5) # Faster frequency
+                frame = await queue.get()
+                payload = encoder.encode(frame) if encoder else frame.json()
+                await websocket.send_text(payload.decode("utf-8"))
+            except WebSocketDisconnect:
+                raise
             except Exception as loop_e:
                 print(f"[ERROR] Loop Error: {loop_e}")
                 traceback.print_exc()
@@ -79,6 +117,7 @@ async def websocket_telemetry(websocket: WebSocket):
         print(f"Error in telemetry WS: {e}")
         traceback.print_exc()
     finally:
+        hub.unsubscribe(queue)
         # Avoid closing if already closed to prevent RuntimeError
         if websocket.client_state.name != "DISCONNECTED":
             try:
@@ -1,19 +1,20 @@
-import pyttsx3
 import threading
 import queue
 import time
 
 class VoiceEngine:
-    def __init__(self):
+    def __init__(self, enabled: bool = True):
+        """enabled: speak through pyttsx3; when False phrases are only printed and pyttsx3 is never imported"""
+        self.enabled = enabled
         self.speech_queue = queue.Queue()
         self.running = False
         self.thread = None
 
     def start(self):
         """Starts the background voice worker."""
-        if self.running:
+        if self.running or not self.enabled:
             return
-            
+
         self.running = True
         self.thread = threading.Thread(target=self._worker, daemon=True)
         self.thread.start()
@@ -21,6 +22,13 @@ class VoiceEngine:
 
     def _worker(self):
         """Background thread that processes the speech queue."""
+        try:
+            # Imported here so nothing pays for the TTS backend unless speech is on
+            import pyttsx3
+        except ImportError as e:
+            print(f"[VOICE ERROR] {e}; speech disabled.")
+            self.running = False
+            return
         while self.running:
             try:
                 # Use a timeout so we can check the 'running' flag periodically
@@ -46,7 +54,8 @@ class VoiceEngine:
     def speak(self, text):
         """Adds text to the speech queue."""
         print(f"[RA3 VOICE] {text}")
-        self.speech_queue.put(text)
+        if self.running:
+            self.speech_queue.put(text)
 
     def stop(self):
         """Stops the voice engine."""
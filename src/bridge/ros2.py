@@ -2,22 +2,35 @@ import json
 import threading
 import time
 
-try:
-    import rclpy
-    from rclpy.node import Node
-    from geometry_msgs.msg import Twist
-    ROS2_AVAILABLE = True
-except ImportError:
-    ROS2_AVAILABLE = False
-    print("[BRIDGE] ROS2 libraries not found. Running in MOCK mode.")
+rclpy = None
+Twist = None
+
+
+def _load_ros2() -> bool:
+    """Imports the ROS2 client libraries on first use; False if they are not installed."""
+    global rclpy, Twist
+    if rclpy is not None:
+        return True
+    try:
+        import rclpy as _rclpy
+        from geometry_msgs.msg import Twist as _Twist
+    except ImportError:
+        print("[BRIDGE] ROS2 libraries not found. Running in MOCK mode.")
+        return False
+    rclpy, Twist = _rclpy, _Twist
+    return True
+
 
 class RA3RosBridge:
-    def __init__(self, agent_instance=None):
+    def __init__(self, agent_instance=None, use_ros2: bool = True):
+        """use_ros2: try to publish on ROS2; when False rclpy is never imported (MOCK mode)"""
         self.agent = agent_instance
         self.running = False
         self.thread = None
-        
-        if ROS2_AVAILABLE:
+        self.ros2 = use_ros2 and _load_ros2()
+
+        if self.ros2:
+            from rclpy.node import Node
             rclpy.init()
             self.node = Node('ra3_advisor_bridge')
             self.cmd_vel_pub = self.node.create_publisher(Twist, 'cmd_vel', 10)
@@ -38,7 +51,7 @@ class RA3RosBridge:
                 pass
             
             # If ROS2 is available, we could spin the node here or use timers
-            if ROS2_AVAILABLE and self.node:
+            if self.ros2 and self.node:
                 rclpy.spin_once(self.node, timeout_sec=0.1)
             
             time.sleep(0.1)
@@ -48,7 +61,7 @@ class RA3RosBridge:
         vx = action_params.get("vx", 0.0)
         vy = action_params.get("vy", 0.0)
         
-        if ROS2_AVAILABLE and self.node:
+        if self.ros2 and self.node:
             msg = Twist()
             msg.linear.x = float(vx)
             msg.linear.y = float(vy)
@@ -62,6 +75,6 @@ class RA3RosBridge:
 
     def stop(self):
         self.running = False
-        if ROS2_AVAILABLE:
+        if self.ros2:
             rclpy.shutdown()
         print("[BRIDGE] Hardware Bridge stopped.")
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+from .history import db_timestamp
+
+# Rows logged before missions were tagged (or without a timestamp)
+DEFAULT_PARTITION = "unknown"
+
+_COLUMNS = ("id", "timestamp", "safety_score", "mae", "alerts", "scene_description", "snapshot_path")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError as e:
+        raise ImportError("Exporting mission history needs pyarrow: pip install pyarrow (or the [export] extra)") from e
+
+
+def _schema(pa):
+    # mission_id and date live in the directory names (hive partitioning), not in the files
+    return pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("ms")),
+        ("safety_score", pa.float64()),
+        ("mae", pa.float64()),
+        ("alerts", pa.list_(pa.string())),
+        ("scene_description", pa.string()),
+        ("snapshot_path", pa.string()),
+    ])
+
+
+def _partition_value(value: Optional[str]) -> str:
+    if not value:
+        return DEFAULT_PARTITION
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", value)
+
+
+def _parse_alerts(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return []
+    try:
+        return [str(a) for a in json.loads(raw)]
+    except (ValueError, TypeError):
+        return [raw]
+
+
+class _PartitionWriters:
+    """One open Parquet/IPC writer per (mission, date) directory for the whole export."""
+
+    def __init__(self, pa, out_dir: str, fmt: str):
+        self.pa = pa
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.schema = _schema(pa)
+        self.writers: Dict[tuple, object] = {}
+        self.files: List[str] = []
+
+    def write(self, key: tuple, table):
+        writer = self.writers.get(key)
+        if writer is None:
+            mission, date = key
+            part_dir = os.path.join(self.out_dir, f"mission_id={mission}", f"date={date}")
+            os.makedirs(part_dir, exist_ok=True)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                path = os.path.join(part_dir, "part-0.parquet")
+                writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            else:
+                path = os.path.join(part_dir, "part-0.arrow")
+                writer = self.pa.ipc.new_file(path, self.schema)
+            self.writers[key] = writer
+            self.files.append(path)
+        writer.write_table(table)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+
+def export_history(db_path: str, out_dir: str, format: str = "parquet", chunk_size: int = 50000,
+                   start: Optional[str] = None, end: Optional[str] = None) -> dict:
+    """
+    Streams mission_logs into columnar files laid out as
+    out_dir/mission_id=<id>/date=<YYYY-MM-DD>/part-0.<parquet|arrow>.
+
+    Rows are read with fetchmany(chunk_size) and written as one record batch
+    per partition per chunk, so memory stays flat regardless of table size.
+    The alerts JSON is parsed into a list<string> column. Read back with
+    pyarrow.dataset / pandas.read_parquet(out_dir) using hive partitioning.
+    start/end: ISO 8601 bounds (inclusive / exclusive, naive = UTC), normalized
+    like MissionDatabase.query_history; a malformed bound raises ValueError.
+    """
+    if format not in ("parquet", "arrow"):
+        raise ValueError(f"Unknown export format: {format}")
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("timestamp >= ?")
+        params.append(db_timestamp(start))
+    if end is not None:
+        clauses.append("timestamp < ?")
+        params.append(db_timestamp(end))
+    pa = _require_pyarrow()
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(mission_logs)")}
+    mission_col = "mission_id" if "mission_id" in columns else "NULL"
+    cursor = conn.execute(
+        f"SELECT {', '.join(_COLUMNS)}, {mission_col} FROM mission_logs {where} ORDER BY id", params)
+
+    writers = _PartitionWriters(pa, out_dir, format)
+    schema = writers.schema
+    total = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            groups: Dict[tuple, List[tuple]] = {}
+            for row in rows:
+                ts = row[1]
+                date = str(ts)[:10] if ts else DEFAULT_PARTITION
+                groups.setdefault((_partition_value(row[7]), date), []).append(row)
+
+            for key, group in groups.items():
+                cols = list(zip(*group))
+                table = pa.Table.from_arrays([
+                    pa.array(cols[0], pa.int64()),
+                    pa.array(cols[1], pa.string()).cast(pa.timestamp("ms")),
+                    pa.array(cols[2], pa.float64()),
+                    pa.array(cols[3], pa.float64()),
+                    pa.array([_parse_alerts(a) for a in cols[4]], pa.list_(pa.string())),
+                    pa.array(cols[5], pa.string()),
+                    pa.array(cols[6], pa.string()),
+                ], schema=schema)
+                writers.write(key, table)
+            total += len(rows)
+    finally:
+        writers.close()
+        conn.close()
+
+    return {"rows": total, "files": writers.files}
+
+
+def _bound(value: str) -> str:
+    try:
+        db_timestamp(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO 8601 timestamp: {value!r}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export RA3 mission history to Parquet/Arrow.")
+    parser.add_argument("out_dir", help="Output directory (hive-partitioned by mission_id and date)")
+    parser.add_argument("--db", default="mission_history.db", help="SQLite mission history database")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows fetched per chunk")
+    parser.add_argument("--start", type=_bound, help="Inclusive lower timestamp bound (ISO 8601, naive = UTC)")
+    parser.add_argument("--end", type=_bound, help="Exclusive upper timestamp bound (ISO 8601, naive = UTC)")
+    args = parser.parse_args(argv)
+
+    result = export_history(args.db, args.out_dir, format=args.format, chunk_size=args.chunk_size,
+                            start=args.start, end=args.end)
+    print(f"[EXPORT] {result['rows']} rows -> {len(result['files'])} files in {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,85 @@
 import sqlite3
 import json
-from datetime import datetime
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 import os
 
+_STOP = object()
+
+# Rollup resolutions in seconds, with the timestamp prefix that names each bucket
+ROLLUP_RESOLUTIONS = {
+    1: "substr({ts}, 1, 19)",
+    60: "substr({ts}, 1, 16) || ':00'",
+    3600: "substr({ts}, 1, 13) || ':00:00'",
+}
+
+
+def _utc_timestamp() -> str:
+    # Same layout as SQLite's CURRENT_TIMESTAMP (UTC), with milliseconds
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def parse_utc(value: str) -> datetime:
+    """
+    Parses an ISO 8601 timestamp into naive UTC, the form the rollup buckets use.
+    Offsets (including a trailing Z) are converted to UTC; naive input is taken
+    as UTC already. Raises ValueError for anything unparseable.
+    """
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def db_timestamp(value: str) -> str:
+    """
+    An ISO 8601 bound in the stored timestamp layout, so text comparison in SQL
+    orders it correctly: 'YYYY-MM-DD HH:MM:SS', plus '.mmm' when it has a
+    fraction. Raises ValueError like parse_utc.
+    """
+    dt = parse_utc(value)
+    text = dt.strftime("%Y-%m-%d %H:%M:%S")
+    if dt.microsecond:
+        text += f".{dt.microsecond // 1000:03d}"
+    return text
+
+
 class MissionDatabase:
-    def __init__(self, db_path="mission_history.db"):
+    def __init__(self, db_path="mission_history.db", batch_size=64, flush_interval=1.0,
+                 retention_days=None, prune_interval=3600.0, mission_id=None):
+        """
+        mission_id: tag stored on every row of this run (defaults to the UTC start time)
+        batch_size: rows per write transaction
+        flush_interval: max seconds a logged row waits before it is written
+        retention_days: if set, the writer prunes raw rows older than this every prune_interval seconds
+        """
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval
+        self.mission_id = mission_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._queue = queue.Queue()
+        self._thread = None
+        self.rows_written = 0
         self._init_db()
+        # Once per instance: close() is a no-op when the writer is already stopped,
+        # and restarting the writer must not stack more exit hooks
+        atexit.register(self.close)
+        self.start()
 
-    def _init_db(self):
+    def _connect(self):
         conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS mission_logs (
@@ -22,27 +92,334 @@ class MissionDatabase:
                 snapshot_path TEXT
             )
         ''')
+        # Migration: databases created before missions were tagged
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(mission_logs)")}
+        if "mission_id" not in columns:
+            cursor.execute("ALTER TABLE mission_logs ADD COLUMN mission_id TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON mission_logs(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_safety ON mission_logs(safety_score)")
+
+        # Alerts normalized into a side table (one row per alert) so they can be indexed
+        backfill = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='mission_alerts'").fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mission_alerts (
+                log_id INTEGER NOT NULL REFERENCES mission_logs(id) ON DELETE CASCADE,
+                alert TEXT NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_alert ON mission_alerts(alert, log_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_log ON mission_alerts(log_id)")
+        # Filled by SQLite itself, so batched executemany inserts need no extra round trips
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_logs_alerts AFTER INSERT ON mission_logs
+            WHEN json_valid(NEW.alerts)
+            BEGIN
+                INSERT INTO mission_alerts (log_id, alert) SELECT NEW.id, value FROM json_each(NEW.alerts);
+            END
+        ''')
+        if backfill:
+            cursor.execute('''
+                INSERT INTO mission_alerts (log_id, alert)
+                SELECT mission_logs.id, json_each.value FROM mission_logs, json_each(mission_logs.alerts)
+                WHERE json_valid(mission_logs.alerts)
+            ''')
+
+        # Downsampled aggregates, maintained per insert so charts never scan raw rows
+        backfill = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='mission_rollups'").fetchone() is None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mission_rollups (
+                resolution INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                samples INTEGER NOT NULL,
+                safety_sum REAL,
+                safety_min REAL,
+                safety_max REAL,
+                last_mae REAL,
+                last_id INTEGER,
+                alert_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (resolution, bucket)
+            ) WITHOUT ROWID
+        ''')
+        for res, bucket in ROLLUP_RESOLUTIONS.items():
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_rollup_{res} AFTER INSERT ON mission_logs
+                WHEN NEW.timestamp IS NOT NULL
+                BEGIN
+                    INSERT INTO mission_rollups
+                        (resolution, bucket, samples, safety_sum, safety_min, safety_max, last_mae, last_id, alert_count)
+                    VALUES ({res}, {bucket.format(ts="NEW.timestamp")}, 1, NEW.safety_score, NEW.safety_score,
+                            NEW.safety_score, NEW.mae, NEW.id,
+                            CASE WHEN json_valid(NEW.alerts) THEN json_array_length(NEW.alerts) ELSE 0 END)
+                    ON CONFLICT (resolution, bucket) DO UPDATE SET
+                        samples = samples + 1,
+                        safety_sum = safety_sum + excluded.safety_sum,
+                        safety_min = min(safety_min, excluded.safety_min),
+                        safety_max = max(safety_max, excluded.safety_max),
+                        last_mae = CASE WHEN excluded.last_id > last_id THEN excluded.last_mae ELSE last_mae END,
+                        last_id = max(last_id, excluded.last_id),
+                        alert_count = alert_count + excluded.alert_count;
+                END
+            ''')
+            if backfill:
+                cursor.execute(f'''
+                    INSERT INTO mission_rollups
+                        (resolution, bucket, samples, safety_sum, safety_min, safety_max, last_mae, last_id, alert_count)
+                    SELECT {res}, {bucket.format(ts="timestamp")}, count(*), sum(safety_score), min(safety_score),
+                           max(safety_score), NULL, max(id),
+                           sum(CASE WHEN json_valid(alerts) THEN json_array_length(alerts) ELSE 0 END)
+                    FROM mission_logs WHERE timestamp IS NOT NULL GROUP BY 2
+                ''')
+        if backfill:
+            cursor.execute('''
+                UPDATE mission_rollups SET last_mae = (SELECT mae FROM mission_logs WHERE id = mission_rollups.last_id)
+            ''')
         conn.commit()
         conn.close()
 
+    def start(self):
+        """Starts the background writer thread (one persistent connection)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def _writer(self):
+        conn = self._connect()
+        batch = []
+        deadline = None
+        next_prune = time.monotonic()
+        try:
+            while True:
+                if self.retention_days is not None and time.monotonic() >= next_prune:
+                    self._prune(conn, self.retention_days)
+                    next_prune = time.monotonic() + self.prune_interval
+                timeout = max(deadline - time.monotonic(), 0) if deadline else None
+                if self.retention_days is not None:
+                    until_prune = max(next_prune - time.monotonic(), 0)
+                    timeout = until_prune if timeout is None else min(timeout, until_prune)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+                if isinstance(item, threading.Event):
+                    # flush() barrier: write everything queued so far, then release the caller
+                    self._write_batch(conn, batch)
+                    batch, deadline = [], None
+                    item.set()
+                    continue
+                if item is not None:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.append(item)
+                if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                    self._write_batch(conn, batch)
+                    batch, deadline = [], None
+        finally:
+            # Drain whatever is still queued on shutdown
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()
+                elif item is not _STOP:
+                    batch.append(item)
+            self._write_batch(conn, batch)
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        if not batch:
+            return
+        rows = [(ts, score, mae, json.dumps(alerts), desc, snap, self.mission_id)
+                for ts, score, mae, alerts, desc, snap in batch]
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO mission_logs
+                        (timestamp, safety_score, mae, alerts, scene_description, snapshot_path, mission_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+            self.rows_written += len(rows)
+        except Exception as e:
+            print(f"[DB ERROR] {e}")
+
+    def _prune(self, conn, days, rollup_days=None):
+        cutoff = f"-{float(days)} days"
+        try:
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM mission_logs WHERE timestamp < datetime('now', ?)", (cutoff,)).rowcount
+                # 1 s buckets are as large as the raw log, so they follow the same retention;
+                # minute and hour buckets are kept for rollup_days (forever if None)
+                conn.execute("DELETE FROM mission_rollups WHERE resolution = 1 AND bucket < datetime('now', ?)",
+                             (cutoff,))
+                if rollup_days is not None:
+                    conn.execute("DELETE FROM mission_rollups WHERE resolution > 1 AND bucket < datetime('now', ?)",
+                                 (f"-{float(rollup_days)} days",))
+            return deleted
+        except Exception as e:
+            print(f"[DB ERROR] {e}")
+            return 0
+
+    def prune(self, days, rollup_days=None) -> int:
+        """
+        Retention: deletes raw rows (and their 1 s buckets) older than `days`.
+        Minute/hour rollups survive, so long-range charts keep working.
+        Returns the number of raw rows removed.
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            return self._prune(conn, days, rollup_days)
+        finally:
+            conn.close()
+
     def log_step(self, safety_score, mae, alerts, scene_description, snapshot_path=None):
+        """Queues one row for the writer thread; never touches the disk on the caller's thread."""
+        self._queue.put((_utc_timestamp(), safety_score, mae, list(alerts), scene_description, snapshot_path))
+
+    def flush(self, timeout=5.0) -> bool:
+        """Blocks until every row queued before this call has been committed."""
+        if not (self._thread and self._thread.is_alive()):
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Flushes pending rows and stops the writer thread."""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def query_history(self, start=None, end=None, alert=None, alert_prefix=None,
+                      min_safety=None, max_safety=None, before_id=None, limit=50, mission_id=None):
+        """
+        Filtered history, newest first, with keyset pagination.
+        start/end: ISO 8601 bounds (inclusive start, exclusive end), normalized with
+                   db_timestamp; naive values are UTC. A malformed bound raises ValueError
+        alert / alert_prefix: exact alert text or its leading text (e.g. "CRITICAL")
+        min_safety/max_safety: inclusive safety_score bounds
+        before_id: pass the previous page's next_before_id to continue
+        mission_id: restrict to one mission
+        Returns {"rows": [...], "next_before_id": id or None}.
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("l.timestamp >= ?")
+            params.append(db_timestamp(start))
+        if end is not None:
+            clauses.append("l.timestamp < ?")
+            params.append(db_timestamp(end))
+        if min_safety is not None:
+            clauses.append("l.safety_score >= ?")
+            params.append(min_safety)
+        if max_safety is not None:
+            clauses.append("l.safety_score <= ?")
+            params.append(max_safety)
+        if before_id is not None:
+            clauses.append("l.id < ?")
+            params.append(before_id)
+        if mission_id is not None:
+            clauses.append("l.mission_id = ?")
+            params.append(mission_id)
+        if alert is not None:
+            clauses.append("l.id IN (SELECT log_id FROM mission_alerts WHERE alert = ?)")
+            params.append(alert)
+        if alert_prefix is not None:
+            # Range form of a prefix match so the (alert, log_id) index is used
+            clauses.append("l.id IN (SELECT log_id FROM mission_alerts WHERE alert >= ? AND alert < ?)")
+            params.extend([alert_prefix, alert_prefix + "\uffff"])
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = f'''
+            SELECT l.id, l.timestamp, l.safety_score, l.mae, l.alerts, l.scene_description, l.snapshot_path,
+                   l.mission_id
+            FROM mission_logs l {where}
+            ORDER BY l.id DESC LIMIT ?
+        '''
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO mission_logs (safety_score, mae, alerts, scene_description, snapshot_path)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (safety_score, mae, json.dumps(alerts), scene_description, snapshot_path))
-            conn.commit()
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
             conn.close()
         except Exception as e:
             print(f"[DB ERROR] {e}")
+            return {"rows": [], "next_before_id": None}
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "rows": [{
+                "id": r[0],
+                "timestamp": r[1],
+                "safety_score": r[2],
+                "mae": r[3],
+                "alerts": json.loads(r[4]) if r[4] else [],
+                "scene_description": r[5],
+                "snapshot_path": r[6],
+                "mission_id": r[7],
+            } for r in rows],
+            "next_before_id": rows[-1][0] if more else None,
+        }
+
+    def query_series(self, start=None, end=None, max_points=500, resolution=None):
+        """
+        Downsampled safety/MAE series for charts.
+        Picks the finest rollup (1 s, 1 min, 1 h) that covers [start, end) in at most
+        max_points buckets, unless `resolution` is given. Defaults to the last hour.
+        Bounds are ISO 8601 strings (see parse_utc); a malformed one raises ValueError.
+        """
+        end_dt = parse_utc(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+        start_dt = parse_utc(start) if start else end_dt - timedelta(hours=1)
+        if resolution is None:
+            span = max((end_dt - start_dt).total_seconds(), 0.0)
+            resolution = next((r for r in sorted(ROLLUP_RESOLUTIONS) if span / r <= max_points),
+                              max(ROLLUP_RESOLUTIONS))
+        fmt = "%Y-%m-%d %H:%M:%S"
+        try:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute('''
+                SELECT bucket, samples, safety_sum, safety_min, safety_max, last_mae, alert_count
+                FROM mission_rollups WHERE resolution = ? AND bucket >= ? AND bucket < ?
+                ORDER BY bucket
+            ''', (resolution, start_dt.strftime(fmt), end_dt.strftime(fmt))).fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"[DB ERROR] {e}")
+            rows = []
+        return {
+            "resolution": resolution,
+            "points": [{
+                "bucket": r[0],
+                "samples": r[1],
+                "safety_mean": r[2] / r[1] if r[2] is not None else None,
+                "safety_min": r[3],
+                "safety_max": r[4],
+                "last_mae": r[5],
+                "alert_count": r[6],
+            } for r in rows],
+        }
+
+    def export(self, out_dir, format="parquet", chunk_size=50000, start=None, end=None):
+        """Streams mission_logs into partitioned Parquet/Arrow files; see src.database.export."""
+        from .export import export_history
+        self.flush()
+        return export_history(self.db_path, out_dir, format=format, chunk_size=chunk_size, start=start, end=end)
 
     def get_recent_history(self, limit=50):
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM mission_logs ORDER BY id DESC LIMIT ?', (limit,))
+            # Explicit columns keep the original 7-tuple rows (mission_id was added later)
+            cursor.execute('''
+                SELECT id, timestamp, safety_score, mae, alerts, scene_description, snapshot_path
+                FROM mission_logs ORDER BY id DESC LIMIT ?
+            ''', (limit,))
             rows = cursor.fetchall()
             conn.close()
             return rows
@@ -0,0 +1,134 @@
+import numpy as np
+from scipy import ndimage
+from typing import Tuple
+
+
+class InflationCostmap:
+    """
+    Graded inflation layer over a binary occupancy grid.
+
+    A Euclidean distance transform gives every free cell its clearance to the
+    nearest obstacle, which is mapped to a cost in [0, 1]: 1 inside the robot
+    footprint, decaying exponentially to 0 at `inflation_radius`. A second
+    field, kept alongside, maps every blocked cell to its nearest free cell (the
+    index output of the transform over the obstacles), so escape queries are a
+    single array lookup. Both fields are only recomputed around changed cells.
+    """
+
+    def __init__(self, shape: Tuple[int, int], resolution: float, inflation_radius: float = 1.5,
+                 robot_radius: float = 0.0, cost_scaling: float = 3.0):
+        self.res = resolution
+        self.inflation_radius = inflation_radius
+        self.robot_radius = robot_radius
+        self.cost_scaling = cost_scaling
+        # Obstacles further than this (in cells) cannot influence a cell's cost
+        self.reach = int(np.ceil(inflation_radius / resolution)) + 1
+        self.blocked = np.zeros(shape, dtype=bool)
+        self.cost = np.zeros(shape, dtype=float)
+        self._reset_nearest_free(shape)
+        self.cells_recomputed = 0
+
+    def _reset_nearest_free(self, shape: Tuple[int, int]):
+        # Every cell starts free, so it is its own nearest free cell
+        self._nearest_free = np.indices(shape)
+        # Upper bound on any cell's distance to its nearest free cell: how far a
+        # change can move anyone's answer
+        self._max_free_dist = 0.0
+
+    def _cost_of(self, blocked: np.ndarray) -> np.ndarray:
+        if not blocked.any():
+            return np.zeros(blocked.shape, dtype=float)
+        dist = ndimage.distance_transform_edt(~blocked) * self.res
+        cost = np.exp(-self.cost_scaling * np.maximum(dist - self.robot_radius, 0.0))
+        cost[dist >= self.inflation_radius] = 0.0
+        cost[blocked] = 1.0
+        return cost
+
+    def update(self, grid: np.ndarray) -> bool:
+        """Syncs with the occupancy grid, recomputing costs only around changed cells."""
+        blocked = grid != 0
+        if blocked.shape != self.blocked.shape:
+            self.blocked = np.zeros(blocked.shape, dtype=bool)
+            self.cost = np.zeros(blocked.shape, dtype=float)
+            self._reset_nearest_free(blocked.shape)
+        diff = blocked != self.blocked
+        if not diff.any():
+            return False
+        rows = np.flatnonzero(diff.any(axis=1))
+        cols = np.flatnonzero(diff.any(axis=0))
+        h, w = blocked.shape
+        r = self.reach
+        # Cells within `reach` of a change are rewritten; they only depend on
+        # obstacles within `reach` of themselves, so a 2*reach window suffices.
+        ix0, ix1 = max(rows[0] - r, 0), min(rows[-1] + r + 1, h)
+        iy0, iy1 = max(cols[0] - r, 0), min(cols[-1] + r + 1, w)
+        ox0, ox1 = max(rows[0] - 2 * r, 0), min(rows[-1] + 2 * r + 1, h)
+        oy0, oy1 = max(cols[0] - 2 * r, 0), min(cols[-1] + 2 * r + 1, w)
+
+        window_cost = self._cost_of(blocked[ox0:ox1, oy0:oy1])
+        self.cost[ix0:ix1, iy0:iy1] = window_cost[ix0 - ox0:ix1 - ox0, iy0 - oy0:iy1 - oy0]
+        self.blocked = blocked
+        self.cells_recomputed += (ox1 - ox0) * (oy1 - oy0)
+        self._update_nearest_free((rows[0], rows[-1] + 1, cols[0], cols[-1] + 1))
+        return True
+
+    def _update_nearest_free(self, box: Tuple[int, int, int, int]):
+        """
+        Repairs the nearest-free field after the cells in box (x0, x1, y0, y1) changed.
+
+        A cell outside the box only gets a new answer if its old nearest free cell
+        lies in the box or a cell freed there is closer, i.e. if it is within its
+        old free distance of the box. So only the box grown by the largest free
+        distance is rewritten, from a transform over a window with extra margin;
+        an answer counts once it is no further than the window edge (nothing
+        outside could be closer), and the margin doubles until every one does.
+        """
+        h, w = self.blocked.shape
+        x0, x1, y0, y1 = box
+        grow = int(np.ceil(self._max_free_dist)) + 1
+        tx0, tx1, ty0, ty1 = max(x0 - grow, 0), min(x1 + grow, h), max(y0 - grow, 0), min(y1 + grow, w)
+        margin = grow
+        while True:
+            ox0, ox1, oy0, oy1 = max(tx0 - margin, 0), min(tx1 + margin, h), max(ty0 - margin, 0), min(ty1 + margin, w)
+            whole = (ox0, ox1, oy0, oy1) == (0, h, 0, w)
+            window = self.blocked[ox0:ox1, oy0:oy1]
+            self.cells_recomputed += window.size
+            if window.all():
+                if whole:
+                    # Nothing is free: cells answer themselves, and the next change rebuilds everything
+                    self._reset_nearest_free((h, w))
+                    self._max_free_dist = float(max(h, w))
+                    return
+                margin *= 2
+                continue
+            dist, (ni, nj) = ndimage.distance_transform_edt(window, return_indices=True)
+            sub = (slice(tx0 - ox0, tx1 - ox0), slice(ty0 - oy0, ty1 - oy0))
+            dist = dist[sub]
+            if not whole:
+                # Distance from each target cell to the nearest cell beyond a cut window edge
+                xi = np.arange(tx0, tx1)[:, None]
+                yi = np.arange(ty0, ty1)[None, :]
+                edge = np.full(dist.shape, np.inf)
+                if ox0 > 0:
+                    edge = np.minimum(edge, xi - ox0 + 1)
+                if ox1 < h:
+                    edge = np.minimum(edge, ox1 - xi)
+                if oy0 > 0:
+                    edge = np.minimum(edge, yi - oy0 + 1)
+                if oy1 < w:
+                    edge = np.minimum(edge, oy1 - yi)
+                if (dist > edge).any():
+                    margin *= 2
+                    continue
+            break
+        self._nearest_free[0][tx0:tx1, ty0:ty1] = ni[sub] + ox0
+        self._nearest_free[1][tx0:tx1, ty0:ty1] = nj[sub] + oy0
+        if (tx0, tx1, ty0, ty1) == (0, h, 0, w):
+            self._max_free_dist = float(dist.max())
+        else:
+            # Stays an upper bound; tightened whenever a change covers the whole grid
+            self._max_free_dist = max(self._max_free_dist, float(dist.max()))
+
+    def nearest_free(self, cell: Tuple[int, int]) -> Tuple[int, int]:
+        """Closest free cell to `cell` (itself if free, or if nothing is free)."""
+        return (int(self._nearest_free[0][cell]), int(self._nearest_free[1][cell]))
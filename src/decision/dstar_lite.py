@@ -0,0 +1,157 @@
+import heapq
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+from .search import INF, SQRT2, octile
+
+# 8-connected moves with their base traversal cost
+MOVES = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, SQRT2), (-1, -1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2)]
+
+
+class DStarLite:
+    """
+    Incremental replanner (D* Lite, Koenig & Likhachev 2002) over an occupancy grid.
+
+    The search runs backwards from the goal, so g-values stay valid while the
+    robot moves. Between ticks only the cells whose occupancy changed (and their
+    neighbours) are repaired instead of re-running the whole search.
+    """
+
+    def __init__(self, grid: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int],
+                 penalty: Optional[np.ndarray] = None, version: Optional[int] = None):
+        """
+        penalty: optional per-cell extra cost multiplier applied to the step entering a cell
+        version: caller's change counter for grid + penalty (see update)
+        """
+        self.version = version
+        self.grid = grid.copy()
+        self.penalty = np.zeros(self.grid.shape) if penalty is None else penalty.copy()
+        self.size_x, self.size_y = self.grid.shape
+        self.start = start
+        self.goal = goal
+        self.last = start
+        self.km = 0.0
+        self.g: Dict[Tuple[int, int], float] = {}
+        self.rhs: Dict[Tuple[int, int], float] = {goal: 0.0}
+        self.open: List = []
+        self.open_keys: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        self.nodes_expanded = 0
+        self._push(goal)
+        self.compute_shortest_path()
+
+    def _key(self, u) -> Tuple[float, float]:
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        # Round so that sqrt(2) sums reached in different orders still tie
+        return (round(m + octile(self.start, u) + self.km, 9), round(m, 9))
+
+    def _push(self, u):
+        k = self._key(u)
+        self.open_keys[u] = k
+        heapq.heappush(self.open, (k, u))
+
+    def _top_key(self) -> Tuple[float, float]:
+        # Discard stale heap entries left behind by lazy deletion
+        while self.open:
+            k, u = self.open[0]
+            if self.open_keys.get(u) == k:
+                return k
+            heapq.heappop(self.open)
+        return (INF, INF)
+
+    def _neighbors(self, u) -> Iterable[Tuple[Tuple[int, int], float]]:
+        x, y = u
+        for dx, dy, cost in MOVES:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size_x and 0 <= ny < self.size_y:
+                yield (nx, ny), cost
+
+    def _cost(self, u, v, base: float) -> float:
+        if self.grid[u] != 0 or self.grid[v] != 0:
+            return INF
+        return base * (1.0 + self.penalty[v])
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            best = INF
+            for v, base in self._neighbors(u):
+                c = self._cost(u, v, base)
+                if c < INF:
+                    best = min(best, c + self.g.get(v, INF))
+            self.rhs[u] = best
+        self.open_keys.pop(u, None)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+
+    def compute_shortest_path(self):
+        while True:
+            k_old = self._top_key()
+            start_key = self._key(self.start)
+            if not (k_old < start_key or self.rhs.get(self.start, INF) != self.g.get(self.start, INF)):
+                break
+            if k_old == (INF, INF):
+                break
+            _, u = heapq.heappop(self.open)
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u)
+                continue
+            del self.open_keys[u]
+            self.nodes_expanded += 1
+            if self.g.get(u, INF) > self.rhs.get(u, INF):
+                self.g[u] = self.rhs[u]
+                for v, _ in self._neighbors(u):
+                    self._update_vertex(v)
+            else:
+                self.g[u] = INF
+                self._update_vertex(u)
+                for v, _ in self._neighbors(u):
+                    self._update_vertex(v)
+
+    def update(self, start: Tuple[int, int], grid: np.ndarray, penalty: Optional[np.ndarray] = None,
+               version: Optional[int] = None):
+        """
+        Moves the start and repairs the search for every cell whose occupancy or penalty changed.
+        version: change counter for grid + penalty; when it equals the last one seen the
+                 layers are taken as unchanged and not compared (None always compares)
+        """
+        if start != self.last:
+            # Keys pushed so far use the old start's heuristic; km keeps them lower bounds
+            self.km += octile(self.last, start)
+            self.last = start
+        self.start = start
+        changed = ()
+        if version is None or version != self.version:
+            if penalty is None:
+                penalty = np.zeros(grid.shape)
+            changed = np.argwhere((self.grid != grid) | (self.penalty != penalty))
+            self.version = version
+        if len(changed):
+            self.grid = grid.copy()
+            self.penalty = penalty.copy()
+            for cx, cy in changed:
+                cell = (int(cx), int(cy))
+                self._update_vertex(cell)
+                for v, _ in self._neighbors(cell):
+                    self._update_vertex(v)
+        self.compute_shortest_path()
+        return len(changed)
+
+    def extract_path(self) -> List[Tuple[int, int]]:
+        """Greedy descent on g from the start; empty when the goal is unreachable."""
+        if self.g.get(self.start, INF) == INF:
+            return []
+        path = [self.start]
+        curr = self.start
+        for _ in range(self.size_x * self.size_y):
+            if curr == self.goal:
+                return path
+            best, best_cost = None, INF
+            for v, base in self._neighbors(curr):
+                c = self._cost(curr, v, base) + self.g.get(v, INF)
+                if c < best_cost:
+                    best, best_cost = v, c
+            if best is None:
+                return []
+            path.append(best)
+            curr = best
+        return []
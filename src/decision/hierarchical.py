@@ -0,0 +1,351 @@
+import hashlib
+import heapq
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+from .search import INF, astar_grid, octile
+
+Cell = Tuple[int, int]
+ClusterKey = Tuple[int, int]
+
+
+class HierarchicalPathfinder:
+    """
+    HPA*-style planner for large, unbounded arenas.
+
+    The world is split into square clusters of `cluster_size` cells. Only clusters
+    that contain obstacles allocate an occupancy tile, so memory follows the
+    obstacles rather than the arena area. Entrances between neighbouring clusters
+    and the intra-cluster distances between them are computed lazily and cached
+    per cluster, so the abstract search only touches clusters along the route.
+    A fine A* is run only inside the local window around the robot; waypoints
+    beyond it stay at the abstract level and are refined on later ticks.
+    """
+
+    def __init__(self, resolution: float = 0.25, cluster_size: int = 32, local_window: float = 10.0,
+                 robot_radius: float = 0.0, max_abstract_expansions: int = 200000):
+        """
+        resolution: meters per fine grid cell
+        cluster_size: cluster edge length in cells
+        local_window: radius (meters) around the robot that is planned at full resolution
+        robot_radius: default inflation (meters) added to every stamped obstacle
+        max_abstract_expansions: bound on the abstract search (the world has no edges)
+        """
+        self.res = resolution
+        self.cluster = cluster_size
+        self.local_window = local_window
+        self.robot_radius = robot_radius
+        self.max_abstract_expansions = max_abstract_expansions
+        self.tiles: Dict[ClusterKey, np.ndarray] = {}
+        self._entrance_cache: Dict[Tuple[ClusterKey, ClusterKey], List[Tuple[Cell, Cell]]] = {}
+        self._graph_cache: Dict[ClusterKey, Tuple[Dict[Cell, List[Tuple[Cell, float]]], Dict[Cell, List[Cell]]]] = {}
+        self._disk_offsets: Dict[int, np.ndarray] = {}
+        self.last_search_stats = {"nodes_expanded": 0, "path_cost": INF}
+        self.last_path_cells: List[Cell] = []
+        # Planner protocol shared with TacticalPathfinder: paths are cell-by-cell
+        # inside the local window, so there are no sparse waypoint anchors
+        self.any_angle = False
+        self.last_waypoint_anchors: Optional[List[int]] = None
+
+    # ------------------------------------------------------------------ geometry
+    def _to_grid(self, pos: List[float]) -> Cell:
+        # No clipping: the arena is unbounded
+        return (int(np.floor(pos[0] / self.res)), int(np.floor(pos[1] / self.res)))
+
+    def _to_coord(self, cell: Cell) -> List[float]:
+        return [cell[0] * self.res, cell[1] * self.res]
+
+    def _cluster_of(self, cell: Cell) -> ClusterKey:
+        return (cell[0] // self.cluster, cell[1] // self.cluster)
+
+    def _blocked(self, cell: Cell) -> bool:
+        k = self._cluster_of(cell)
+        tile = self.tiles.get(k)
+        if tile is None:
+            return False
+        return bool(tile[cell[0] - k[0] * self.cluster, cell[1] - k[1] * self.cluster])
+
+    def _window(self, lo: Cell, hi: Cell) -> np.ndarray:
+        """Dense occupancy for the inclusive cell box lo..hi assembled from the sparse tiles."""
+        grid = np.zeros((hi[0] - lo[0] + 1, hi[1] - lo[1] + 1), dtype=np.uint8)
+        c = self.cluster
+        for kx in range(lo[0] // c, hi[0] // c + 1):
+            for ky in range(lo[1] // c, hi[1] // c + 1):
+                tile = self.tiles.get((kx, ky))
+                if tile is None:
+                    continue
+                x0, y0 = max(lo[0], kx * c), max(lo[1], ky * c)
+                x1, y1 = min(hi[0], kx * c + c - 1), min(hi[1], ky * c + c - 1)
+                grid[x0 - lo[0]:x1 - lo[0] + 1, y0 - lo[1]:y1 - lo[1] + 1] = \
+                    tile[x0 - kx * c:x1 - kx * c + 1, y0 - ky * c:y1 - ky * c + 1]
+        return grid
+
+    # ---------------------------------------------------------------- obstacles
+    def clear_obstacles(self):
+        self.tiles = {}
+        self._entrance_cache.clear()
+        self._graph_cache.clear()
+
+    def add_manual_obstacle(self, pos: List[float], radius: float = 2.0):
+        self.stamp_obstacles([pos], [radius], inflation=0.0)
+
+    def stamp_obstacles(self, centers: Sequence[Sequence[float]], radii, inflation: Optional[float] = None):
+        """Marks N disk obstacles, allocating tiles only for the clusters they touch."""
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        if len(centers) == 0:
+            return
+        if inflation is None:
+            inflation = self.robot_radius
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+        cells = np.floor(centers / self.res).astype(np.int64)
+        r_cells = ((radii + inflation) / self.res).astype(int)
+
+        pts = []
+        for r in np.unique(r_cells):
+            offsets = self._disk_mask_offsets(int(r))
+            pts.append((cells[r_cells == r][:, None, :] + offsets[None, :, :]).reshape(-1, 2))
+        pts = np.concatenate(pts)
+
+        # Group the stamped cells by cluster with one sort instead of a mask per cluster
+        keys = pts // self.cluster
+        uniq, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse.reshape(-1), kind="stable")
+        groups = np.split(pts[order], np.cumsum(counts)[:-1])
+        for (kx, ky), group in zip(uniq, groups):
+            k = (int(kx), int(ky))
+            tile = self.tiles.get(k)
+            if tile is None:
+                tile = self.tiles[k] = np.zeros((self.cluster, self.cluster), dtype=np.uint8)
+            local = group - (kx * self.cluster, ky * self.cluster)
+            tile[local[:, 0], local[:, 1]] = 1
+            self._invalidate(k)
+
+    def _disk_mask_offsets(self, r_cells: int) -> np.ndarray:
+        offsets = self._disk_offsets.get(r_cells)
+        if offsets is None:
+            span = np.arange(-r_cells, r_cells + 1)
+            di, dj = np.meshgrid(span, span, indexing="ij")
+            mask = di**2 + dj**2 <= r_cells**2
+            offsets = np.stack([di[mask], dj[mask]], axis=1)
+            self._disk_offsets[r_cells] = offsets
+        return offsets
+
+    def _invalidate(self, k: ClusterKey):
+        """Drops cached entrances of k's borders and the graphs of k and its neighbours."""
+        for n in self._adjacent(k):
+            self._entrance_cache.pop((min(k, n), max(k, n)), None)
+            self._graph_cache.pop(n, None)
+        self._graph_cache.pop(k, None)
+
+    def grid_signature(self) -> bytes:
+        """Content hash of all occupied tiles, used to key cached paths."""
+        h = hashlib.blake2b(digest_size=16)
+        for k in sorted(self.tiles):
+            h.update(np.asarray(k, dtype=np.int64).tobytes())
+            h.update(np.packbits(self.tiles[k]).tobytes())
+        return h.digest()
+
+    # ----------------------------------------------------------- abstract graph
+    @staticmethod
+    def _adjacent(k: ClusterKey) -> List[ClusterKey]:
+        return [(k[0] + 1, k[1]), (k[0] - 1, k[1]), (k[0], k[1] + 1), (k[0], k[1] - 1)]
+
+    def _entrances(self, a: ClusterKey, b: ClusterKey) -> List[Tuple[Cell, Cell]]:
+        """Transition cell pairs (one per free border segment) between adjacent clusters a < b."""
+        key = (a, b)
+        cached = self._entrance_cache.get(key)
+        if cached is not None:
+            return cached
+        c = self.cluster
+        if b[0] == a[0] + 1:
+            xa, xb = b[0] * c - 1, b[0] * c
+            y0 = a[1] * c
+            line_a = [(xa, y0 + i) for i in range(c)]
+            line_b = [(xb, y0 + i) for i in range(c)]
+        else:
+            ya, yb = b[1] * c - 1, b[1] * c
+            x0 = a[0] * c
+            line_a = [(x0 + i, ya) for i in range(c)]
+            line_b = [(x0 + i, yb) for i in range(c)]
+
+        if a not in self.tiles and b not in self.tiles:
+            runs = [(0, c - 1)]
+        else:
+            runs, run_start = [], None
+            for i in range(c):
+                free = not self._blocked(line_a[i]) and not self._blocked(line_b[i])
+                if free and run_start is None:
+                    run_start = i
+                elif not free and run_start is not None:
+                    runs.append((run_start, i - 1))
+                    run_start = None
+            if run_start is not None:
+                runs.append((run_start, c - 1))
+        pairs = [(line_a[(lo + hi) // 2], line_b[(lo + hi) // 2]) for lo, hi in runs]
+        self._entrance_cache[key] = pairs
+        return pairs
+
+    def _cluster_graph(self, k: ClusterKey):
+        """(intra-cluster edges, inter-cluster partners) for the entrance nodes of cluster k."""
+        cached = self._graph_cache.get(k)
+        if cached is not None:
+            return cached
+        partners: Dict[Cell, List[Cell]] = {}
+        for n in self._adjacent(k):
+            a, b = min(k, n), max(k, n)
+            for pa, pb in self._entrances(a, b):
+                mine, other = (pa, pb) if a == k else (pb, pa)
+                partners.setdefault(mine, []).append(other)
+        nodes = list(partners)
+        intra: Dict[Cell, List[Tuple[Cell, float]]] = {u: [] for u in nodes}
+        for i, u in enumerate(nodes):
+            for v in nodes[i + 1:]:
+                cost = self._intra_cost(k, u, v)
+                if cost < INF:
+                    intra[u].append((v, cost))
+                    intra[v].append((u, cost))
+        self._graph_cache[k] = (intra, partners)
+        return intra, partners
+
+    def _intra_cost(self, k: ClusterKey, u: Cell, v: Cell) -> float:
+        """Shortest distance between two cells of cluster k without leaving it."""
+        tile = self.tiles.get(k)
+        if tile is None:
+            return octile(u, v)
+        base = (k[0] * self.cluster, k[1] * self.cluster)
+        _, stats = astar_grid(tile, (u[0] - base[0], u[1] - base[1]), (v[0] - base[0], v[1] - base[1]))
+        return stats["path_cost"]
+
+    # ------------------------------------------------------------------ queries
+    def _nearest_free(self, cell: Cell, max_radius: int = 64) -> Cell:
+        """BFS for the closest non-blocked cell within max_radius cells."""
+        q = deque([cell])
+        visited = {cell}
+        while q:
+            curr = q.popleft()
+            if not self._blocked(curr):
+                return curr
+            x, y = curr
+            for nxt in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if nxt not in visited and max(abs(nxt[0] - cell[0]), abs(nxt[1] - cell[1])) <= max_radius:
+                    visited.add(nxt)
+                    q.append(nxt)
+        return cell
+
+    def _local_path(self, start: Cell, goal: Cell, margin: int) -> Tuple[List[Cell], Dict[str, float]]:
+        """Fine A* inside the bounding box of start/goal grown by margin cells."""
+        lo = (min(start[0], goal[0]) - margin, min(start[1], goal[1]) - margin)
+        hi = (max(start[0], goal[0]) + margin, max(start[1], goal[1]) + margin)
+        window = self._window(lo, hi)
+        cells, stats = astar_grid(window, (start[0] - lo[0], start[1] - lo[1]), (goal[0] - lo[0], goal[1] - lo[1]))
+        return [(x + lo[0], y + lo[1]) for x, y in cells], stats
+
+    def _abstract_path(self, start: Cell, goal: Cell) -> Tuple[List[Cell], int]:
+        """A* over cluster entrances with start and goal temporarily linked in."""
+        k_start, k_goal = self._cluster_of(start), self._cluster_of(goal)
+        intra_s, _ = self._cluster_graph(k_start)
+        intra_g, _ = self._cluster_graph(k_goal)
+        from_start = [(n, self._intra_cost(k_start, start, n)) for n in intra_s]
+        to_goal = {n: self._intra_cost(k_goal, n, goal) for n in intra_g}
+        if k_start == k_goal:
+            direct = self._intra_cost(k_start, start, goal)
+            if direct < INF:
+                from_start.append((goal, direct))
+
+        g = {start: 0.0}
+        parent: Dict[Cell, Optional[Cell]] = {start: None}
+        closed = set()
+        frontier = [(octile(start, goal), start)]
+        expanded = 0
+        while frontier and expanded < self.max_abstract_expansions:
+            _, u = heapq.heappop(frontier)
+            if u in closed:
+                continue
+            closed.add(u)
+            expanded += 1
+            if u == goal:
+                break
+            if u == start:
+                edges = from_start
+            else:
+                intra, partners = self._cluster_graph(self._cluster_of(u))
+                edges = intra.get(u, []) + [(p, 1.0) for p in partners.get(u, [])]
+                if u in to_goal and to_goal[u] < INF:
+                    edges = edges + [(goal, to_goal[u])]
+            gu = g[u]
+            for v, cost in edges:
+                if cost == INF or v in closed:
+                    continue
+                ng = gu + cost
+                if ng < g.get(v, INF):
+                    g[v] = ng
+                    parent[v] = u
+                    heapq.heappush(frontier, (ng + octile(v, goal), v))
+
+        self.last_search_stats = {"nodes_expanded": expanded, "path_cost": g.get(goal, INF)}
+        if goal not in parent:
+            return [], expanded
+        path = []
+        curr = goal
+        while curr is not None:
+            path.append(curr)
+            curr = parent[curr]
+        path.reverse()
+        return path, expanded
+
+    def find_path(self, start_pos: List[float], goal_pos: List[float]) -> List[List[float]]:
+        start = self._to_grid(start_pos)
+        goal = self._to_grid(goal_pos)
+        if self._blocked(start):
+            start = self._nearest_free(start)
+        if self._blocked(goal):
+            goal = self._nearest_free(goal)
+
+        window_cells = max(1, int(self.local_window / self.res))
+        if max(abs(goal[0] - start[0]), abs(goal[1] - start[1])) <= window_cells:
+            cells, self.last_search_stats = self._local_path(start, goal, margin=self.cluster)
+            self.last_path_cells = cells
+            return [self._to_coord(c) for c in cells]
+
+        waypoints, expanded = self._abstract_path(start, goal)
+        if not waypoints:
+            self.last_path_cells = []
+            return []
+
+        # Refine at full resolution only up to the last waypoint inside the local window
+        j = 1
+        while j + 1 < len(waypoints) and octile(start, waypoints[j + 1]) <= window_cells:
+            j += 1
+        fine, stats = self._local_path(start, waypoints[j], margin=self.cluster // 2)
+        if not fine:
+            fine = waypoints[:j + 1]
+        cells = fine + waypoints[j + 1:]
+        self.last_search_stats = {"nodes_expanded": expanded + stats["nodes_expanded"],
+                                  "path_cost": self.last_search_stats["path_cost"]}
+        self.last_path_cells = cells
+        return [self._to_coord(c) for c in cells]
+
+    def find_paths_to_goals(self, start_pos: List[float], goal_positions: List[List[float]]) -> Tuple[List[float], List[List[List[float]]]]:
+        """
+        Path costs (meters) and paths from one start to K goals, same contract as
+        TacticalPathfinder.find_paths_to_goals. The abstract graph has no
+        multi-target sweep, so this runs find_path per goal; cluster graphs are
+        cached, so later goals mostly reuse the first search's work.
+        """
+        costs, paths = [], []
+        expanded = 0
+        for goal_pos in goal_positions:
+            path = self.find_path(start_pos, goal_pos)
+            expanded += self.last_search_stats["nodes_expanded"]
+            costs.append(self.last_search_stats["path_cost"] * self.res if path else INF)
+            paths.append(path)
+        self.last_search_stats = {"nodes_expanded": expanded, "path_cost": min(costs, default=INF)}
+        return costs, paths
+
+    def plan_many(self, pairs: List[Tuple[List[float], List[float]]], processes: Optional[int] = None) -> List[List[List[float]]]:
+        """
+        Plans N (start, goal) pairs, same contract as TacticalPathfinder.plan_many.
+        The sparse tiles and cluster caches live in this process, so pairs run
+        sequentially against them; `processes` is accepted for compatibility.
+        """
+        return [self.find_path(s, g) for s, g in pairs]
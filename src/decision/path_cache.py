@@ -0,0 +1,56 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+
+class PathCache:
+    """
+    LRU cache of planned paths keyed on (grid key, goal cell).
+
+    Each entry indexes every cell along its path, so a lookup from any start
+    cell on that path returns the remaining suffix. This lets the agent advance
+    along a cached path instead of searching again while the grid is unchanged.
+    For sparse waypoint paths, `anchors` gives the index of each waypoint in
+    `cells`; a hit then returns the waypoints from the segment being travelled.
+    """
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self.entries: "OrderedDict[Tuple[Hashable, Cell], Tuple[Dict[Cell, int], List[List[float]], Optional[List[int]]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, grid_key: Hashable, start: Cell, goal: Cell) -> Optional[List[List[float]]]:
+        entry = self.entries.get((grid_key, goal))
+        if entry is not None:
+            index, path, anchors = entry
+            i = index.get(start)
+            if i is not None:
+                self.entries.move_to_end((grid_key, goal))
+                self.hits += 1
+                if anchors is None:
+                    return path[i:]
+                return path[max(bisect_right(anchors, i) - 1, 0):]
+        self.misses += 1
+        return None
+
+    def put(self, grid_key: Hashable, goal: Cell, cells: List[Cell], path: List[List[float]],
+            anchors: Optional[List[int]] = None):
+        if not cells:
+            return
+        # Keep the first occurrence so a lookup never skips part of the path
+        index: Dict[Cell, int] = {}
+        for i, c in enumerate(cells):
+            index.setdefault(c, i)
+        self.entries[(grid_key, goal)] = (index, path, anchors)
+        self.entries.move_to_end((grid_key, goal))
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"cache_hits": self.hits, "cache_misses": self.misses, "cache_size": len(self.entries)}
@@ -1,17 +1,70 @@
-import heapq
+import hashlib
+import os
 import numpy as np
-from typing import List, Tuple
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+from .dstar_lite import DStarLite
+from .search import INF, astar_grid, densify, dijkstra_multi_target, shortcut_path, theta_star_grid
+
+# Per-process view of the shared planning layers, set up by _attach_shared_grid
+_WORKER_LAYERS = {}
+
+
+def _attach_shared_grid(shm_name: str, shape: Tuple[int, int], has_penalty: bool):
+    """Pool initializer: maps the parent's grid (+ penalty) without copying it."""
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(name=shm_name)
+    layers = np.ndarray((2,) + tuple(shape), dtype=np.float64, buffer=shm.buf)
+    _WORKER_LAYERS["shm"] = shm
+    _WORKER_LAYERS["grid"] = layers[0]
+    _WORKER_LAYERS["penalty"] = layers[1] if has_penalty else None
+
+
+def _plan_shared(pair: Tuple[Tuple[int, int], Tuple[int, int]]) -> List[Tuple[int, int]]:
+    cells, _ = astar_grid(_WORKER_LAYERS["grid"], pair[0], pair[1], penalty=_WORKER_LAYERS["penalty"])
+    return cells
+
 
 class TacticalPathfinder:
-    def __init__(self, grid_size: int = 40, resolution: float = 1.0):
+    def __init__(self, grid_size: int = 40, resolution: float = 1.0, incremental: bool = False,
+                 robot_radius: float = 0.0, inflation_radius: float = 0.0, cost_weight: float = 4.0,
+                 any_angle: bool = False, los_cost_limit: float = 0.5):
         """
         grid_size: size of the arena in meters (assumed square)
         resolution: meters per grid cell
+        incremental: keep D* Lite search state between calls and only repair changed cells
+        robot_radius: default inflation (meters) added to every stamped obstacle
+        inflation_radius: clearance (meters) over which a graded costmap penalises cells
+                          next to obstacles; 0 keeps plain binary occupancy
+        cost_weight: extra step cost multiplier for a cell at full inflation cost
+        any_angle: return a sparse waypoint path (lazy Theta*, or D* Lite when incremental,
+                   followed by a line-of-sight shortcut pass) instead of one point per cell
+        los_cost_limit: inflation cost above which any-angle segments may not pass
         """
         self.size = int(grid_size / resolution)
         self.res = resolution
         self.offset = grid_size / 2
         self.grid = np.zeros((self.size, self.size))
+        # Bumped by every grid edit (stamp_obstacles / clear_obstacles), so the costmap
+        # and D* Lite can skip comparing whole layers on ticks where nothing changed
+        self.grid_version = 0
+        self._synced_version = None
+        self._penalty_cache = None
+        self.incremental = incremental
+        self.robot_radius = robot_radius
+        self._planner = None
+        self.last_search_stats = {"nodes_expanded": 0, "path_cost": INF}
+        self.last_path_cells: List[Tuple[int, int]] = []
+        self.last_waypoint_anchors: Optional[List[int]] = None
+        self.any_angle = any_angle
+        self.los_cost_limit = los_cost_limit
+        self._clipped_goal = None
+        self._disk_offsets: Dict[int, np.ndarray] = {}
+        self.cost_weight = cost_weight
+        self.costmap = None
+        if inflation_radius > 0:
+            from .costmap import InflationCostmap
+            self.costmap = InflationCostmap(self.grid.shape, resolution, inflation_radius)
 
     def _to_grid(self, pos: List[float]) -> Tuple[int, int]:
         gx = int((pos[0] + self.offset) / self.res)
@@ -26,29 +79,87 @@ class TacticalPathfinder:
         cy = (grid_pos[1] * self.res) - self.offset
         return [cx, cy]
 
-    def update_obstacles(self, entities: List[any]):
-        """Clears grid and marks obstacle zones based on detected entities."""
-        self.grid = np.zeros((self.size, self.size))
+    def update_obstacles(self, entities: List[any], default_radius: float = 1.0,
+                         inflation: Optional[float] = None):
+        """
+        Clears grid and marks obstacle zones based on detected entities.
+        Entities are placed from metadata["position"] ([x, y] in meters) with an
+        optional metadata["radius"]; entities without a position are skipped
+        until depth or LIDAR placement is available.
+        """
+        self.clear_obstacles()
+        centers, radii = [], []
         for ent in entities:
-            # For Path E, we treat certain labels as obstacles
-            # We don't have exact coordinates for vision entities in this mock,
-            # so we'll simulate an obstacle at a known distance if it's high risk.
-            # In a real system, we'd use Depth or LIDAR to place them.
-            pass
+            pos = ent.metadata.get("position") if ent.metadata else None
+            if pos is None:
+                continue
+            centers.append(pos[:2])
+            radii.append(ent.metadata.get("radius", default_radius))
+        if centers:
+            self.stamp_obstacles(centers, radii, inflation=inflation)
+
+    def grid_signature(self) -> bytes:
+        """Content hash of the occupancy grid, used to key cached paths."""
+        return hashlib.blake2b(np.packbits(self.grid != 0).tobytes(), digest_size=16).digest()
+
+    def clear_obstacles(self):
+        self.grid = np.zeros((self.size, self.size))
+        self.grid_version += 1
 
     def add_manual_obstacle(self, pos: List[float], radius: float = 2.0):
-        gx, gy = self._to_grid(pos)
-        r_cells = int(radius / self.res)
-        for i in range(gx - r_cells, gx + r_cells + 1):
-            for j in range(gy - r_cells, gy + r_cells + 1):
-                if 0 <= i < self.size and 0 <= j < self.size:
-                    dist = ((i - gx)**2 + (j - gy)**2)**0.5
-                    if dist <= r_cells:
-                        self.grid[i, j] = 1 # Mark as blocked
+        self.stamp_obstacles([pos], [radius], inflation=0.0)
+
+    def stamp_obstacles(self, centers: Sequence[Sequence[float]], radii, inflation: Optional[float] = None):
+        """
+        Marks N disk obstacles in one vectorized pass.
+        centers: (N, 2) positions in meters; radii: scalar or (N,) radii in meters.
+        inflation: extra clearance added to each radius (defaults to robot_radius).
+        """
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        if len(centers) == 0:
+            return
+        if inflation is None:
+            inflation = self.robot_radius
+        radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+        # Same cell mapping and clipping as _to_grid
+        cells = ((centers + self.offset) / self.res).astype(int)
+        np.clip(cells, 0, self.size - 1, out=cells)
+        r_cells = ((radii + inflation) / self.res).astype(int)
+
+        # Group by radius so each group is a single broadcasted scatter
+        for r in np.unique(r_cells):
+            group = cells[r_cells == r]
+            offsets = self._disk_mask_offsets(int(r))
+            pts = (group[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+            inside = (pts >= 0).all(axis=1) & (pts < self.size).all(axis=1)
+            pts = pts[inside]
+            self.grid[pts[:, 0], pts[:, 1]] = 1 # Mark as blocked
+        self.grid_version += 1
+
+    def _disk_mask_offsets(self, r_cells: int) -> np.ndarray:
+        """Cached (K, 2) cell offsets of a disk with radius r_cells."""
+        offsets = self._disk_offsets.get(r_cells)
+        if offsets is None:
+            span = np.arange(-r_cells, r_cells + 1)
+            di, dj = np.meshgrid(span, span, indexing="ij")
+            mask = di**2 + dj**2 <= r_cells**2
+            offsets = np.stack([di[mask], dj[mask]], axis=1)
+            self._disk_offsets[r_cells] = offsets
+        return offsets
+
+    def in_bounds(self, pos: List[float]) -> bool:
+        """True if pos lies inside the arena covered by the grid."""
+        return all(-self.offset <= p < self.size * self.res - self.offset for p in pos[:2])
 
     def find_path(self, start_pos: List[float], goal_pos: List[float]) -> List[List[float]]:
         start = self._to_grid(start_pos)
         goal = self._to_grid(goal_pos)
+        self._sync_costmap()
+        if not self.in_bounds(goal_pos) and goal_pos != self._clipped_goal:
+            # Warn once per goal instead of silently planning to the clipped border cell
+            print(f"[PATHFINDER] Goal {goal_pos} is outside the {self.size * self.res:.0f} m arena; "
+                  f"clipped to {self._to_coord(goal)}. Use HierarchicalPathfinder for large sites.")
+        self._clipped_goal = None if self.in_bounds(goal_pos) else list(goal_pos)
         
         # If start is blocked, find nearest free cell
         if self.grid[start] == 1:
@@ -58,44 +169,113 @@ class TacticalPathfinder:
         if self.grid[goal] == 1:
             goal = self._find_nearest_free(goal)
 
-        frontier = []
-        heapq.heappush(frontier, (0, start))
-        came_from = {start: None}
-        cost_so_far = {start: 0}
-
-        while frontier:
-            current_priority, current = heapq.heappop(frontier)
-
-            if current == goal:
-                break
-
-            for next_node in self._get_neighbors(current):
-                new_cost = cost_so_far[current] + 1
-                if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
-                    cost_so_far[next_node] = new_cost
-                    priority = new_cost + self._heuristic(goal, next_node)
-                    heapq.heappush(frontier, (priority, next_node))
-                    came_from[next_node] = current
-
-        # Reconstruct path
-        path = []
-        curr = goal
-        if goal not in came_from:
-            return [] # No path found
-            
-        while curr is not None:
-            path.append(self._to_coord(curr))
-            curr = came_from[curr]
-        
-        path.reverse()
-        return path
+        if self.incremental:
+            cells = self._find_path_incremental(start, goal)
+        elif self.any_angle:
+            cells, self.last_search_stats = theta_star_grid(self.grid, start, goal, los_blocked=self._los_blocked(),
+                                                              penalty=self._penalty())
+        else:
+            cells, self.last_search_stats = astar_grid(self.grid, start, goal, penalty=self._penalty())
+
+        if self.any_angle:
+            waypoints = shortcut_path(self.grid, cells, penalty=self._penalty())
+            self.last_path_cells, self.last_waypoint_anchors = densify(waypoints)
+            return [self._to_coord(c) for c in waypoints]
+        self.last_path_cells = cells
+        self.last_waypoint_anchors = None
+        return [self._to_coord(c) for c in cells]
+
+    def _resolve_endpoints(self, start_pos: List[float], goal_pos: List[float]) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        start = self._to_grid(start_pos)
+        goal = self._to_grid(goal_pos)
+        if self.grid[start] == 1:
+            start = self._find_nearest_free(start)
+        if self.grid[goal] == 1:
+            goal = self._find_nearest_free(goal)
+        return start, goal
+
+    def find_paths_to_goals(self, start_pos: List[float], goal_positions: List[List[float]]) -> Tuple[List[float], List[List[List[float]]]]:
+        """
+        Path costs and paths from one start to K goals in a single multi-target
+        Dijkstra sweep. Costs are in meters on a plain grid; with a costmap they are
+        penalized path costs (meters x inflation cost), comparable with each other
+        but not pure lengths. Unreachable goals get inf and an empty path.
+        """
+        self._sync_costmap()
+        endpoints = [self._resolve_endpoints(start_pos, g) for g in goal_positions]
+        start = endpoints[0][0] if endpoints else self._to_grid(start_pos)
+        goals = [goal for _, goal in endpoints]
+        distances, cell_paths, self.last_search_stats = dijkstra_multi_target(self.grid, start, goals, penalty=self._penalty())
+        return ([d * self.res for d in distances],
+                [[self._to_coord(c) for c in cells] for cells in cell_paths])
+
+    def plan_many(self, pairs: List[Tuple[List[float], List[float]]], processes: Optional[int] = None) -> List[List[List[float]]]:
+        """
+        Plans N independent (start, goal) pairs across a process pool. The grid and
+        cost layer are placed in shared memory once, so workers never copy them.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        self._sync_costmap()
+        cell_pairs = [self._resolve_endpoints(s, g) for s, g in pairs]
+        penalty = self._penalty()
+        shm = shared_memory.SharedMemory(create=True, size=2 * self.grid.size * 8)
+        try:
+            layers = np.ndarray((2,) + self.grid.shape, dtype=np.float64, buffer=shm.buf)
+            layers[0] = self.grid
+            layers[1] = 0.0 if penalty is None else penalty
+            workers = processes or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared_grid,
+                                     initargs=(shm.name, self.grid.shape, penalty is not None)) as pool:
+                chunk = max(1, len(cell_pairs) // (4 * workers))
+                cell_paths = list(pool.map(_plan_shared, cell_pairs, chunksize=chunk))
+            del layers
+        finally:
+            shm.close()
+            shm.unlink()
+        return [[self._to_coord(c) for c in cells] for cells in cell_paths]
+
+    def _find_path_incremental(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Replans with D* Lite, reusing the previous search unless the goal cell moved."""
+        penalty = self._penalty()
+        if self._planner is None or self._planner.goal != goal or self._planner.grid.shape != self.grid.shape:
+            self._planner = DStarLite(self.grid, start, goal, penalty=penalty, version=self.grid_version)
+            expanded = self._planner.nodes_expanded
+        else:
+            before = self._planner.nodes_expanded
+            self._planner.update(start, self.grid, penalty=penalty, version=self.grid_version)
+            expanded = self._planner.nodes_expanded - before
+        self.last_search_stats = {"nodes_expanded": expanded, "path_cost": self._planner.g.get(start, INF)}
+        return self._planner.extract_path()
+
+    def _los_blocked(self) -> np.ndarray:
+        """Cells a straight any-angle segment may not cross: obstacles and their high-cost halo."""
+        blocked = self.grid != 0
+        if self.costmap is not None:
+            blocked = blocked | (self.costmap.cost > self.los_cost_limit)
+        return blocked
+
+    def _sync_costmap(self):
+        if self.costmap is not None and self._synced_version != self.grid_version:
+            self.costmap.update(self.grid)
+            self._synced_version = self.grid_version
+
+    def _penalty(self) -> Optional[np.ndarray]:
+        if self.costmap is None:
+            return None
+        if self._penalty_cache is None or self._penalty_cache[0] != self.grid_version:
+            self._penalty_cache = (self.grid_version, self.costmap.cost * self.cost_weight)
+        return self._penalty_cache[1]
 
     def _find_nearest_free(self, pos: Tuple[int, int]) -> Tuple[int, int]:
-        """BFS to find the closest non-blocked cell."""
-        q = [pos]
+        """Closest non-blocked cell: O(1) costmap lookup, or BFS without a costmap."""
+        if self.costmap is not None:
+            return self.costmap.nearest_free(pos)
+        q = deque([pos])
         visited = {pos}
         while q:
-            curr = q.pop(0)
+            curr = q.popleft()
             if self.grid[curr] == 0:
                 return curr
             for neighbor in self._get_neighbors_raw(curr):
@@ -108,17 +288,3 @@ class TacticalPathfinder:
         (x, y) = pos
         neighbors = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
         return [(nx, ny) for nx, ny in neighbors if 0 <= nx < self.size and 0 <= ny < self.size]
-
-    def _heuristic(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def _get_neighbors(self, pos):
-        (x, y) = pos
-        neighbors = [(x+1, y), (x-1, y), (x, y+1), (x, y-1), 
-                     (x+1, y+1), (x-1, y-1), (x+1, y-1), (x-1, y+1)]
-        results = []
-        for nx, ny in neighbors:
-            if 0 <= nx < self.size and 0 <= ny < self.size:
-                if self.grid[nx, ny] == 0: # Free
-                    results.append((nx, ny))
-        return results
@@ -0,0 +1,470 @@
+import heapq
+import math
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+
+SQRT2 = math.sqrt(2.0)
+INF = float("inf")
+
+# A* expansions after which astar_grid hands the query to compiled Dijkstra:
+# past this point a Python loop costs more than settling the whole grid in C
+ASTAR_EXPANSION_BUDGET = 2000
+
+
+def octile(a: Tuple[int, int], b: Tuple[int, int]) -> float:
+    """Exact 8-connected distance on an empty grid (admissible with sqrt(2) diagonals)."""
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return max(dx, dy) + (SQRT2 - 1.0) * min(dx, dy)
+
+
+def padded_free_mask(grid: np.ndarray) -> bytes:
+    """Flat free-cell mask (1 = free) of the grid padded with a blocked one-cell border."""
+    padded = np.zeros((grid.shape[0] + 2, grid.shape[1] + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = grid == 0
+    return padded.tobytes()
+
+
+def neighbor_offsets(width: int) -> List[Tuple[int, float]]:
+    """Flat index offsets and step costs of the 8 moves in a padded grid of row width `width`."""
+    return [(width, 1.0), (-width, 1.0), (1, 1.0), (-1, 1.0),
+            (width + 1, SQRT2), (-width - 1, SQRT2), (width - 1, SQRT2), (-width + 1, SQRT2)]
+
+
+def grid_graph(grid: np.ndarray, penalty: Optional[np.ndarray] = None) -> Tuple[csr_matrix, int]:
+    """
+    The padded grid's 8-connected move graph as a CSR matrix over flat cell
+    indices (row width = grid width + 2), built directly in row order without
+    a COO sort. Edge weights are the step cost times the entered cell's
+    (1 + penalty). Returns (graph, padded row width).
+    """
+    sx, sy = grid.shape
+    width = sy + 2
+    n = (sx + 2) * width
+    free = np.zeros((sx + 2, width), dtype=bool)
+    free[1:-1, 1:-1] = grid == 0
+    free = free.ravel()
+    offsets, steps = zip(*neighbor_offsets(width))
+    cells = np.flatnonzero(free)
+    nbrs = cells[:, None] + np.asarray(offsets)[None, :]
+    ok = free[nbrs]
+    weights = np.broadcast_to(np.asarray(steps), nbrs.shape)[ok]
+    cols = nbrs[ok]
+    if penalty is not None:
+        padded_pen = np.zeros((sx + 2, width), dtype=float)
+        padded_pen[1:-1, 1:-1] = penalty
+        weights = weights * (1.0 + padded_pen.ravel()[cols])
+    counts = np.zeros(n, dtype=np.int64)
+    counts[cells] = ok.sum(axis=1)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return csr_matrix((weights, cols, indptr), shape=(n, n)), width
+
+
+def _dijkstra_grid(grid: np.ndarray, s: int, t: int,
+                   penalty: Optional[np.ndarray]) -> Tuple[List[Tuple[int, int]], Dict[str, float]]:
+    """Single-source Dijkstra in compiled code; g-scores and parents come back as NumPy arrays."""
+    graph, width = grid_graph(grid, penalty)
+    g, parent = csgraph_dijkstra(graph, indices=s, return_predecessors=True)
+    stats = {"nodes_expanded": int(np.isfinite(g).sum()), "path_cost": float(g[t]), "engine": "dijkstra"}
+    if not np.isfinite(g[t]):
+        return [], stats
+    path = []
+    cur = t
+    while cur >= 0:
+        x, y = divmod(int(cur), width)
+        path.append((x - 1, y - 1))
+        cur = parent[cur]
+    path.reverse()
+    return path, stats
+
+
+def astar_grid(grid: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int],
+               penalty: Optional[np.ndarray] = None,
+               budget: int = ASTAR_EXPANSION_BUDGET) -> Tuple[List[Tuple[int, int]], Dict[str, float]]:
+    """
+    Shortest 8-connected path over an occupancy grid (0 = free), moves costing
+    1 / sqrt(2).
+
+    Easy queries (open ground, short detours) run A* over flat cell indices:
+    the grid is padded with a blocked border so neighbour generation needs no
+    bounds checks, the octile heuristic is evaluated lazily per generated cell,
+    a closed set prevents stale heap entries from being expanded again, and
+    equal-f ties go to the cell with the smaller h (the heuristic itself stays
+    admissible, so paths are optimal). Once A* has expanded `budget` cells the
+    query is handed to scipy's compiled Dijkstra over the grid's CSR graph,
+    which settles a whole 400x400 maze in tens of milliseconds.
+    penalty: optional per-cell extra cost multiplier (>= 0) applied to the step
+    entering a cell; the heuristic stays admissible because it only grows costs.
+
+    Returns (path as list of (x, y) cells, stats with nodes_expanded, path_cost
+    and engine). The path is empty if the goal is unreachable.
+    """
+    sx, sy = grid.shape
+    width = sy + 2
+    n = (sx + 2) * width
+    # Scalar indexing into bytes/lists is several times faster than into NumPy
+    # arrays, so the A* loop works on flat buffers built from the NumPy masks.
+    free = padded_free_mask(grid)
+    if penalty is not None:
+        padded_pen = np.zeros((sx + 2, width), dtype=float)
+        padded_pen[1:-1, 1:-1] = penalty
+        scale = (1.0 + padded_pen.ravel()).tolist()
+    else:
+        scale = None
+
+    s = (start[0] + 1) * width + (start[1] + 1)
+    t = (goal[0] + 1) * width + (goal[1] + 1)
+    tx, ty = divmod(t, width)
+    moves = neighbor_offsets(width)
+    diag = SQRT2 - 1.0
+
+    g = [INF] * n
+    parent = [-1] * n
+    closed = bytearray(n)
+    g[s] = 0.0
+    frontier = [(0.0, 0.0, s)]
+    expanded = 0
+
+    while frontier:
+        _, _, cur = heapq.heappop(frontier)
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        expanded += 1
+        if cur == t:
+            break
+        if expanded > budget:
+            path, stats = _dijkstra_grid(grid, s, t, penalty)
+            stats["nodes_expanded"] += expanded
+            return path, stats
+        gc = g[cur]
+        for off, step in moves:
+            nxt = cur + off
+            if not free[nxt] or closed[nxt]:
+                continue
+            ng = gc + (step * scale[nxt] if scale is not None else step)
+            if ng < g[nxt]:
+                g[nxt] = ng
+                parent[nxt] = cur
+                x, y = divmod(nxt, width)
+                dx = x - tx if x > tx else tx - x
+                dy = y - ty if y > ty else ty - y
+                h = dx + diag * dy if dx > dy else dy + diag * dx
+                heapq.heappush(frontier, (ng + h, h, nxt))
+
+    stats = {"nodes_expanded": expanded, "path_cost": g[t], "engine": "astar"}
+    if g[t] == INF:
+        return [], stats
+
+    path = []
+    cur = t
+    while cur != -1:
+        x, y = divmod(cur, width)
+        path.append((x - 1, y - 1))
+        cur = parent[cur]
+    path.reverse()
+    return path, stats
+
+
+def dijkstra_multi_target(grid: np.ndarray, start: Tuple[int, int], goals: List[Tuple[int, int]],
+                          penalty: Optional[np.ndarray] = None) -> Tuple[List[float], List[List[Tuple[int, int]]], Dict[str, float]]:
+    """
+    One Dijkstra sweep from `start` that stops once every goal is settled.
+
+    Returns (distance per goal in cells, path per goal, stats); unreachable goals
+    get an infinite distance and an empty path. Cells are expanded once no matter
+    how many goals are requested.
+    """
+    sx, sy = grid.shape
+    width = sy + 2
+    n = (sx + 2) * width
+    free = padded_free_mask(grid)
+    if penalty is not None:
+        padded_pen = np.zeros((sx + 2, width), dtype=float)
+        padded_pen[1:-1, 1:-1] = penalty
+        scale = (1.0 + padded_pen.ravel()).tolist()
+    else:
+        scale = None
+
+    s = (start[0] + 1) * width + (start[1] + 1)
+    targets = [(x + 1) * width + (y + 1) for x, y in goals]
+    remaining = set(t for t in targets if free[t] or t == s)
+    moves = neighbor_offsets(width)
+
+    g = [INF] * n
+    parent = [-1] * n
+    closed = bytearray(n)
+    g[s] = 0.0
+    frontier = [(0.0, s)]
+    expanded = 0
+
+    while frontier and remaining:
+        gc, cur = heapq.heappop(frontier)
+        if closed[cur]:
+            continue
+        closed[cur] = 1
+        expanded += 1
+        remaining.discard(cur)
+        for off, step in moves:
+            nxt = cur + off
+            if not free[nxt] or closed[nxt]:
+                continue
+            ng = gc + (step * scale[nxt] if scale is not None else step)
+            if ng < g[nxt]:
+                g[nxt] = ng
+                parent[nxt] = cur
+                heapq.heappush(frontier, (ng, nxt))
+
+    distances, paths = [], []
+    for t in targets:
+        distances.append(g[t])
+        path = []
+        if g[t] < INF:
+            cur = t
+            while cur != -1:
+                x, y = divmod(cur, width)
+                path.append((x - 1, y - 1))
+                cur = parent[cur]
+            path.reverse()
+        paths.append(path)
+    return distances, paths, {"nodes_expanded": expanded}
+
+
+def _ray_cells(origin: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """(K, S, 2) cells sampled every half cell along the K segments origin -> targets."""
+    delta = targets - origin
+    longest = int(np.abs(delta).max()) if len(delta) else 0
+    t = np.linspace(0.0, 1.0, 2 * longest + 2)
+    pts = origin[None, None, :] + t[None, :, None] * delta[:, None, :]
+    return np.floor(pts + 0.5).astype(np.intp)
+
+
+def los_mask(blocked: np.ndarray, origin, targets, penalty: Optional[np.ndarray] = None):
+    """
+    Vectorized line-of-sight from one cell to K target cells.
+    Returns (visible mask, highest penalty crossed by each ray or None).
+    """
+    origin = np.asarray(origin, dtype=float)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+    cells = _ray_cells(origin, targets)
+    visible = ~blocked[cells[..., 0], cells[..., 1]].any(axis=1)
+    crossed = penalty[cells[..., 0], cells[..., 1]].max(axis=1) if penalty is not None else None
+    return visible, crossed
+
+
+def line_of_sight(blocked: bytes, width: int, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    """
+    Scalar version of los_mask for a single segment (same half-cell sampling).
+    blocked: flat row-major occupancy bytes of a grid with rows of `width` cells.
+    """
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    steps = 2 * max(abs(dx), abs(dy)) + 1
+    floor = math.floor
+    for i in range(steps + 1):
+        t = i / steps
+        if blocked[floor(ax + t * dx + 0.5) * width + floor(ay + t * dy + 0.5)]:
+            return False
+    return True
+
+
+def segment_cost(blocked: bytes, penalty: List[float], width: int, a: Tuple[int, int], b: Tuple[int, int]) -> float:
+    """
+    Penalized cost of the straight segment a -> b, INF without line of sight.
+    Same half-cell sampling as line_of_sight; each sample after a weighs the
+    length by (1 + penalty) of its cell, matching the grid planners' cost of
+    entering a cell. penalty: flat row-major values, like blocked.
+    """
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    steps = 2 * max(abs(dx), abs(dy)) + 1
+    floor = math.floor
+    if blocked[ax * width + ay]:
+        return INF
+    total = 0.0
+    for i in range(1, steps + 1):
+        t = i / steps
+        k = floor(ax + t * dx + 0.5) * width + floor(ay + t * dy + 0.5)
+        if blocked[k]:
+            return INF
+        total += penalty[k]
+    return math.hypot(dx, dy) * (1.0 + total / steps)
+
+
+def _segment_cost_np(blocked: np.ndarray, penalty: np.ndarray, a: Tuple[int, int], b: Tuple[int, int]) -> float:
+    """segment_cost for long segments, sampled in one NumPy call."""
+    cells = _ray_cells(np.asarray(a, dtype=float), np.asarray([b], dtype=float))[0]
+    if blocked[cells[:, 0], cells[:, 1]].any():
+        return INF
+    return math.hypot(b[0] - a[0], b[1] - a[1]) * (1.0 + float(penalty[cells[1:, 0], cells[1:, 1]].mean()))
+
+
+def shortcut_path(grid: np.ndarray, cells: List[Tuple[int, int]], penalty: Optional[np.ndarray] = None,
+                  max_lookahead: int = 256) -> List[Tuple[int, int]]:
+    """
+    Greedy line-of-sight shortcutting: from each anchor jump to the furthest
+    visible cell of the path, testing all candidates in one vectorized call.
+    With a penalty layer a shortcut may not cross cells costlier than the
+    stretch of path it replaces, so clearance from obstacles is preserved.
+    """
+    if len(cells) <= 2:
+        return list(cells)
+    blocked = grid != 0
+    pts = np.asarray(cells, dtype=float)
+    along = penalty[pts[:, 0].astype(int), pts[:, 1].astype(int)] if penalty is not None else None
+    out = [cells[0]]
+    i, n = 0, len(cells)
+    while i < n - 1:
+        hi = min(n - 1, i + max_lookahead)
+        visible, crossed = los_mask(blocked, pts[i], pts[i + 1:hi + 1], penalty)
+        if crossed is not None:
+            allowed = np.maximum.accumulate(np.maximum(along[i + 1:hi + 1], along[i]))
+            visible &= crossed <= allowed + 1e-9
+        ahead = np.flatnonzero(visible)
+        j = i + 1 + int(ahead[-1]) if len(ahead) else i + 1
+        out.append(cells[j])
+        i = j
+    return out
+
+
+def densify(waypoints: List[Tuple[int, int]]) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    Cells a robot passes through when following a waypoint path, plus the index
+    of each waypoint in that list. Both the nearest and the truncated cell of
+    every sample are kept, since positions map back to cells by truncation.
+    Only consecutive repeats are dropped, so a path that revisits a cell keeps
+    both visits and every anchor points at its own visit.
+    """
+    if not waypoints:
+        return [], []
+    cells = [tuple(waypoints[0])]
+    anchors = [0]
+    for a, b in zip(waypoints, waypoints[1:]):
+        origin = np.asarray(a, dtype=float)
+        delta = np.asarray(b, dtype=float) - origin
+        t = np.linspace(0.0, 1.0, 2 * int(np.abs(delta).max()) + 2)
+        pts = origin[None, :] + t[:, None] * delta[None, :]
+        both = np.stack([np.floor(pts + 0.5), np.floor(pts + 1e-9)], axis=1)
+        # Within each sample, list the cell further back along the segment first,
+        # so the sequence only moves forward and repeats stay consecutive
+        progress = (both - origin) @ delta
+        swap = progress[:, 0] > progress[:, 1]
+        both[swap] = both[swap, ::-1]
+        for c in map(tuple, both.reshape(-1, 2).astype(int).tolist()):
+            if c != cells[-1]:
+                cells.append(c)
+        # The last sample is b itself
+        anchors.append(len(cells) - 1)
+    return cells, anchors
+
+
+def theta_star_grid(grid: np.ndarray, start: Tuple[int, int], goal: Tuple[int, int],
+                    los_blocked: Optional[np.ndarray] = None,
+                    penalty: Optional[np.ndarray] = None) -> Tuple[List[Tuple[int, int]], Dict[str, float]]:
+    """
+    Lazy Theta* (Nash et al. 2010): any-angle A* where a node inherits its
+    parent's parent when the two can see each other. Line of sight is assumed on
+    generation and only verified when a node is expanded, so there is at most
+    one check per expansion. Returns the sparse waypoint path and stats.
+    los_blocked: cells that may not be crossed by a straight segment (defaults to grid != 0).
+    penalty: per-cell cost layer as in astar_grid. A segment costs its length
+             weighted by the penalty of the cells it crosses (segment_cost); on
+             generation it is estimated from the entered cell and settled, with
+             the line-of-sight check, when the node is expanded.
+    """
+    sx, sy = grid.shape
+    width = sy + 2
+    n = (sx + 2) * width
+    free = padded_free_mask(grid)
+    blocked_arr = grid != 0 if los_blocked is None else los_blocked
+    blocked = np.ascontiguousarray(blocked_arr, dtype=np.uint8).tobytes()
+    pen = np.asarray(penalty, dtype=float).ravel().tolist() if penalty is not None else None
+    s = (start[0] + 1) * width + (start[1] + 1)
+    t = (goal[0] + 1) * width + (goal[1] + 1)
+    tx, ty = divmod(t, width)
+    moves = neighbor_offsets(width)
+
+    g = [INF] * n
+    parent = [-1] * n
+    closed = bytearray(n)
+    g[s] = 0.0
+    parent[s] = s
+    # (f, h, cell): equal-f ties go to the cell nearer the goal
+    frontier = [(0.0, 0.0, s)]
+    expanded = 0
+
+    while frontier:
+        _, _, cur = heapq.heappop(frontier)
+        if closed[cur]:
+            continue
+        p = parent[cur]
+        px, py = divmod(p, width)
+        cx, cy = divmod(cur, width)
+        if p != cur:
+            a, b = (px - 1, py - 1), (cx - 1, cy - 1)
+            # Long segments are cheaper to test in one NumPy call than sample by sample
+            long_segment = max(abs(b[0] - a[0]), abs(b[1] - a[1])) > 32
+            if pen is None:
+                if long_segment:
+                    visible = bool(los_mask(blocked_arr, a, b)[0][0])
+                else:
+                    visible = line_of_sight(blocked, sy, a, b)
+            else:
+                seg = _segment_cost_np(blocked_arr, penalty, a, b) if long_segment else segment_cost(blocked, pen, sy, a, b)
+                visible = seg < INF
+                if visible:
+                    g[cur] = g[p] + seg
+        else:
+            visible = True
+        if not visible or (pen is not None and p != cur):
+            # Assumed visibility failed (or the settled segment is costlier than a
+            # grid step): fall back to the best expanded grid neighbour
+            best, best_parent = g[cur] if visible else INF, p if visible else -1
+            for off, step in moves:
+                nb = cur + off
+                if not closed[nb]:
+                    continue
+                if pen is not None:
+                    # segment_cost of a single step, without the line-of-sight test
+                    nx, ny = divmod(nb, width)
+                    step *= 1.0 + (pen[(nx - 1) * sy + ny - 1] + 2.0 * pen[(cx - 1) * sy + cy - 1]) / 3.0
+                if g[nb] + step < best:
+                    best, best_parent = g[nb] + step, nb
+            g[cur], parent[cur] = best, best_parent
+        closed[cur] = 1
+        expanded += 1
+        if cur == t:
+            break
+        p = parent[cur]
+        px, py = divmod(p, width)
+        gp = g[p]
+        for off, _ in moves:
+            nxt = cur + off
+            if not free[nxt] or closed[nxt]:
+                continue
+            nx, ny = divmod(nxt, width)
+            ng = gp + math.hypot(nx - px, ny - py)
+            if pen is not None:
+                ng += math.hypot(nx - px, ny - py) * pen[(nx - 1) * sy + ny - 1]
+            if ng < g[nxt]:
+                g[nxt] = ng
+                parent[nxt] = p
+                h = math.hypot(nx - tx, ny - ty)
+                heapq.heappush(frontier, (ng + h, h, nxt))
+
+    stats = {"nodes_expanded": expanded, "path_cost": g[t]}
+    if g[t] == INF:
+        return [], stats
+    path = []
+    cur = t
+    while True:
+        x, y = divmod(cur, width)
+        path.append((x - 1, y - 1))
+        if cur == s:
+            break
+        cur = parent[cur]
+    path.reverse()
+    return path, stats
@@ -2,34 +2,57 @@ import asyncio
 import os
 from datetime import datetime
 from .perception.simulator import RealitySimulator
-from .perception.vision import VisionEngine
 from .reasoning.symbolic import ReasoningEngine
-from .decision.agent import DecisionAgent
+from .decision.agent import DecisionAgent, create_pathfinder
 from .schema import RA3FullState, ReasoningState, ActionRecommendation
 from river import linear_model
 from river import metrics
+from river import preprocessing
 from .audio.voice import VoiceEngine
 from .bridge.ros2 import RA3RosBridge
 from .perception.interpreter import VisualInterpreter
+from .perception.features import FeatureStore
+from .perception.anomaly import AnomalyStage, create_anomaly_detector
 from .database.history import MissionDatabase
 
+# Auto-pause needs a CRITICAL conclusion *and* the smoothed hazard belief to agree,
+# so a single flickering frame stops the robot (via the decision) without latching a pause
+AUTO_PAUSE_SAFETY = 0.5
+
 class RA3Agent:
     def __init__(self, mode="sim"):
         self.mode = mode
         self.perception_sim = RealitySimulator()
-        self.perception_real = VisionEngine() if mode == "real" else None
+        # RA3_CAMERAS: comma-separated camera indices, video files or "synthetic" sources
+        cameras = [int(s) if s.strip().isdigit() else s.strip()
+                   for s in os.environ.get("RA3_CAMERAS", "0").split(",")]
+        # RA3_DETECTOR: "ultralytics" (default) or "onnx"; RA3_DETECTOR_INT8=1 uses quantized weights
+        backend = os.environ.get("RA3_DETECTOR", "ultralytics")
+        backend_options = {"quantize": True} if backend == "onnx" and os.environ.get("RA3_DETECTOR_INT8") == "1" else {}
+        self.perception_real = None
+        if mode == "real":
+            # cv2 / detector runtimes load only for real perception
+            from .perception.vision import VisionEngine
+            self.perception_real = VisionEngine(sources=cameras, backend=backend, backend_options=backend_options)
         
         if self.perception_real:
             self.perception_real.start()
             
         self.reasoning = ReasoningEngine()
-        self.decision = DecisionAgent()
+        # RA3_PLANNER: "tactical" (default, 40 m arena) or "hierarchical" (large sites)
+        self.decision = DecisionAgent(create_pathfinder(os.environ.get("RA3_PLANNER", "tactical")))
         self.running = False
         self.paused = False
         
         # Online Learning Model: Predict safety score based on sensors
-        self.model = linear_model.LinearRegression()
+        # Rolling features span very different scales (slopes vs temperatures), so standardize first
+        self.model = preprocessing.StandardScaler() | linear_model.LinearRegression()
         self.metric = metrics.MAE()
+        # Rolling per-sensor statistics shared by reasoning and the learner
+        self.features = FeatureStore()
+        # RA3_ANOMALY: streaming anomaly detector, "zscore" (default), "hst" or "none"
+        detector = create_anomaly_detector(os.environ.get("RA3_ANOMALY", "zscore"))
+        self.anomaly = AnomalyStage(detector) if detector else None
         self.learning_step = 0
         self.last_reset_time = 0
         
@@ -38,11 +61,12 @@ class RA3Agent:
         self.goal_pos = [10.0, 10.0]
         
         # Audio Layer for Path D
-        self.voice = VoiceEngine()
+        # Speech is on in real mode; in sim only with RA3_VOICE=1 (otherwise printed)
+        self.voice = VoiceEngine(enabled=mode == "real" or os.environ.get("RA3_VOICE") == "1")
         self.voice.start()
         self.voice.speak("R A 3 System Online. Reality Aware Advisor is ready for mission.")
         
-        self.bridge = RA3RosBridge(agent_instance=self)
+        self.bridge = RA3RosBridge(agent_instance=self, use_ros2=mode == "real")
         self.bridge.start()
         
         self.last_voice_alert = ""
@@ -81,6 +105,10 @@ class RA3Agent:
             perception_state = self.perception_real.get_perception_state(mock_sensors)
         else:
             perception_state = self.perception_sim.get_latest_state()
+        perception_state.features = self.features.update(perception_state.sensor_data,
+                                                         perception_state.timestamp.timestamp())
+        if self.anomaly:
+            self.anomaly.process(perception_state)
             
         # REASON
         reasoning_state = self.reasoning.reason(perception_state)
@@ -97,14 +125,13 @@ class RA3Agent:
         # Simple goal selection: if reached, move goal
         dist_to_goal = ((self.goal_pos[0] - self.current_pos[0])**2 + (self.goal_pos[1] - self.current_pos[1])**2)**0.5
         if dist_to_goal < 0.8:
-            import random
-            self.goal_pos = [random.uniform(-15, 15), random.uniform(-15, 15)]
+            self.goal_pos = self._choose_next_goal()
             self.voice.speak(f"Objective reached. New target assigned.")
             print(f"[MISSION] Goal reached! New target: {self.goal_pos}")
 
         # LEARN: Update River model
-        # Features: sensors, Labels: actual safety score from reasoning
-        features = perception_state.sensor_data
+        # Features: sensors and their rolling statistics, Labels: actual safety score from reasoning
+        features = {**perception_state.sensor_data, **perception_state.features}
         target = reasoning_state.safety_score
         
         self.model.learn_one(features, target)
@@ -119,7 +146,7 @@ class RA3Agent:
         import time
         current_time = time.time()
         
-        if "CRITICAL" in "".join(reasoning_state.logic_conclusions):
+        if "CRITICAL" in "".join(reasoning_state.logic_conclusions) and reasoning_state.safety_score < AUTO_PAUSE_SAFETY:
             # Only auto-pause if we aren't in the 2-second reset grace period
             if current_time - self.last_reset_time > 2.0:
                 if self.mode == "real" and self.perception_real:
@@ -143,7 +170,9 @@ class RA3Agent:
             snapshot_captured=snapshot_taken,
             current_position=self.current_pos.copy(),
             goal_position=self.goal_pos.copy(),
-            scene_description=description
+            scene_description=description,
+            planner_stats=self.decision.planner_stats(),
+            perception_stats=self.perception_real.stats() if self.perception_real else {}
         )
         
         # Mastery Phase I: Mission Memory
@@ -160,10 +189,37 @@ class RA3Agent:
         
         return full_state
 
+    def _choose_next_goal(self, candidates: int = 8):
+        """
+        Draws a random goal as before, but checks it against the grid first: when it
+        is unreachable, the other random candidates (scored in the same multi-target
+        sweep) stand in and the cheapest reachable one is taken.
+        """
+        import random
+        options = [[random.uniform(-15, 15), random.uniform(-15, 15)] for _ in range(candidates)]
+        planner = self.decision.pathfinder
+        if hasattr(planner, "find_paths_to_goals"):
+            costs, _ = planner.find_paths_to_goals(self.current_pos, options)
+        else:
+            # Planners without the batch API only report reachability
+            costs = [float("inf") if not planner.find_path(self.current_pos, g) else 0.0 for g in options]
+        if costs[0] != float("inf"):
+            return options[0]
+        cost, goal = min(zip(costs, options), key=lambda c: c[0])
+        return goal if cost != float("inf") else options[0]
+
+    def shutdown(self):
+        """Stops background workers and flushes buffered mission logs."""
+        self.running = False
+        if self.perception_real:
+            self.perception_real.stop()
+        self.db.close()
+
     def reset_safety(self):
         import time
         self.paused = False
         self.last_reset_time = time.time()
+        self.reasoning.belief.reset()
         self.voice.speak("Safety reset successful. Mission resuming.")
         print("[SYSTEM] Safety reset triggered. Mission resuming...")
 
@@ -0,0 +1,145 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence, Tuple
+
+from ..schema import PerceptionState
+
+
+class AnomalyDetector(ABC):
+    """
+    Streaming anomaly detector over one feature dict per tick.
+
+    score() rates a tick against what the detector has seen so far and then
+    learns it (score-then-learn), in constant time and memory. It returns the
+    score and whether it crosses the detector's threshold; score scales differ
+    between detectors. Non-finite readings (NaN / inf from a faulty or missing
+    sensor) are skipped: they are neither scored nor learned.
+    """
+
+    @abstractmethod
+    def score(self, x: Dict[str, float]) -> Tuple[float, bool]:
+        """(score, is_anomaly) for one tick, learned after scoring."""
+
+
+class ZScoreDetector(AnomalyDetector):
+    """
+    Per-feature EWMA mean / variance; the score is the largest |z| across
+    features. Flags once `warmup` ticks have been seen and a feature is more
+    than `threshold` standard deviations from its running mean.
+
+    alpha: EWMA weight of the newest tick (smaller = longer memory)
+    min_std: floor on the standard deviation, so near-constant signals do not blow up z
+    """
+
+    def __init__(self, alpha: float = 0.02, threshold: float = 4.0, warmup: int = 30, min_std: float = 1e-3):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self.mean: Dict[str, float] = {}
+        self.var: Dict[str, float] = {}
+        self.seen = 0
+
+    def score(self, x):
+        worst = 0.0
+        a = self.alpha
+        for k, v in x.items():
+            if not math.isfinite(v):
+                continue
+            mean = self.mean.get(k)
+            if mean is None:
+                self.mean[k], self.var[k] = v, 0.0
+                continue
+            var = self.var[k]
+            z = abs(v - mean) / max(var ** 0.5, self.min_std)
+            if z > worst:
+                worst = z
+            # Incremental EWMA mean / variance (West, 1979)
+            diff = v - mean
+            incr = a * diff
+            self.mean[k] = mean + incr
+            self.var[k] = (1 - a) * (var + diff * incr)
+        self.seen += 1
+        return worst, self.seen > self.warmup and worst > self.threshold
+
+
+class HalfSpaceTreesDetector(AnomalyDetector):
+    """
+    River's HalfSpaceTrees behind a QuantileFilter: flags ticks whose score is
+    above the running q-quantile of past scores (P² estimate, constant memory).
+    Half-space trees suit anomalies spread across several features more than
+    single-feature spikes, which the z-score detector catches reliably.
+
+    limits: feature -> (low, high) range, leaving headroom above and below normal
+            readings; without it features are min-max scaled on the fly
+    """
+
+    def __init__(self, n_trees: int = 10, height: int = 4, window_size: int = 250, q: float = 0.995,
+                 limits: Optional[Dict[str, Tuple[float, float]]] = None, seed: Optional[int] = 42):
+        from river import anomaly, preprocessing
+        self.window_size = window_size
+        self.filter = anomaly.QuantileFilter(
+            anomaly.HalfSpaceTrees(n_trees=n_trees, height=height, window_size=window_size,
+                                   limits=limits, seed=seed),
+            q=q)
+        self.model = self.filter if limits is not None else preprocessing.MinMaxScaler() | self.filter
+        self.seen = 0
+
+    def score(self, x):
+        x = {k: v for k, v in x.items() if math.isfinite(v)}
+        s = self.model.score_one(x)
+        # Trees only hold mass profiles after the first full window
+        flagged = self.seen >= self.window_size and self.filter.classify(s)
+        self.model.learn_one(x)
+        self.seen += 1
+        return s, bool(flagged)
+
+
+DETECTORS = {
+    "zscore": ZScoreDetector,
+    "hst": HalfSpaceTreesDetector,
+}
+
+
+def create_anomaly_detector(name: str = "zscore", **options) -> Optional[AnomalyDetector]:
+    """Builds a detector by name ("zscore", "hst"); "none" disables the stage."""
+    if name == "none":
+        return None
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown anomaly detector: {name}")
+    return DETECTORS[name](**options)
+
+
+class AnomalyStage:
+    """
+    Scores each PerceptionState as it is produced and merges the result into it:
+    anomaly_score is set and anomalies_detected becomes true when either the
+    source already flagged the frame (simulator / vision label rules) or the
+    detector does.
+
+    keys: sensor / feature names to score (default: every sensor reading)
+    """
+
+    def __init__(self, detector: AnomalyDetector, keys: Optional[Sequence[str]] = None):
+        self.detector = detector
+        self.keys = tuple(keys) if keys is not None else None
+        self.flagged = 0
+        self.ticks = 0
+
+    def process(self, perception: PerceptionState) -> PerceptionState:
+        if self.keys is None:
+            x = dict(perception.sensor_data)
+        else:
+            values = {**perception.sensor_data, **perception.features}
+            x = {k: values[k] for k in self.keys if k in values}
+        score, flagged = self.detector.score(x)
+        self.ticks += 1
+        if flagged:
+            self.flagged += 1
+        perception.anomaly_score = float(score)
+        perception.anomalies_detected = perception.anomalies_detected or flagged
+        return perception
+
+    def stats(self) -> Dict[str, float]:
+        return {"ticks": self.ticks, "flagged": self.flagged,
+                "rate": self.flagged / self.ticks if self.ticks else 0.0}
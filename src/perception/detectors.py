@@ -0,0 +1,187 @@
+import ast
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# One detection: (label, confidence, [x1, y1, x2, y2]) in source-frame pixels
+Detection = Tuple[str, float, List[float]]
+
+
+class Detector(ABC):
+    """
+    Object detector backend used by VisionEngine.
+
+    detect() takes a batch of BGR frames and returns one list of detections per
+    frame. Backends import their runtime lazily, so only the selected one has to
+    be installed.
+    """
+
+    names: Dict[int, str] = {}
+    imgsz: int = 640
+
+    @abstractmethod
+    def detect(self, frames: Sequence[np.ndarray]) -> List[List[Detection]]:
+        """One list of detections per input frame, in the same order."""
+
+    def warmup(self, runs: int = 2) -> float:
+        """Runs dummy batches so first-call setup (allocations, kernel selection) happens at startup."""
+        frame = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        started = time.perf_counter()
+        for _ in range(runs):
+            self.detect([frame])
+        return (time.perf_counter() - started) * 1000
+
+
+class UltralyticsDetector(Detector):
+    """Default backend: the ultralytics YOLO model on PyTorch."""
+
+    def __init__(self, weights: str = "yolov8n.pt", imgsz: int = 640, conf: float = 0.25, device=None):
+        from ultralytics import YOLO
+        self.model = YOLO(weights)
+        self.names = self.model.names
+        self.imgsz = imgsz
+        self.conf = conf
+        self.device = device
+
+    def detect(self, frames):
+        # A list of frames is one batched forward pass
+        results = self.model(list(frames), imgsz=self.imgsz, conf=self.conf, device=self.device, verbose=False)
+        out = []
+        for r in results:
+            found = []
+            for box in r.boxes:
+                cls = int(box.cls[0])
+                found.append((self.names[cls], float(box.conf[0]), box.xyxy[0].tolist()))
+            out.append(found)
+        return out
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resizes keeping aspect ratio and pads to size x size; returns (image, scale, (pad_x, pad_y))."""
+    import cv2
+    h, w = frame.shape[:2]
+    r = min(size / h, size / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    px, py = (size - nw) / 2, (size - nh) / 2
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = int(round(py - 0.1)), int(round(px - 0.1))
+    out[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out, r, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou: float) -> np.ndarray:
+    """Greedy non-maximum suppression on xyxy boxes; returns kept indices by descending score."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = w * h
+        order = rest[inter / (areas[i] + areas[rest] - inter + 1e-9) <= iou]
+    return np.asarray(keep, dtype=np.int64)
+
+
+class OnnxDetector(Detector):
+    """
+    YOLOv8 exported to ONNX and run with ONNX Runtime on CPU (or any ORT
+    execution provider, e.g. OpenVINOExecutionProvider on Intel edge boxes).
+
+    weights: .onnx file, or a .pt checkpoint exported on first use (needs ultralytics)
+    quantize: use dynamically INT8-quantized weights (created next to the fp32 file)
+    imgsz: square network input size; smaller is faster, at some recall cost
+    """
+
+    def __init__(self, weights: str = "yolov8n.pt", imgsz: int = 640, conf: float = 0.25, iou: float = 0.45,
+                 quantize: bool = False, providers: Optional[List[str]] = None, threads: int = 0):
+        import onnxruntime as ort
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        path = self._export(weights, imgsz) if not weights.endswith(".onnx") else weights
+        if quantize:
+            path = self._quantize(path)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=providers or ["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.path = path
+        meta = self.session.get_modelmeta().custom_metadata_map
+        # ultralytics stores the class map as a dict literal in the model metadata
+        self.names = {int(k): v for k, v in ast.literal_eval(meta["names"]).items()} if "names" in meta else {}
+
+    @staticmethod
+    def _export(weights: str, imgsz: int) -> str:
+        path = f"{os.path.splitext(weights)[0]}_{imgsz}.onnx"
+        if not os.path.exists(path):
+            from ultralytics import YOLO
+            print(f"[VISION] Exporting {weights} to ONNX ({imgsz}px)...")
+            exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+            os.replace(exported, path)
+        return path
+
+    @staticmethod
+    def _quantize(path: str) -> str:
+        out = path.replace(".onnx", ".int8.onnx")
+        if not os.path.exists(out):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            print(f"[VISION] Quantizing {path} to INT8...")
+            quantize_dynamic(path, out, weight_type=QuantType.QUInt8)
+        return out
+
+    def detect(self, frames):
+        if not frames:
+            return []
+        boxed = [letterbox(f, self.imgsz) for f in frames]
+        # BGR HWC uint8 -> RGB NCHW float32 in [0, 1]
+        batch = np.stack([b[0] for b in boxed])[..., ::-1].transpose(0, 3, 1, 2)
+        batch = np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+        preds = self.session.run(None, {self.input_name: batch})[0] # (N, 4 + classes, anchors)
+
+        out = []
+        for pred, (_, r, (px, py)), frame in zip(preds, boxed, frames):
+            pred = pred.T
+            scores = pred[:, 4:]
+            cls = scores.argmax(1)
+            conf = scores[np.arange(len(cls)), cls]
+            mask = conf > self.conf
+            if not mask.any():
+                out.append([])
+                continue
+            cx, cy, w, h = pred[mask, :4].T
+            boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+            cls, conf = cls[mask], conf[mask]
+            # Class-aware NMS in one pass: shift each class to its own coordinate range
+            keep = nms(boxes + cls[:, None] * (self.imgsz * 2), conf, self.iou)
+            boxes = (boxes[keep] - [px, py, px, py]) / r
+            fh, fw = frame.shape[:2]
+            boxes = boxes.clip(0, [fw, fh, fw, fh])
+            out.append([(self.names.get(int(c), str(int(c))), float(s), b.tolist())
+                        for c, s, b in zip(cls[keep], conf[keep], boxes)])
+        return out
+
+
+BACKENDS = {
+    "ultralytics": UltralyticsDetector,
+    "onnx": OnnxDetector,
+}
+
+
+def create_detector(backend: str = "ultralytics", warmup: bool = True, **options) -> Detector:
+    """Builds a detector by backend name ("ultralytics" or "onnx") and optionally warms it up."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend}")
+    detector = BACKENDS[backend](**options)
+    if warmup:
+        ms = detector.warmup()
+        print(f"[VISION] {backend} detector warmed up in {ms:.0f} ms.")
+    return detector
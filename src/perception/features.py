@@ -0,0 +1,150 @@
+from collections import deque
+from typing import Dict, Optional, Sequence
+
+# Window lengths in ticks: short-term behaviour vs the recent baseline
+DEFAULT_WINDOWS = (10, 60)
+
+STATS = ("mean", "std", "min", "max", "ewma", "slope")
+
+
+class RollingWindow:
+    """
+    Streaming statistics over the last `size` samples of one signal, O(1) per push.
+
+    Values and timestamps live in fixed ring buffers. The running sums behind
+    mean / variance / slope are updated by adding the new sample and removing
+    the one it evicts, and rebuilt from the buffer once per lap so rounding
+    cannot drift (amortized O(1)). Min / max use monotonic deques. The EWMA
+    uses span `size` (alpha = 2 / (size + 1)).
+    """
+
+    __slots__ = ("size", "alpha", "values", "times", "head", "count", "seq",
+                 "sum", "sumsq", "sum_kx", "ewma", "_min", "_max")
+
+    def __init__(self, size: int):
+        if size < 2:
+            raise ValueError("Window size must be at least 2")
+        self.size = size
+        self.alpha = 2.0 / (size + 1)
+        self.values = [0.0] * size
+        self.times = [0.0] * size
+        self.head = 0   # slot the next sample goes to (== oldest sample once full)
+        self.count = 0
+        self.seq = 0    # samples pushed so far
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.sum_kx = 0.0 # sum of k * x_k, k = 0 for the oldest sample in the window
+        self.ewma: Optional[float] = None
+        self._min: deque = deque() # (seq, value), values increasing
+        self._max: deque = deque() # (seq, value), values decreasing
+
+    def push(self, x: float, t: float):
+        n = self.count
+        if n == self.size:
+            old = self.values[self.head]
+            # Every remaining sample moves one position towards the oldest
+            self.sum_kx += (n - 1) * x - (self.sum - old)
+            self.sum += x - old
+            self.sumsq += x * x - old * old
+        else:
+            self.sum_kx += n * x
+            self.sum += x
+            self.sumsq += x * x
+            self.count = n + 1
+        self.values[self.head] = x
+        self.times[self.head] = t
+        self.head = (self.head + 1) % self.size
+        if self.head == 0:
+            self._rebuild()
+
+        seq = self.seq
+        self.seq += 1
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((seq, x))
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((seq, x))
+        expired = self.seq - self.size
+        if self._min[0][0] < expired:
+            self._min.popleft()
+        if self._max[0][0] < expired:
+            self._max.popleft()
+
+        self.ewma = x if self.ewma is None else self.ewma + self.alpha * (x - self.ewma)
+
+    def _rebuild(self):
+        # Buffer is full and head == 0, so slot k holds the k-th oldest sample
+        self.sum = sum(self.values)
+        self.sumsq = sum(x * x for x in self.values)
+        self.sum_kx = sum(k * x for k, x in enumerate(self.values))
+
+    @property
+    def oldest_time(self) -> float:
+        return self.times[self.head if self.count == self.size else 0]
+
+    @property
+    def newest_time(self) -> float:
+        return self.times[self.head - 1]
+
+    def stats(self) -> Dict[str, float]:
+        """Current statistics; std and slope appear once the window holds two samples."""
+        n = self.count
+        if n == 0:
+            return {}
+        mean = self.sum / n
+        out = {"mean": mean, "min": self._min[0][1], "max": self._max[0][1], "ewma": self.ewma}
+        if n >= 2:
+            out["std"] = (max(self.sumsq - self.sum * mean, 0.0) / (n - 1)) ** 0.5
+            # Least-squares slope against sample position, scaled to units per second
+            # by the mean tick interval of the window
+            k_mean = (n - 1) / 2.0
+            per_tick = (self.sum_kx - k_mean * self.sum) / (n * (n * n - 1) / 12.0)
+            span = self.newest_time - self.oldest_time
+            out["slope"] = per_tick * (n - 1) / span if span > 0 else 0.0
+        return out
+
+
+class FeatureStore:
+    """
+    Per-sensor rolling features for reasoning and the online learner.
+
+    update() pushes one tick of sensor readings into a RollingWindow per
+    (sensor, window length) and returns flat features named
+    "<sensor>_<stat>_<window>" (e.g. vibration_slope_60), with stat one of
+    mean, std, min, max, ewma and slope (least-squares rate of change per
+    second). Cost per tick is O(sensors x windows), independent of window size.
+
+    windows: window lengths in ticks
+    sensors: sensors to track (default: every sensor seen)
+    """
+
+    def __init__(self, windows: Sequence[int] = DEFAULT_WINDOWS, sensors: Optional[Sequence[str]] = None):
+        self.windows = tuple(windows)
+        self.sensors = set(sensors) if sensors is not None else None
+        self._windows: Dict[str, Dict[int, RollingWindow]] = {}
+        self.features: Dict[str, float] = {}
+
+    def update(self, sensor_data: Dict[str, float], t: float) -> Dict[str, float]:
+        """Folds readings taken at time t (seconds) into the windows; returns the current features."""
+        for name, value in sensor_data.items():
+            if self.sensors is not None and name not in self.sensors:
+                continue
+            value = float(value)
+            if value != value: # NaN reading: keep the windows as they are
+                continue
+            windows = self._windows.get(name)
+            if windows is None:
+                windows = self._windows[name] = {w: RollingWindow(w) for w in self.windows}
+            for w, window in windows.items():
+                window.push(value, t)
+                for stat, v in window.stats().items():
+                    self.features[f"{name}_{stat}_{w}"] = v
+        return dict(self.features)
+
+    def window(self, sensor: str, size: int) -> Optional[RollingWindow]:
+        return self._windows.get(sensor, {}).get(size)
+
+    def reset(self):
+        self._windows.clear()
+        self.features.clear()
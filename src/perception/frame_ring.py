@@ -0,0 +1,157 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class FrameRef:
+    """
+    A pinned, read-only view of one ring slot. The writer never reuses a pinned
+    slot, so the view stays intact until release() (or the end of a with-block).
+    """
+
+    __slots__ = ("ring", "index", "seq", "timestamp", "frame")
+
+    def __init__(self, ring: "FrameRing", index: int, seq: int, timestamp: float, frame: np.ndarray):
+        self.ring = ring
+        self.index = index
+        self.seq = seq
+        self.timestamp = timestamp
+        self.frame = frame
+
+    def release(self):
+        if self.ring is not None:
+            self.ring._unpin(self.index)
+            self.ring = None
+
+    def __enter__(self) -> "FrameRef":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class FrameRing:
+    """
+    Fixed-size ring of preallocated frame slots in multiprocessing.shared_memory.
+
+    One writer (a capture thread) fills slots in turn, stamping each with a
+    monotonically increasing sequence number; any number of readers, in this or
+    other processes, borrow zero-copy views of the newest frame. Readers pin the
+    slot they hold and the writer always picks the oldest unpinned slot, so with
+    `slots` >= readers + 2 the writer never blocks and a reader never sees a
+    half-written frame. Only the small header is guarded by the lock; frame
+    bytes are never copied by the ring.
+
+    Layout: int64 [head_seq, latest_index, seq[slots], pins[slots]],
+            float64 [timestamp[slots]], then slots * frame bytes.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8, slots: int = 4,
+                 name: Optional[str] = None, lock=None, create: bool = True):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header = (2 + 2 * slots) * 8 + slots * 8
+        # Frames start on a 64-byte boundary
+        self._offset = (header + 63) // 64 * 64
+        size = self._offset + slots * self.frame_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self.lock = lock if lock is not None else mp.Lock()
+
+        buf = self.shm.buf
+        self._meta = np.ndarray((2 + 2 * slots,), dtype=np.int64, buffer=buf)
+        self._times = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=(2 + 2 * slots) * 8)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=buf, offset=self._offset)
+        if create:
+            self._meta[:] = 0
+            self._meta[1] = -1
+            self._times[:] = 0.0
+
+    # -- header accessors -------------------------------------------------
+    @property
+    def head(self) -> int:
+        """Sequence number of the newest committed frame (0 = none yet)."""
+        return int(self._meta[0])
+
+    def _seq(self, i: int) -> int:
+        return int(self._meta[2 + i])
+
+    def _pins(self, i: int) -> int:
+        return int(self._meta[2 + self.slots + i])
+
+    def _unpin(self, i: int):
+        with self.lock:
+            self._meta[2 + self.slots + i] -= 1
+
+    # -- writer -----------------------------------------------------------
+    def begin_write(self) -> Tuple[int, np.ndarray]:
+        """Reserves the oldest free slot and returns (index, writable view) to fill in place."""
+        with self.lock:
+            latest = int(self._meta[1])
+            free = [i for i in range(self.slots) if i != latest and self._pins(i) == 0 and self._seq(i) >= 0]
+            if not free:
+                raise RuntimeError("FrameRing: every slot is pinned; use more slots than readers + 1")
+            i = min(free, key=self._seq)
+            self._meta[2 + i] = -1 # Being written: never handed to readers
+        return i, self._frames[i]
+
+    def commit(self, index: int, timestamp: float) -> int:
+        """Publishes a filled slot as the newest frame and returns its sequence number."""
+        with self.lock:
+            seq = int(self._meta[0]) + 1
+            self._times[index] = timestamp
+            self._meta[2 + index] = seq
+            self._meta[1] = index
+            self._meta[0] = seq
+        return seq
+
+    def abort(self, index: int):
+        with self.lock:
+            self._meta[2 + index] = 0
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        i, slot = self.begin_write()
+        np.copyto(slot, frame)
+        return self.commit(i, timestamp)
+
+    # -- readers ----------------------------------------------------------
+    def acquire_latest(self, after_seq: int = 0) -> Optional[FrameRef]:
+        """Pins and returns the newest frame if its sequence number is greater than after_seq."""
+        with self.lock:
+            i = int(self._meta[1])
+            if i < 0 or int(self._meta[0]) <= after_seq:
+                return None
+            self._meta[2 + self.slots + i] += 1
+            seq, ts = self._seq(i), float(self._times[i])
+        view = self._frames[i].view()
+        view.flags.writeable = False
+        return FrameRef(self, i, seq, ts, view)
+
+    # -- cross-process ----------------------------------------------------
+    def spec(self) -> dict:
+        """Everything another process needs to attach (picklable, lock included)."""
+        return {"name": self.shm.name, "shape": self.shape, "dtype": self.dtype.str,
+                "slots": self.slots, "lock": self.lock}
+
+    @classmethod
+    def attach(cls, spec: dict) -> "FrameRing":
+        return cls(spec["shape"], spec["dtype"], spec["slots"], name=spec["name"],
+                   lock=spec["lock"], create=False)
+
+    def close(self):
+        # Views into the buffer must be dropped before the mapping can close
+        self._meta = self._times = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A reader still holds a view; the mapping goes away with the process
+            pass
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
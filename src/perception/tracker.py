@@ -0,0 +1,176 @@
+import itertools
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from ..schema import Entity
+
+# (label, confidence, [x1, y1, x2, y2]) as produced by the detector backends
+Detection = Tuple[str, float, List[float]]
+
+_ALL_CAMERAS = object()
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of xyxy boxes a (N, 4) and b (M, 4) -> (N, M), fully vectorized."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod((rb - lt).clip(0), axis=2)
+    area_a = np.prod((a[:, 2:] - a[:, :2]).clip(0), axis=1)
+    area_b = np.prod((b[:, 2:] - b[:, :2]).clip(0), axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def assign(score: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
+    """Maximum-score one-to-one matching (Hungarian), keeping pairs scoring at least threshold."""
+    if score.size == 0:
+        return []
+    rows, cols = linear_sum_assignment(-score)
+    return [(int(r), int(c)) for r, c in zip(rows, cols) if score[r, c] >= threshold]
+
+
+class Track:
+    __slots__ = ("id", "label", "camera_id", "confidence", "box", "velocity", "updated_at", "hits", "missed")
+
+    def __init__(self, track_id: str, label: str, camera_id, confidence: float, box: np.ndarray, t: float):
+        self.id = track_id
+        self.label = label
+        self.camera_id = camera_id
+        self.confidence = confidence
+        self.box = box
+        self.velocity = np.zeros(4) # d(box)/dt in pixels per second
+        self.updated_at = t
+        self.hits = 1
+        self.missed = 0 # consecutive updates of its camera without a match
+
+    def predict(self, t: float) -> np.ndarray:
+        return self.box + self.velocity * (t - self.updated_at)
+
+
+class Tracker:
+    """
+    SORT/ByteTrack-style multi-object tracker giving detections persistent IDs.
+
+    Every track carries a constant-velocity box model. On update, tracks are
+    extrapolated to the frame time and matched to detections of the same label
+    and camera by IoU: confident detections first, then low-confidence ones
+    against the tracks still unmatched (so briefly occluded objects keep their
+    ID). Between updates, entities() extrapolates the boxes, so the detector
+    can skip frames while downstream still sees smooth motion.
+
+    Expiry counts inference cycles, not wall time, so a slow detector (say one
+    inference every 2 s on CPU) does not lose tracks between its own updates.
+    A track is dropped after max_missed updates of its camera without a match
+    (and never within min_age seconds, so fast detectors keep the old
+    occlusion tolerance); if updates stop altogether it goes stale after
+    max_missed + 1 of that camera's measured update intervals (at least
+    min_age seconds; initial_interval stands in until an interval is measured).
+
+    iou_threshold: minimum IoU for a match
+    high_conf: detections at or above this start new tracks and match first
+    max_missed: consecutive unmatched updates a track survives
+    min_age: floor (seconds) on the staleness timeout
+    initial_interval: assumed seconds between updates before a camera's second update
+    smoothing: weight of the newest velocity measurement
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, high_conf: float = 0.5, max_missed: int = 2,
+                 min_age: float = 1.0, initial_interval: float = 2.0, smoothing: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.high_conf = high_conf
+        self.max_missed = max_missed
+        self.min_age = min_age
+        self.initial_interval = initial_interval
+        self.smoothing = smoothing
+        self.tracks: List[Track] = []
+        self._ids: Dict[str, itertools.count] = {}
+        self._last_update: Dict[object, float] = {}
+        self._interval: Dict[object, float] = {} # smoothed seconds between updates, per camera
+
+    def max_age(self, camera_id=None) -> float:
+        """Seconds after its last match a track of camera_id is considered stale."""
+        interval = self._interval.get(camera_id, self.initial_interval)
+        return max(self.min_age, (self.max_missed + 1) * interval)
+
+    def _new_id(self, label: str) -> str:
+        counter = self._ids.setdefault(label, itertools.count(1))
+        return f"{label}_{next(counter)}"
+
+    def _match(self, tracks: List[Track], dets: List[Tuple[int, Detection]], t: float):
+        if not tracks or not dets:
+            return [], list(range(len(tracks))), [i for i, _ in dets]
+        predicted = np.array([tr.predict(t) for tr in tracks])
+        boxes = np.array([d[2] for _, d in dets], dtype=float)
+        score = iou_matrix(predicted, boxes)
+        # Never swap identities across classes
+        same = np.array([tr.label for tr in tracks])[:, None] == np.array([d[0] for _, d in dets])[None, :]
+        score[~same] = 0.0
+        pairs = assign(score, self.iou_threshold)
+        matched_t = {r for r, _ in pairs}
+        matched_d = {c for _, c in pairs}
+        return ([(tracks[r], dets[c][1]) for r, c in pairs],
+                [i for i in range(len(tracks)) if i not in matched_t],
+                [dets[c][0] for c in range(len(dets)) if c not in matched_d])
+
+    def update(self, detections: Sequence[Detection], t: float, camera_id=None) -> List[Entity]:
+        """Folds one frame's detections (captured at time t, seconds) into the tracks of camera_id."""
+        last = self._last_update.get(camera_id)
+        if last is not None and t > last:
+            previous = self._interval.get(camera_id)
+            dt = t - last
+            self._interval[camera_id] = dt if previous is None else self.smoothing * dt + (1 - self.smoothing) * previous
+        self._last_update[camera_id] = t
+
+        own = [tr for tr in self.tracks if tr.camera_id == camera_id]
+        high = [(i, d) for i, d in enumerate(detections) if d[1] >= self.high_conf]
+        low = [(i, d) for i, d in enumerate(detections) if d[1] < self.high_conf]
+
+        matches, left, new_dets = self._match(own, high, t)
+        remaining = [own[i] for i in left]
+        low_matches, unmatched, _ = self._match(remaining, low, t)
+        for i in unmatched:
+            remaining[i].missed += 1
+
+        for tr, (label, conf, box) in matches + low_matches:
+            box = np.asarray(box, dtype=float)
+            dt = t - tr.updated_at
+            if dt > 1e-6:
+                measured = (box - tr.box) / dt
+                tr.velocity = self.smoothing * measured + (1 - self.smoothing) * tr.velocity
+            tr.box = box
+            tr.confidence = conf
+            tr.updated_at = t
+            tr.hits += 1
+            tr.missed = 0
+        for i in new_dets:
+            label, conf, box = detections[i]
+            self.tracks.append(Track(self._new_id(label), label, camera_id, conf,
+                                     np.asarray(box, dtype=float), t))
+
+        self.tracks = [tr for tr in self.tracks
+                       if tr.camera_id != camera_id or tr.missed <= self.max_missed or t - tr.updated_at <= self.min_age]
+        return self.entities(t, camera_id)
+
+    def entities(self, t: float, camera_id=_ALL_CAMERAS) -> List[Entity]:
+        """Current tracks as entities, boxes extrapolated to time t (all cameras unless camera_id is given)."""
+        out = []
+        for tr in self.tracks:
+            if camera_id is not _ALL_CAMERAS and tr.camera_id != camera_id:
+                continue
+            if t - tr.updated_at > self.max_age(tr.camera_id):
+                continue
+            box = tr.predict(t)
+            metadata = {
+                "velocity": [round(float((tr.velocity[0] + tr.velocity[2]) / 2), 3),
+                             round(float((tr.velocity[1] + tr.velocity[3]) / 2), 3)],
+                "track_hits": tr.hits,
+                "extrapolated": t > tr.updated_at,
+            }
+            if tr.camera_id is not None:
+                metadata["camera_id"] = tr.camera_id
+            out.append(Entity(id=tr.id, label=tr.label, confidence=tr.confidence,
+                              bbox=[float(v) for v in box], metadata=metadata))
+        return out
@@ -1,81 +1,434 @@
 import cv2
 import os
-from ultralytics import YOLO
+import numpy as np
 from ..schema import PerceptionState, Entity
 from datetime import datetime
+import multiprocessing as mp
+import queue
 import threading
 import time
+from .frame_ring import FrameRing
+from .detectors import create_detector
+from .tracker import Tracker
+
+
+class RateCounter:
+    """Events per second, smoothed over roughly the last `window` seconds."""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.rate = 0.0
+        self.count = 0
+        self._last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        self.count += 1
+        if self._last is not None:
+            dt = max(now - self._last, 1e-6)
+            alpha = min(dt / self.window, 1.0)
+            self.rate += alpha * (1.0 / dt - self.rate)
+        self._last = now
+
+
+class SyntheticSource:
+    """
+    cv2.VideoCapture stand-in producing a moving box on a noisy background,
+    paced at `fps`. Selected with the source string "synthetic[:WxH[@FPS]]".
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, seed: int = 0):
+        self.width, self.height, self.fps = width, height, fps
+        self.rng = np.random.default_rng(seed)
+        self.background = self.rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+        self.t = 0
+        self._next = time.perf_counter()
+
+    @classmethod
+    def parse(cls, spec: str) -> "SyntheticSource":
+        size, _, fps = spec.partition(":")[2].partition("@")
+        w, _, h = size.partition("x")
+        return cls(int(w or 640), int(h or 480), float(fps or 30.0))
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, prop, value) -> bool:
+        return False
+
+    def read(self, image=None):
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + 1.0 / self.fps, time.perf_counter())
+        if image is not None and image.shape == self.background.shape:
+            frame = image
+            np.copyto(frame, self.background)
+        else:
+            frame = self.background.copy()
+        size = min(self.width, self.height) // 4
+        x = (self.t * 4) % max(self.width - size, 1)
+        y = (self.height - size) // 2
+        frame[y:y + size, x:x + size] = (40, 160, 220)
+        self.t += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def open_source(source):
+    """Camera index, video file/stream URL, or "synthetic[:WxH[@FPS]]"."""
+    if isinstance(source, str) and source.startswith("synthetic"):
+        return SyntheticSource.parse(source)
+    # Use CAP_DSHOW for better performance/stability on Windows
+    cap = cv2.VideoCapture(source, cv2.CAP_DSHOW) if isinstance(source, int) else cv2.VideoCapture(source)
+    if not cap.isOpened():
+        # Fallback to default backend if DirectShow fails
+        cap = cv2.VideoCapture(source)
+    if cap.isOpened():
+        # Ask the driver not to queue stale frames (ignored by backends that can't)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def _inference_process(ring_specs, camera_ids, results, stop, stride, target_fps, backend, backend_options):
+    """
+    Separate-process inference: attaches to the capture rings, runs the model on
+    the newest frames and sends back only the (small) detection tuples, so the
+    model never competes with the control loop for the parent's GIL.
+    """
+    rings = [FrameRing.attach(spec) for spec in ring_specs]
+    detector = create_detector(backend, **backend_options)
+    last = [0] * len(rings)
+    next_due = time.perf_counter()
+    try:
+        while not stop.is_set():
+            if target_fps:
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            refs = []
+            for i, ring in enumerate(rings):
+                if ring.head - last[i] >= stride:
+                    ref = ring.acquire_latest(last[i])
+                    if ref is not None:
+                        refs.append((i, ref))
+            if not refs:
+                time.sleep(0.002)
+                continue
+            started = time.perf_counter()
+            try:
+                raw = detector.detect([ref.frame for _, ref in refs])
+            finally:
+                for _, ref in refs:
+                    ref.release()
+            finished = time.perf_counter()
+            batch = []
+            for (i, ref), found in zip(refs, raw):
+                last[i] = ref.seq
+                batch.append((camera_ids[i], ref.seq, ref.timestamp, found))
+            results.put((batch, (finished - started) * 1000, finished))
+            if target_fps:
+                next_due = max(next_due + 1.0 / target_fps, finished)
+    finally:
+        for ring in rings:
+            ring.close()
+
+
+class _Camera:
+    """One source with its capture thread's shared-memory frame ring."""
+
+    def __init__(self, camera_id: str, source):
+        self.camera_id = camera_id
+        self.source = source
+        self.cap = open_source(source)
+        # Video files are looped so they can stand in for a live camera
+        self.is_file = isinstance(source, str) and not source.startswith("synthetic") and os.path.isfile(source)
+        self.ring = None
+        self.last_inferred = 0
+        self.rate = RateCounter()
+        self.thread = None
+
+    @property
+    def seq(self) -> int:
+        return self.ring.head if self.ring is not None else 0
+
 
 class VisionEngine:
-    def __init__(self):
-        # Load YOLOv8 model (lightweight nano version)
-        print("[VISION] Loading YOLOv8n model...")
-        self.model = YOLO('yolov8n.pt') 
-        print("[VISION] Model loaded. Opening webcam (DirectShow)...")
-        # Use CAP_DSHOW for better performance/stability on Windows
-        self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW) 
-        if not self.cap.isOpened():
-            # Fallback to default index if DirectShow fails
-            self.cap = cv2.VideoCapture(0)
-            
-        if not self.cap.isOpened():
-            print("[ERROR] Could not open webcam. Ensure no other apps are using it.")
+    """
+    Camera perception split into capture and inference stages:
+      capture   - one thread per source decodes frames straight into a
+                  shared-memory FrameRing, so the newest frame is always ready
+                  and camera buffering never queues up
+      inference - gathers the newest frame of every source that has moved on
+                  and runs them through YOLO as one batch, dropping missed
+                  frames; in a thread, or with inference_process=True in a
+                  separate process reading the same rings
+
+    Consumers borrow zero-copy views of ring slots (frame_ref) instead of
+    copying frames under a lock.
+
+    source: camera index, video file, stream URL or "synthetic[:WxH[@FPS]]"
+    sources: several of the above (list, or dict of camera_id -> source) for
+             multi-camera mode; entities carry metadata["camera_id"]
+    inference_stride: only infer a source once this many new frames have arrived
+    target_fps: cap on inference cycles per second (None = as fast as the model runs)
+    ring_slots: frame slots per camera; must exceed ring_readers + 1
+    ring_readers: readers that may pin a camera's frame at the same time
+                  (default: the inference stage plus one frame_ref() consumer)
+    backend: detector backend, "ultralytics" (default) or "onnx" (see detectors.py)
+    backend_options: keyword arguments for the backend, e.g. {"imgsz": 416, "quantize": True}
+    tracking: pass detections through a Tracker so entities keep stable IDs and
+              carry metadata["velocity"]; between inferences their boxes are
+              extrapolated, so a larger inference_stride costs little accuracy
+    """
+
+    def __init__(self, source=0, inference_stride: int = 1, target_fps=None, sources=None,
+                 inference_process: bool = False, ring_slots: int = 4, ring_readers: int = 2,
+                 backend: str = "ultralytics", backend_options=None, tracking: bool = True):
+        if ring_slots <= ring_readers + 1:
+            # The writer needs a free slot even while every reader holds one
+            raise ValueError(f"ring_slots ({ring_slots}) must exceed ring_readers + 1 ({ring_readers + 1})")
+        self.inference_process = inference_process
+        self.backend = backend
+        # Lightweight nano YOLOv8 unless the options say otherwise
+        self.backend_options = {"weights": "yolov8n.pt", **(backend_options or {})}
+        if inference_process:
+            # The model lives in the inference process only
+            self.detector = None
         else:
-            print("[VISION] Webcam opened successfully.")
-        self.latest_frame = None
+            print(f"[VISION] Loading {self.backend_options['weights']} ({backend} backend)...")
+            self.detector = create_detector(backend, **self.backend_options)
+            print("[VISION] Model loaded.")
+        print("[VISION] Opening video sources...")
+        if sources is None:
+            sources = [source]
+        if not isinstance(sources, dict):
+            sources = {f"cam{i}": s for i, s in enumerate(sources)}
+        self.cameras = [_Camera(cid, src) for cid, src in sources.items()]
+        for cam in self.cameras:
+            if not cam.cap.isOpened():
+                print(f"[ERROR] Could not open video source {cam.source!r} ({cam.camera_id}).")
+            else:
+                print(f"[VISION] {cam.camera_id} opened: {cam.source!r}")
+        self.inference_stride = max(int(inference_stride), 1)
+        self.target_fps = target_fps
+        self.ring_slots = ring_slots
+        self._ctx = mp.get_context("spawn")
+        self._process = None
         self.running = False
         self.detections = []
+        self.tracker = Tracker() if tracking else None
         self.lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.inference_rate = RateCounter()
+        self.frames_skipped = 0
+        self.frames_inferred = 0
+        self.last_batch_size = 0
+        self.last_inference_ms = 0.0
+        self.last_latency_ms = 0.0
         self.snapshot_dir = "snapshots"
         self.last_snapshot_path = None
         os.makedirs(self.snapshot_dir, exist_ok=True)
 
+    def frame_ref(self, camera_id=None):
+        """
+        Pinned zero-copy view of a camera's newest frame (first camera by default),
+        or None before the first frame. Use as `with engine.frame_ref() as ref:`
+        and do not keep ref.frame past the block.
+        """
+        cam = next((c for c in self.cameras if c.camera_id == camera_id), self.cameras[0])
+        return cam.ring.acquire_latest() if cam.ring is not None else None
+
+    @property
+    def latest_frame(self):
+        """Copy of the first camera's newest frame (use frame_ref() to avoid the copy)."""
+        ref = self.frame_ref()
+        if ref is None:
+            return None
+        with ref:
+            return ref.frame.copy()
+
     def start(self):
         self.running = True
-        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
-        self.thread.start()
+        for cam in self.cameras:
+            cam.thread = threading.Thread(target=self._capture_loop, args=(cam,), daemon=True)
+            cam.thread.start()
+        target = self._process_bridge if self.inference_process else self._inference_loop
+        self.infer_thread = threading.Thread(target=target, daemon=True)
+        self.infer_thread.start()
 
-    def _capture_loop(self):
+    def _capture_loop(self, cam: _Camera):
+        backoff = 0.0
         try:
             while self.running:
-                ret, frame = self.cap.read()
+                if cam.ring is None:
+                    ret, frame = cam.cap.read()
+                    if ret:
+                        # The first frame fixes the ring geometry for this source
+                        cam.ring = FrameRing(frame.shape, frame.dtype, self.ring_slots, lock=self._ctx.Lock())
+                        cam.ring.write(frame, time.perf_counter())
+                else:
+                    try:
+                        index, slot = cam.ring.begin_write()
+                    except RuntimeError as e:
+                        # Every slot pinned (a leaked FrameRef or too many readers):
+                        # keep the camera alive and retry once readers let go
+                        if not backoff:
+                            print(f"[ERROR] {cam.camera_id} capture stalled: {e}")
+                        backoff = min(backoff * 2 or 0.05, 1.0)
+                        time.sleep(backoff)
+                        continue
+                    if backoff:
+                        print(f"[VISION] {cam.camera_id} capture resumed.")
+                        backoff = 0.0
+                    # Decode straight into shared memory when the backend honours the buffer
+                    ret, frame = cam.cap.read(slot)
+                    if ret and frame.__array_interface__["data"][0] != slot.__array_interface__["data"][0]:
+                        if frame.shape == slot.shape:
+                            np.copyto(slot, frame)
+                        else:
+                            cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot)
+                    if ret:
+                        cam.ring.commit(index, time.perf_counter())
+                    else:
+                        cam.ring.abort(index)
                 if not ret:
+                    if cam.is_file:
+                        cam.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                     time.sleep(0.1)
                     continue
-                
-                # Run YOLO detection
-                results = self.model(frame, verbose=False)
-                
-                new_detections = []
-                for r in results:
-                    for box in r.boxes:
-                        cls = int(box.cls[0])
-                        label = self.model.names[cls]
-                        conf = float(box.conf[0])
-                        xyxy = box.xyxy[0].tolist()
-                        
-                        new_detections.append(Entity(
-                            id=f"{label}_{time.time()}",
-                            label=label,
-                            confidence=conf,
-                            bbox=xyxy
-                        ))
-                
-                with self.lock:
-                    self.latest_frame = frame
-                    self.detections = new_detections
+                with self.new_frame:
+                    self.new_frame.notify()
+                cam.rate.tick()
+        except Exception as e:
+            print(f"[ERROR] {cam.camera_id} capture thread stopped: {e!r}")
+            raise
         finally:
-            self.cap.release()
-            print("[VISION] Webcam released.")
+            cam.cap.release()
+            print(f"[VISION] {cam.camera_id} released.")
+
+    def _ready(self):
+        return [c for c in self.cameras if c.seq - c.last_inferred >= self.inference_stride]
+
+    def _inference_loop(self):
+        next_due = time.perf_counter()
+        while self.running:
+            if self.target_fps:
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            with self.new_frame:
+                ready = self._ready()
+                while self.running and not ready:
+                    self.new_frame.wait(0.5)
+                    ready = self._ready()
+                if not self.running:
+                    break
+            refs = [(cam, cam.ring.acquire_latest(cam.last_inferred)) for cam in ready]
+            refs = [(cam, ref) for cam, ref in refs if ref is not None]
+            if not refs:
+                continue
+
+            started = time.perf_counter()
+            try:
+                raw = self.detector.detect([ref.frame for _, ref in refs])
+            finally:
+                for _, ref in refs:
+                    ref.release()
+            finished = time.perf_counter()
+
+            self._publish([(cam.camera_id, ref.seq, ref.timestamp, found) for (cam, ref), found in zip(refs, raw)],
+                          (finished - started) * 1000, finished)
+            if self.target_fps:
+                # Fell behind: restart the schedule rather than bursting to catch up
+                next_due = max(next_due + 1.0 / self.target_fps, finished)
+
+    def _process_bridge(self):
+        """Starts the inference process once every camera has a ring, then relays its results."""
+        deadline = time.perf_counter() + 5.0
+        while self.running and time.perf_counter() < deadline and any(c.ring is None for c in self.cameras):
+            time.sleep(0.05)
+        cams = [c for c in self.cameras if c.ring is not None]
+        if not self.running or not cams:
+            return
+        results = self._ctx.Queue()
+        self._stop_process = self._ctx.Event()
+        process = self._ctx.Process(
+            target=_inference_process, daemon=True,
+            args=([c.ring.spec() for c in cams], [c.camera_id for c in cams], results,
+                  self._stop_process, self.inference_stride, self.target_fps,
+                  self.backend, self.backend_options))
+        process.start()
+        self._process = process
+        print(f"[VISION] Inference process started (pid {process.pid}).")
+        while self.running:
+            try:
+                batch, inference_ms, finished = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._publish(batch, inference_ms, finished)
+
+    def _publish(self, batch, inference_ms, finished):
+        by_id = {c.camera_id: c for c in self.cameras}
+        for camera_id, seq, _, _ in batch:
+            cam = by_id[camera_id]
+            if cam.last_inferred:
+                self.frames_skipped += seq - cam.last_inferred - 1
+            cam.last_inferred = seq
+
+        updated = {camera_id for camera_id, _, _, _ in batch}
+        with self.lock:
+            if self.tracker is not None:
+                for camera_id, _, captured_at, found in batch:
+                    self.tracker.update(found, captured_at, camera_id)
+            else:
+                # Keep the last detections of cameras that were not in this batch
+                self.detections = [e for e in self.detections if e.metadata.get("camera_id") not in updated]
+                for camera_id, _, _, found in batch:
+                    self.detections.extend(self._to_entities(camera_id, found))
+        self.last_batch_size = len(batch)
+        self.frames_inferred += len(batch)
+        self.last_inference_ms = inference_ms
+        if batch:
+            self.last_latency_ms = (finished - min(ts for _, _, ts, _ in batch)) * 1000
+        self.inference_rate.tick()
+
+    def _to_entities(self, camera_id, found):
+        return [Entity(
+            id=f"{label}_{time.time()}",
+            label=label,
+            confidence=conf,
+            bbox=xyxy,
+            metadata={"camera_id": camera_id}
+        ) for label, conf, xyxy in found]
+
+    def stats(self) -> dict:
+        return {
+            "capture_fps": round(sum(c.rate.rate for c in self.cameras), 2),
+            "inference_fps": round(self.inference_rate.rate, 2),
+            "frames_captured": sum(c.rate.count for c in self.cameras),
+            "frames_inferred": self.frames_inferred,
+            "frames_skipped": self.frames_skipped,
+            "batch_size": self.last_batch_size,
+            "inference_ms": round(self.last_inference_ms, 2),
+            "latency_ms": round(self.last_latency_ms, 2),
+            "cameras": {c.camera_id: {"capture_fps": round(c.rate.rate, 2), "frames": c.rate.count}
+                        for c in self.cameras},
+        }
 
     def get_perception_state(self, sensor_data: dict) -> PerceptionState:
         with self.lock:
-            entities = self.detections.copy()
-            frame = self.latest_frame.copy() if self.latest_frame is not None else None
-            
+            if self.tracker is not None:
+                # Tracks extrapolated to now, in the capture clock
+                entities = self.tracker.entities(time.perf_counter())
+            else:
+                entities = self.detections.copy()
+
         # Detect anomaly: Person or unknown dense object in frame
         anomaly = any(e.label in ['person', 'cell phone', 'scissors'] for e in entities)
-        
+
         return PerceptionState(
             timestamp=datetime.now(),
             entities=entities,
@@ -83,19 +436,38 @@ class VisionEngine:
             anomalies_detected=anomaly
         )
 
-    def capture_snapshot(self) -> str:
-        with self.lock:
-            if self.latest_frame is None:
-                return ""
-            frame = self.latest_frame.copy()
-        
-        filename = f"snapshot_{int(time.time())}.jpg"
+    def capture_snapshot(self, camera_id=None) -> str:
+        ref = self.frame_ref(camera_id)
+        if ref is None:
+            return ""
+        cam_id = camera_id if any(c.camera_id == camera_id for c in self.cameras) else self.cameras[0].camera_id
+
+        suffix = f"_{cam_id}" if len(self.cameras) > 1 else ""
+        filename = f"snapshot_{int(time.time())}{suffix}.jpg"
         filepath = os.path.join(self.snapshot_dir, filename)
-        cv2.imwrite(filepath, frame)
+        with ref:
+            # Encoded straight from the shared slot, no intermediate copy
+            cv2.imwrite(filepath, ref.frame)
         self.last_snapshot_path = filepath
         print(f"[VISION] Snapshot saved: {filepath}")
         return filepath
 
     def stop(self):
-        self.running = False
-        self.cap.release()
+        with self.new_frame:
+            self.running = False
+            self.new_frame.notify_all()
+        if self._process is not None:
+            self._stop_process.set()
+            self._process.join(timeout=5.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        threads = [c.thread for c in self.cameras] + [getattr(self, "infer_thread", None)]
+        for t in threads:
+            if t is not None and t is not threading.current_thread():
+                t.join(timeout=2.0)
+        for cam in self.cameras:
+            cam.cap.release()
+            if cam.ring is not None and not (cam.thread and cam.thread.is_alive()):
+                cam.ring.close()
+                cam.ring = None
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+HAZARD_STATES = ("SAFE", "CAUTION", "HAZARD")
+
+# P(state_t | state_t-1), rows = previous state; hazards are sticky, recovery takes a few clean ticks
+TRANSITION = (
+    (0.90, 0.08, 0.02),
+    (0.15, 0.75, 0.10),
+    (0.02, 0.18, 0.80),
+)
+
+# P(risk level the rules concluded | state), columns = none / CAUTION / CRITICAL
+RISK_EMISSION = (
+    (0.93, 0.06, 0.01),
+    (0.30, 0.60, 0.10),
+    (0.05, 0.15, 0.80),
+)
+# P(ALERT conclusion | state) and P(perception anomaly | state)
+ALERT_EMISSION = (0.02, 0.20, 0.50)
+ANOMALY_EMISSION = (0.05, 0.30, 0.60)
+
+# Expected safety / efficiency of operating in each state
+STATE_SAFETY = (0.99, 0.70, 0.10)
+STATE_EFFICIENCY = (0.85, 0.60, 0.10)
+
+RISK_NONE, RISK_CAUTION, RISK_CRITICAL = 0, 1, 2
+
+# Frames per block when filtering recorded sequences in bulk (see HazardBelief.run)
+_SCAN_BLOCK = 64
+
+
+def observation(risk: int, alert: bool, anomaly: bool) -> int:
+    """Packs one tick's evidence into a discrete observation symbol."""
+    return risk * 4 + int(alert) * 2 + int(anomaly)
+
+
+def observation_from_conclusions(conclusions: Iterable[str], anomaly: bool) -> int:
+    risk, alert = RISK_NONE, False
+    for c in conclusions:
+        if "CRITICAL" in c:
+            risk = RISK_CRITICAL
+        elif "CAUTION" in c and risk < RISK_CAUTION:
+            risk = RISK_CAUTION
+        if "ALERT" in c:
+            alert = True
+    return observation(risk, alert, anomaly)
+
+
+def observations(risk: np.ndarray, alert: np.ndarray, anomaly: np.ndarray) -> np.ndarray:
+    """Vectorized observation() over per-frame evidence columns."""
+    return np.asarray(risk, dtype=np.int64) * 4 + np.asarray(alert, dtype=np.int64) * 2 + np.asarray(anomaly, dtype=np.int64)
+
+
+def _emission_table() -> List[Tuple[float, ...]]:
+    table = []
+    for risk in (RISK_NONE, RISK_CAUTION, RISK_CRITICAL):
+        for alert in (False, True):
+            for anomaly in (False, True):
+                table.append(tuple(
+                    RISK_EMISSION[s][risk]
+                    * (ALERT_EMISSION[s] if alert else 1 - ALERT_EMISSION[s])
+                    * (ANOMALY_EMISSION[s] if anomaly else 1 - ANOMALY_EMISSION[s])
+                    for s in range(len(HAZARD_STATES))))
+    return table
+
+
+class HazardBelief:
+    """
+    Discrete HMM forward filter over hazard states (SAFE / CAUTION / HAZARD).
+
+    Each tick folds one observation (the risk level the rules concluded from
+    sensors and tracked entities, a maintenance ALERT, the perception anomaly
+    flag) into the belief: predict through the transition matrix, weight by
+    the precomputed emission likelihood, normalize. That is a fixed
+    S x S = 3 x 3 step per tick, independent of history length, and a single
+    outlier tick only nudges the belief instead of flipping it.
+    """
+
+    def __init__(self, transition: Sequence[Sequence[float]] = TRANSITION,
+                 prior: Sequence[float] = (1.0, 0.0, 0.0)):
+        self.transition = tuple(tuple(row) for row in transition)
+        self._columns = tuple(zip(*self.transition)) # P(state_t = j | each previous state)
+        self.prior = tuple(prior)
+        self.emission = _emission_table()
+        self.belief = self.prior
+
+    def reset(self):
+        self.belief = self.prior
+
+    def update(self, obs: int) -> Tuple[float, ...]:
+        """One forward step for observation symbol obs; returns the new belief."""
+        b = self.belief
+        post = [lik * sum(p * t for p, t in zip(b, col)) for lik, col in zip(self.emission[obs], self._columns)]
+        total = sum(post)
+        if total <= 0.0:
+            # Evidence impossible under the model: restart from the prior rather than divide by zero
+            self.belief = self.prior
+        else:
+            self.belief = tuple(p / total for p in post)
+        return self.belief
+
+    def safety(self) -> float:
+        return sum(b * s for b, s in zip(self.belief, STATE_SAFETY))
+
+    def efficiency(self) -> float:
+        return sum(b * e for b, e in zip(self.belief, STATE_EFFICIENCY))
+
+    def world_model(self) -> Dict[str, float]:
+        model = {"safety_prob": self.safety(), "efficiency_prob": self.efficiency()}
+        for state, p in zip(HAZARD_STATES, self.belief):
+            model[f"p_{state.lower()}"] = p
+        return model
+
+    def run(self, obs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Filters a recorded observation sequence from the current belief; returns
+        per-tick beliefs (n, S) and safety (n,), and leaves the last belief as current.
+
+        One forward step is alpha_t = alpha_t-1 @ (T * L[obs_t]), so the whole
+        sequence is a prefix product of S x S matrices: scanned inside fixed-size
+        blocks, then across the block totals, with batched matmuls instead of n
+        Python steps. Matches update() up to float rounding.
+        """
+        obs = np.asarray(obs, dtype=np.int64)
+        n, states = len(obs), len(self.prior)
+        if n == 0:
+            return np.empty((0, states)), np.empty(0)
+        steps = np.asarray(self.transition)[None, :, :] * np.asarray(self.emission)[obs][:, None, :]
+        pad = -n % _SCAN_BLOCK
+        if pad:
+            steps = np.concatenate([steps, np.broadcast_to(np.eye(states), (pad, states, states))])
+        blocks = steps.reshape(-1, _SCAN_BLOCK, states, states)
+        _prefix_products(blocks, axis=1)
+        totals = blocks[:, -1].copy()
+        _prefix_products(totals, axis=0)
+        # Belief entering each block: the initial belief carried through all earlier blocks
+        entering = np.asarray(self.belief) @ totals[:-1]
+        entering = np.vstack([np.asarray(self.belief)[None, :], entering / entering.sum(axis=1, keepdims=True)])
+        alpha = np.einsum("bs,bkst->bkt", entering, blocks).reshape(-1, states)[:n]
+        beliefs = alpha / alpha.sum(axis=1, keepdims=True)
+        self.belief = tuple(beliefs[-1].tolist())
+        return beliefs, beliefs @ np.asarray(STATE_SAFETY)
+
+
+def _prefix_products(m: np.ndarray, axis: int):
+    """
+    In-place inclusive prefix product of stacked S x S matrices along axis
+    (Hillis-Steele doubling). Each partial product is rescaled to sum 1 so long
+    sequences neither underflow nor overflow; the belief normalization cancels it.
+    """
+    n = m.shape[axis]
+    shift = 1
+    while shift < n:
+        head = [slice(None)] * axis
+        m[tuple(head + [slice(shift, None)])] = m[tuple(head + [slice(None, -shift)])] @ m[tuple(head + [slice(shift, None)])]
+        m /= m.sum(axis=(-2, -1), keepdims=True)
+        shift *= 2
@@ -0,0 +1,402 @@
+import json
+import operator
+import os
+import re
+import string
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules.json")
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+       "==": operator.eq, "!=": operator.ne}
+
+_PREDICATE = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|==|!=|<|>)\s*(-?[0-9.]+(?:[eE][-+]?[0-9]+)?)\s*$")
+
+
+class RuleError(ValueError):
+    pass
+
+
+class _Readings(dict):
+    """Variable values for templates: a reading that is absent formats as nan, as in the batch columns."""
+
+    def __missing__(self, key):
+        return float("nan")
+
+
+def load_rule_file(path: str) -> Dict[str, Any]:
+    """Reads a rule set from JSON, or YAML when the file says so and PyYAML is installed."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuleError("YAML rule files need PyYAML: pip install pyyaml") from e
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+class RulePlan:
+    """
+    A rule set compiled into an evaluation plan.
+
+    Rule file layout:
+      defaults  - sensor values used when a reading is missing
+      counters  - name -> entity labels it counts (a label may feed several counters)
+      rules     - ordered list of {id, when, then, [group]}
+                  when: "var op number", or {"any"|"all": [...]} / {"not": ...} nested
+                  then: conclusion text, may reference variables as {name} (with an
+                        optional format spec); only counters, defaults and the
+                        rule's own condition variables are allowed
+                  group: rules sharing a group are exclusive; the first match wins (if/elif)
+      fallback  - conclusion when no rule fires
+
+    Compilation deduplicates predicates: every distinct (variable, operator)
+    keeps its thresholds sorted, so one bisect per pair settles all of them.
+    Entities are counted in a single pass through a label -> counter index, and
+    rules that can only fire when certain labels are present are indexed by
+    those labels and skipped entirely on ticks without them. Templates are
+    checked here too, so a typo is rejected when the file is (re)loaded rather
+    than raising on every tick the rule fires.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.defaults: Dict[str, float] = {k: float(v) for k, v in spec.get("defaults", {}).items()}
+        self.counters: List[str] = list(spec.get("counters", {}))
+        counter_index = {name: i for i, name in enumerate(self.counters)}
+        # label -> indices of the counters it increments
+        self.label_counters: Dict[str, Tuple[int, ...]] = {}
+        for name, labels in spec.get("counters", {}).items():
+            for label in labels:
+                self.label_counters[label] = self.label_counters.get(label, ()) + (counter_index[name],)
+        self.fallback: Optional[str] = spec.get("fallback")
+
+        # Shared predicate table: (variable, op, threshold) -> index
+        self.predicates: List[Tuple[str, str, float]] = []
+        self._predicate_index: Dict[Tuple[str, str, float], int] = {}
+
+        self.rules: List[Dict[str, Any]] = []
+        template_vars = set()
+        for order, rule in enumerate(spec.get("rules", [])):
+            if "when" not in rule or "then" not in rule:
+                raise RuleError(f"Rule {rule.get('id', order)} needs 'when' and 'then'")
+            rule_id = rule.get("id", f"rule_{order}")
+            cond = self._compile(rule["when"])
+            fields = self._check_template(rule_id, rule["then"],
+                                          self._variables(cond) | set(self.defaults) | set(self.counters))
+            template_vars |= fields
+            self.rules.append({
+                "id": rule_id,
+                "group": rule.get("group"),
+                "cond": cond,
+                "then": rule["then"],
+                "templated": bool(fields),
+            })
+        self.sensors = sorted({var for var, _, _ in self.predicates if var not in counter_index})
+        # Non-counter variables evaluate_batch needs columns for: conditions plus templates
+        self.columns = sorted(set(self.sensors) | (template_vars - set(self.counters)))
+
+        # Per (variable, op): sorted thresholds, and each predicate's position among them
+        self.threshold_groups: Dict[Tuple[str, str], List[float]] = {}
+        for var, op, value in self.predicates:
+            self.threshold_groups.setdefault((var, op), []).append(value)
+        for key in self.threshold_groups:
+            self.threshold_groups[key] = sorted(set(self.threshold_groups[key]))
+        self._pred_slot = [self.threshold_groups[(var, op)].index(value) for var, op, value in self.predicates]
+
+        # Label gating: a rule that is false while every counter is zero and reads no
+        # sensor can only fire when one of its counters' labels is present
+        self.always: List[int] = []
+        self.label_rules: Dict[str, List[int]] = {}
+        zero_truth = [OPS[op](0.0, value) for _, op, value in self.predicates]
+        for i, rule in enumerate(self.rules):
+            used = self._variables(rule["cond"])
+            if used and not (used - set(self.counters)) and not self._eval_tree(rule["cond"], zero_truth):
+                for name in used:
+                    for label, idx in self.label_counters.items():
+                        if counter_index[name] in idx:
+                            self.label_rules.setdefault(label, []).append(i)
+            else:
+                self.always.append(i)
+
+    # -- compilation ------------------------------------------------------
+    def _compile(self, when):
+        if isinstance(when, str):
+            m = _PREDICATE.match(when)
+            if not m:
+                raise RuleError(f"Cannot parse condition: {when!r}")
+            key = (m.group(1), m.group(2), float(m.group(3)))
+            if key not in self._predicate_index:
+                self._predicate_index[key] = len(self.predicates)
+                self.predicates.append(key)
+            return ("pred", self._predicate_index[key])
+        if isinstance(when, dict) and len(when) == 1:
+            (kind, body), = when.items()
+            if kind in ("any", "all") and isinstance(body, list) and body:
+                return (kind, [self._compile(b) for b in body])
+            if kind == "not":
+                return ("not", self._compile(body))
+        raise RuleError(f"Cannot parse condition: {when!r}")
+
+    @staticmethod
+    def _check_template(rule_id: str, then: Any, allowed: set) -> set:
+        """Variable names a `then` template references; raises RuleError if any is unknown or the template is malformed."""
+        if not isinstance(then, str):
+            raise RuleError(f"Rule {rule_id}: 'then' must be a string")
+        try:
+            fields = {name for _, name, _, _ in string.Formatter().parse(then) if name is not None}
+        except ValueError as e:
+            raise RuleError(f"Rule {rule_id}: malformed template {then!r}: {e}") from e
+        for name in sorted(fields):
+            if not name.isidentifier():
+                raise RuleError(f"Rule {rule_id}: template field {{{name}}} must be a variable name")
+            if name not in allowed:
+                raise RuleError(f"Rule {rule_id}: template references unknown variable {{{name}}}; "
+                                f"available: {', '.join(sorted(allowed))}")
+        try:
+            # Format specs are only checked when applied
+            then.format(**{name: 0.0 for name in fields})
+        except (ValueError, TypeError) as e:
+            raise RuleError(f"Rule {rule_id}: malformed template {then!r}: {e}") from e
+        return fields
+
+    def _variables(self, node) -> set:
+        if node[0] == "pred":
+            return {self.predicates[node[1]][0]}
+        if node[0] == "not":
+            return self._variables(node[1])
+        return set().union(*(self._variables(n) for n in node[1]))
+
+    def _eval_tree(self, node, truth) -> bool:
+        kind = node[0]
+        if kind == "pred":
+            return truth[node[1]]
+        if kind == "any":
+            return any(self._eval_tree(n, truth) for n in node[1])
+        if kind == "all":
+            return all(self._eval_tree(n, truth) for n in node[1])
+        return not self._eval_tree(node[1], truth)
+
+    # -- evaluation -------------------------------------------------------
+    def count(self, entities) -> Tuple[List[int], set]:
+        """Counter values, and the counted labels present, from one pass over the entities."""
+        counts = [0] * len(self.counters)
+        seen = set()
+        lookup = self.label_counters
+        for e in entities:
+            idx = lookup.get(e.label)
+            if idx:
+                seen.add(e.label)
+                for i in idx:
+                    counts[i] += 1
+        return counts, seen
+
+    def _truth(self, values: Dict[str, float]) -> List[bool]:
+        # One bisect per (variable, op) resolves every threshold sharing it
+        cuts = {}
+        for (var, op), thresholds in self.threshold_groups.items():
+            x = values.get(var, float("nan"))
+            if x != x: # Missing reading without a default: every comparison is False
+                cuts[(var, op)] = None
+            elif op == "<":
+                cuts[(var, op)] = bisect_right(thresholds, x)   # x < t  <=> slot >= cut
+            elif op == "<=":
+                cuts[(var, op)] = bisect_left(thresholds, x)    # x <= t <=> slot >= cut
+            elif op == ">":
+                cuts[(var, op)] = bisect_left(thresholds, x)    # x > t  <=> slot < cut
+            elif op == ">=":
+                cuts[(var, op)] = bisect_right(thresholds, x)   # x >= t <=> slot < cut
+            else:
+                cuts[(var, op)] = x
+        truth = []
+        for (var, op, value), slot in zip(self.predicates, self._pred_slot):
+            cut = cuts[(var, op)]
+            if cut is None:
+                truth.append(op == "!=")
+            elif op in ("<", "<="):
+                truth.append(slot >= cut)
+            elif op in (">", ">="):
+                truth.append(slot < cut)
+            else:
+                truth.append(OPS[op](cut, value))
+        return truth
+
+    def evaluate(self, sensor_data: Dict[str, float], entities) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Conclusions for one frame, in rule order, plus the variable values they
+        were derived from. A missing or NaN reading falls back to its default;
+        without one, every comparison on it is False (True for !=).
+        """
+        counts, seen = self.count(entities)
+        values = _Readings(self.defaults)
+        # A NaN reading counts as missing, so the default applies (same as evaluate_batch)
+        values.update((k, v) for k, v in sensor_data.items() if v == v)
+        values.update(zip(self.counters, counts))
+
+        active = set(self.always)
+        for label in seen:
+            active.update(self.label_rules.get(label, ()))
+        truth = self._truth(values)
+
+        conclusions = []
+        fired_groups = set()
+        for i in sorted(active):
+            rule = self.rules[i]
+            group = rule["group"]
+            if group is not None and group in fired_groups:
+                continue
+            if self._eval_tree(rule["cond"], truth):
+                if group is not None:
+                    fired_groups.add(group)
+                conclusions.append(rule["then"].format_map(values) if rule["templated"] else rule["then"])
+        if not conclusions and self.fallback:
+            conclusions.append(self.fallback)
+        return conclusions, values
+
+    # -- batch evaluation -------------------------------------------------
+    def count_batch(self, label_counts: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+        """Counter columns from per-frame label count columns."""
+        counters = {name: np.zeros(n, dtype=np.int64) for name in self.counters}
+        for label, idx in self.label_counters.items():
+            col = label_counts.get(label)
+            if col is None:
+                continue
+            for i in idx:
+                counters[self.counters[i]] += np.asarray(col, dtype=np.int64)
+        return counters
+
+    def _eval_tree_batch(self, node, truth: np.ndarray) -> np.ndarray:
+        kind = node[0]
+        if kind == "pred":
+            return truth[node[1]]
+        if kind == "any":
+            return np.logical_or.reduce([self._eval_tree_batch(n, truth) for n in node[1]])
+        if kind == "all":
+            return np.logical_and.reduce([self._eval_tree_batch(n, truth) for n in node[1]])
+        return ~self._eval_tree_batch(node[1], truth)
+
+    def evaluate_batch(self, sensors: Dict[str, np.ndarray], label_counts: Dict[str, np.ndarray],
+                       n: int) -> "BatchConclusions":
+        """
+        Vectorized evaluate() over n frames. Sensor columns use NaN for a missing
+        reading (the rule defaults then apply, as for an absent key per frame);
+        label_counts maps entity label -> per-frame count column.
+        """
+        values: Dict[str, np.ndarray] = {}
+        for var in self.columns:
+            col = sensors.get(var)
+            col = np.full(n, np.nan) if col is None else np.asarray(col, dtype=float)
+            if var in self.defaults:
+                col = np.where(np.isnan(col), self.defaults[var], col)
+            values[var] = col
+        values.update(self.count_batch(label_counts, n))
+
+        # NaN compares False (True for !=), exactly like the scalar path
+        truth = np.empty((len(self.predicates), n), dtype=bool)
+        for k, (var, op, value) in enumerate(self.predicates):
+            col = values.get(var)
+            if col is None:
+                truth[k] = op == "!="
+            else:
+                with np.errstate(invalid="ignore"):
+                    truth[k] = OPS[op](col, value)
+
+        fired = np.zeros((n, len(self.rules)), dtype=bool)
+        taken: Dict[str, np.ndarray] = {}
+        for i, rule in enumerate(self.rules):
+            hit = self._eval_tree_batch(rule["cond"], truth)
+            group = rule["group"]
+            if group is not None:
+                prior = taken.get(group)
+                if prior is not None:
+                    hit = hit & ~prior
+                    taken[group] = prior | hit
+                else:
+                    taken[group] = hit
+            fired[:, i] = hit
+        return BatchConclusions(self, fired, values)
+
+
+class BatchConclusions:
+    """
+    Columnar result of RulePlan.evaluate_batch: fired[frame, rule] plus the
+    variable columns. Conclusion strings are only built per frame on request.
+    """
+
+    def __init__(self, plan: RulePlan, fired: np.ndarray, values: Dict[str, np.ndarray]):
+        self.plan = plan
+        self.fired = fired
+        self.values = values
+        self.fallback = ~fired.any(axis=1) if plan.fallback else np.zeros(len(fired), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.fired)
+
+    def conclusions(self, i: int) -> List[str]:
+        out = []
+        row = self.fired[i]
+        for r in np.flatnonzero(row):
+            rule = self.plan.rules[r]
+            if rule["templated"]:
+                values = {k: v[i].item() for k, v in self.values.items()}
+                out.append(rule["then"].format(**values))
+            else:
+                out.append(rule["then"])
+        if self.fallback[i]:
+            out.append(self.plan.fallback)
+        return out
+
+    def rule_counts(self) -> Dict[str, int]:
+        """How many frames each rule fired on."""
+        counts = {rule["id"]: int(c) for rule, c in zip(self.plan.rules, self.fired.sum(axis=0))}
+        if self.plan.fallback:
+            counts["fallback"] = int(self.fallback.sum())
+        return counts
+
+
+class RuleSet:
+    """A RulePlan bound to a file, recompiled when the file's mtime changes."""
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.mtime = None
+        self.plan: Optional[RulePlan] = None
+        self.reloads = 0
+        self._next_check = 0.0
+        self.reload(force=True)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompiles if the file changed; a broken edit keeps the previous plan running."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self.plan is None:
+                raise
+            print(f"[REASONING] Rule file unavailable, keeping current rules: {e}")
+            return False
+        if not force and mtime == self.mtime:
+            return False
+        try:
+            plan = RulePlan(load_rule_file(self.path))
+        except (RuleError, ValueError, KeyError, TypeError) as e:
+            if self.plan is None:
+                raise
+            print(f"[REASONING] Rule reload failed, keeping current rules: {e}")
+            self.mtime = mtime
+            return False
+        self.plan, self.mtime = plan, mtime
+        self.reloads += 1
+        if not force:
+            print(f"[REASONING] Reloaded {len(plan.rules)} rules from {self.path}")
+        return True
+
+    def current(self, now: float) -> RulePlan:
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.reload()
+        return self.plan
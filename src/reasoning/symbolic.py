@@ -1,53 +1,122 @@
 from ..schema import PerceptionState, ReasoningState
+from .rules import DEFAULT_RULES_PATH, BatchConclusions, RuleSet
+from .belief import HazardBelief, observation_from_conclusions, observations
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import time
+
+
+def _action_for(conclusion: str) -> str:
+    return "STOP" if "CRITICAL" in conclusion else "CONTINUE"
+
+
+def _fired_any(rules: BatchConclusions, keyword: str) -> np.ndarray:
+    """Per frame: did any conclusion containing keyword fire (fallback included)."""
+    plan = rules.plan
+    cols = np.array([keyword in r["then"] for r in plan.rules], dtype=bool)
+    hit = rules.fired[:, cols].any(axis=1) if cols.any() else np.zeros(len(rules), dtype=bool)
+    if plan.fallback and keyword in plan.fallback:
+        hit = hit | rules.fallback
+    return hit
+
+
+class BatchReasoning:
+    """
+    Reasoning over many frames at once, kept columnar: safety_score, belief
+    (n, states) and stop are arrays; conclusions / suggested actions
+    are materialized per frame on demand.
+    """
+
+    def __init__(self, rules: BatchConclusions, belief: np.ndarray, safety_score: np.ndarray, stop: np.ndarray):
+        self.rules = rules
+        self.belief = belief
+        self.safety_score = safety_score
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def conclusions(self, i: int) -> List[str]:
+        return self.rules.conclusions(i)
+
+    def suggested_actions(self, i: int) -> List[str]:
+        return [_action_for(c) for c in self.conclusions(i)]
+
 
 class ReasoningEngine:
-    def __init__(self):
-        self.rules = [
-            {"condition": "proximity < 5", "then": "Caution: Collision Risk"},
-            {"condition": "vibration > 0.8", "then": "Warning: Mechanical Stress"},
-            {"condition": "obstacle_count > 0", "then": "Notice: Path Obstructed"}
-        ]
+    def __init__(self, rules_path: str = DEFAULT_RULES_PATH, reload_interval: float = 1.0):
+        """
+        rules_path: JSON (or YAML) rule set, compiled once and hot-reloaded when the file changes
+        reload_interval: seconds between checks of the rule file's mtime
+        """
+        self.ruleset = RuleSet(rules_path, check_interval=reload_interval)
+        # Hazard belief carried across ticks; reset when the operator clears a safety pause
+        self.belief = HazardBelief()
+
+    @property
+    def rules(self) -> List[dict]:
+        return self.ruleset.plan.spec.get("rules", [])
 
     def reason(self, perception: PerceptionState) -> ReasoningState:
-        conclusions = []
-        
-        # Simple logical rules
-        proximity = perception.sensor_data.get("proximity", 100)
-        vibration = perception.sensor_data.get("vibration", 0)
-        
-        # Treat specific real-world objects as critical obstacles
-        CRITICAL_LABELS = ['person', 'obstacle']
-        CAUTION_LABELS = ['cell phone', 'scissors', 'backpack']
-        
-        obstacle_count = len([e for e in perception.entities if e.label in CRITICAL_LABELS])
-        caution_count = len([e for e in perception.entities if e.label in CAUTION_LABELS])
-
-        if proximity < 5 or obstacle_count > 0:
-            conclusions.append(f"CRITICAL: Emergency Stop - {obstacle_count} high-risk entities detected")
-        elif proximity < 15 or caution_count > 0:
-            conclusions.append(f"CAUTION: Potential risk - {caution_count} objects detected")
-
-        if vibration > 0.85:
-            conclusions.append("ALERT: High vibration detected - Maintenance required")
-
-        if obstacle_count > 0:
-            conclusions.append(f"OBSERVATION: {obstacle_count} obstacle(s) in vision")
-
-        if not conclusions:
-            conclusions.append("STATUS: Nominal operations")
-
-        # Mock probabilistic model
-        prob_model = {
-            "safety_prob": 0.99 if not perception.anomalies_detected else 0.4,
-            "efficiency_prob": 0.85
-        }
+        plan = self.ruleset.current(time.monotonic())
+
+        # Thresholds, label lists (e.g. person/obstacle as critical) and their
+        # precedence all live in the rule file; one pass over the entities.
+        # Rolling features (vibration_slope_60, ...) and anomaly_score are variables like any sensor
+        variables = {**perception.sensor_data, **perception.features, "anomaly_score": perception.anomaly_score}
+        conclusions, _ = plan.evaluate(variables, perception.entities)
+
+        # Fold this tick's evidence into the hazard belief; safety is its expectation
+        self.belief.update(observation_from_conclusions(conclusions, perception.anomalies_detected))
+        prob_model = self.belief.world_model()
 
         return ReasoningState(
             timestamp=datetime.now(),
             logic_conclusions=conclusions,
             probabilistic_world_model=prob_model,
-            suggested_actions=["STOP" if "CRITICAL" in c else "CONTINUE" for c in conclusions],
+            suggested_actions=[_action_for(c) for c in conclusions],
             safety_score=prob_model["safety_prob"]
         )
+
+    def reason_batch(self, sensors: Dict[str, np.ndarray], label_counts: Dict[str, np.ndarray],
+                     anomalies: Optional[np.ndarray] = None) -> BatchReasoning:
+        """
+        Runs the current rules over recorded frames given as columns:
+        sensors: sensor / feature name -> per-frame values (NaN = reading missing)
+        label_counts: entity label -> per-frame count of entities with that label
+        anomalies: per-frame anomalies_detected flags
+        Results match reason() frame by frame, the hazard belief filtered from a
+        fresh prior over the frames in order (the live belief is left untouched).
+        """
+        columns = list(sensors.values()) + list(label_counts.values())
+        if anomalies is not None:
+            columns.append(anomalies)
+        n = len(columns[0]) if columns else 0
+        rules = self.ruleset.current(time.monotonic()).evaluate_batch(sensors, label_counts, n)
+        anomalies = np.zeros(n, dtype=bool) if anomalies is None else np.asarray(anomalies, dtype=bool)
+        critical = _fired_any(rules, "CRITICAL")
+        risk = np.where(critical, 2, np.where(_fired_any(rules, "CAUTION"), 1, 0))
+        obs = observations(risk, _fired_any(rules, "ALERT"), anomalies)
+        # The recursion is inherently sequential, but each step is a constant 3x3 update
+        belief, safety = HazardBelief(self.belief.transition, self.belief.prior).run(obs)
+        return BatchReasoning(rules, belief, safety, critical)
+
+    @staticmethod
+    def columnar(perceptions: Iterable[PerceptionState]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        """Converts recorded PerceptionStates into reason_batch() columns."""
+        perceptions = list(perceptions)
+        n = len(perceptions)
+        sensors: Dict[str, np.ndarray] = {}
+        labels: Dict[str, np.ndarray] = {}
+        for i, p in enumerate(perceptions):
+            for k, v in {**p.sensor_data, **p.features, "anomaly_score": p.anomaly_score}.items():
+                if k not in sensors:
+                    sensors[k] = np.full(n, np.nan)
+                sensors[k][i] = v
+            for e in p.entities:
+                if e.label not in labels:
+                    labels[e.label] = np.zeros(n, dtype=np.int64)
+                labels[e.label][i] += 1
+        anomalies = np.array([p.anomalies_detected for p in perceptions], dtype=bool)
+        return sensors, labels, anomalies
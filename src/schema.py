@@ -13,7 +13,9 @@ class PerceptionState(BaseModel):
     timestamp: datetime
     entities: List[Entity]
     sensor_data: Dict[str, float] = {}
+    features: Dict[str, float] = {} # rolling sensor statistics, e.g. vibration_slope_60
     anomalies_detected: bool = False
+    anomaly_score: float = 0.0 # streaming detector score for this tick (scale depends on the detector)
 
 class ReasoningState(BaseModel):
     timestamp: datetime
@@ -38,3 +40,5 @@ class RA3FullState(BaseModel):
     current_position: List[float] = [0.0, 0.0]
     goal_position: List[float] = [10.0, 10.0]
     scene_description: str = ""
+    planner_stats: Dict[str, Any] = {}
+    perception_stats: Dict[str, Any] = {}
@@ -0,0 +1,88 @@
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from src.perception.anomaly import AnomalyDetector, AnomalyStage, ZScoreDetector, create_anomaly_detector
+from src.reasoning.symbolic import ReasoningEngine
+from src.schema import PerceptionState
+
+
+def _frame(temperature, vibration):
+    return PerceptionState(timestamp=datetime.now(), entities=[],
+                           sensor_data={"temperature": temperature, "vibration": vibration})
+
+
+def _calm(rng):
+    return _frame(rng.uniform(24, 26), rng.uniform(0.1, 0.3))
+
+
+def test_spike_flagged_after_warmup():
+    rng = random.Random(0)
+    stage = AnomalyStage(ZScoreDetector(warmup=30))
+    for _ in range(200):
+        assert not stage.process(_calm(rng)).anomalies_detected
+    spike = stage.process(_frame(45.0, 1.8))
+    assert spike.anomalies_detected and spike.anomaly_score > 4.0
+    assert stage.stats()["flagged"] == 1
+
+
+def test_warmup_gates_flags():
+    rng = random.Random(1)
+    stage = AnomalyStage(ZScoreDetector(warmup=30))
+    for _ in range(5):
+        stage.process(_calm(rng))
+    # Far outside the baseline, but too few ticks seen to trust the statistics yet
+    early = stage.process(_frame(45.0, 1.8))
+    assert early.anomaly_score > 4.0 and not early.anomalies_detected
+
+
+def test_source_flag_is_kept():
+    stage = AnomalyStage(ZScoreDetector())
+    frame = _frame(25.0, 0.2)
+    frame.anomalies_detected = True
+    assert stage.process(frame).anomalies_detected
+
+
+def test_nan_reading_is_not_learned():
+    rng = random.Random(2)
+    detector = ZScoreDetector(warmup=30)
+    stage = AnomalyStage(detector)
+    for _ in range(100):
+        stage.process(_calm(rng))
+    stage.process(_frame(float("nan"), float("inf")))
+    assert all(v == v and abs(v) != float("inf") for v in detector.mean.values())
+    assert all(v == v and abs(v) != float("inf") for v in detector.var.values())
+    # Statistics still work afterwards: calm stays calm, spikes still flag
+    assert not stage.process(_frame(25.0, 0.2)).anomalies_detected
+    assert stage.process(_frame(45.0, 1.8)).anomalies_detected
+
+
+def test_none_disables_stage():
+    assert create_anomaly_detector("none") is None
+
+
+def test_anomaly_score_reaches_reasoning(tmp_path):
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"rules": [
+        {"id": "anomaly", "when": "anomaly_score > 4", "then": "CAUTION: Sensor anomaly (score {anomaly_score})"},
+    ]}))
+    engine = ReasoningEngine(rules_path=str(rules))
+    rng = random.Random(3)
+    stage = AnomalyStage(ZScoreDetector())
+    for _ in range(100):
+        calm = engine.reason(stage.process(_calm(rng)))
+    assert calm.logic_conclusions == []
+    spiked = engine.reason(stage.process(_frame(45.0, 1.8)))
+    assert any(c.startswith("CAUTION: Sensor anomaly") for c in spiked.logic_conclusions)
+    # The anomaly flag is also evidence for the hazard belief
+    assert spiked.safety_score < calm.safety_score
+
+
+def test_detector_requires_score():
+    class Incomplete(AnomalyDetector):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,54 @@
+import random
+
+import numpy as np
+
+from src.perception.features import FeatureStore
+
+
+def _brute(xs, ts, w):
+    x, t = np.array(xs[-w:]), np.array(ts[-w:])
+    out = {"mean": x.mean(), "min": x.min(), "max": x.max()}
+    if len(x) >= 2:
+        out["std"] = x.std(ddof=1)
+        out["slope"] = np.polyfit(np.arange(len(x)), x, 1)[0] * (len(x) - 1) / (t[-1] - t[0])
+    return out
+
+
+def test_rolling_stats_match_recomputation():
+    rng = random.Random(0)
+    store = FeatureStore(windows=(3, 10))
+    xs, ts, t = [], [], 1000.0
+    for i in range(250):
+        t += rng.uniform(0.5, 1.5)
+        x = 25.0 + 0.01 * i + rng.gauss(0, 0.3)
+        xs.append(x)
+        ts.append(t)
+        features = store.update({"temperature": x}, t)
+        for w in (3, 10):
+            for stat, expected in _brute(xs, ts, w).items():
+                assert abs(features[f"temperature_{stat}_{w}"] - expected) < 1e-9, (i, w, stat)
+    # EWMA with span 10 tracks the upward drift
+    assert features["temperature_ewma_10"] > features["temperature_mean_3"] - 1.0
+    assert features["temperature_slope_10"] > 0
+
+
+def test_missing_and_nan_readings_keep_windows():
+    store = FeatureStore(windows=(4,), sensors=["vibration"])
+    store.update({"vibration": 0.2, "temperature": 30.0}, 0.0)
+    features = store.update({"vibration": float("nan")}, 1.0)
+    assert features == {"vibration_mean_4": 0.2, "vibration_min_4": 0.2, "vibration_max_4": 0.2,
+                        "vibration_ewma_4": 0.2}
+    features = store.update({"vibration": 0.6}, 2.0)
+    assert abs(features["vibration_slope_4"] - 0.2) < 1e-12
+
+
+if __name__ == "__main__":
+    import time
+    test_rolling_stats_match_recomputation()
+    test_missing_and_nan_readings_keep_windows()
+    store = FeatureStore(windows=(10, 60, 600))
+    n = 100_000
+    started = time.perf_counter()
+    for i in range(n):
+        store.update({"temperature": 25.0, "vibration": random.random(), "proximity": 20.0}, float(i))
+    print(f"Feature store: {(time.perf_counter() - started) / n * 1e6:.1f} us/tick for 3 sensors x 3 windows")
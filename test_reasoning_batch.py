@@ -0,0 +1,106 @@
+import json
+import random
+import time
+from datetime import datetime
+
+import numpy as np
+
+from src.reasoning.symbolic import ReasoningEngine
+from src.schema import Entity, PerceptionState
+
+LABELS = ["person", "obstacle", "cell phone", "scissors", "backpack", "car", "dog", "vehicle"]
+
+
+def _random_frames(n, seed=0):
+    """Perception frames that hit every threshold edge, missing readings included."""
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(n):
+        sensors = {}
+        if rng.random() < 0.9:
+            sensors["proximity"] = rng.choice([rng.uniform(0, 30), 5.0, 15.0, 4.999, 15.001])
+        if rng.random() < 0.9:
+            sensors["vibration"] = rng.choice([rng.uniform(0, 1), 0.85, 0.851])
+        if rng.random() < 0.3:
+            sensors["temperature"] = rng.uniform(20, 35)
+        entities = [Entity(id=f"e{i}", label=rng.choice(LABELS), confidence=0.9)
+                    for i in range(rng.randint(0, 6))]
+        frames.append(PerceptionState(timestamp=datetime.now(), entities=entities, sensor_data=sensors,
+                                      anomalies_detected=rng.random() < 0.3))
+    return frames
+
+
+def test_batch_matches_per_frame():
+    engine = ReasoningEngine()
+    frames = _random_frames(5000)
+    batch = engine.reason_batch(*ReasoningEngine.columnar(frames))
+    assert len(batch) == len(frames)
+    # reason() carries the hazard belief across ticks, so replay the frames in order on a fresh engine
+    for i, frame in enumerate(frames):
+        single = engine.reason(frame)
+        assert batch.conclusions(i) == single.logic_conclusions, i
+        assert batch.suggested_actions(i) == single.suggested_actions, i
+        assert abs(batch.safety_score[i] - single.safety_score) < 1e-9, i
+        belief = [single.probabilistic_world_model[k] for k in ("p_safe", "p_caution", "p_hazard")]
+        assert np.allclose(batch.belief[i], belief, rtol=0, atol=1e-9), i
+        assert bool(batch.stop[i]) == ("STOP" in single.suggested_actions), i
+
+
+def test_belief_smooths_flicker():
+    engine = ReasoningEngine()
+    calm = PerceptionState(timestamp=datetime.now(), entities=[], sensor_data={"proximity": 50.0})
+    hazard = PerceptionState(timestamp=datetime.now(), entities=[Entity(id="p", label="person", confidence=0.9)],
+                             sensor_data={"proximity": 50.0})
+    for _ in range(20):
+        nominal = engine.reason(calm).safety_score
+    flicker = engine.reason(hazard).safety_score
+    assert nominal > 0.9
+    # One CRITICAL frame lowers safety but does not collapse it; a sustained hazard does
+    assert 0.5 < flicker < nominal
+    sustained = engine.reason(hazard).safety_score
+    assert sustained < 0.5
+    recovered = [engine.reason(calm).safety_score for _ in range(30)][-1]
+    assert recovered > 0.9
+
+
+def test_batch_handles_empty_columns():
+    engine = ReasoningEngine()
+    batch = engine.reason_batch({"proximity": np.array([50.0, 3.0])}, {})
+    assert batch.conclusions(0) == ["STATUS: Nominal operations"]
+    assert batch.conclusions(1) == ["CRITICAL: Emergency Stop - 0 high-risk entities detected"]
+    assert batch.stop.tolist() == [False, True]
+
+
+def test_nan_reading_uses_default_in_both_paths(tmp_path):
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"defaults": {"proximity": 100}, "rules": [
+        {"id": "clear", "when": "proximity > 50", "then": "STATUS: Clear ahead ({proximity} m)"},
+        {"id": "hot", "when": {"not": "temperature < 40"}, "then": "ALERT: Temperature {temperature}"},
+    ]}))
+    engine = ReasoningEngine(rules_path=str(rules))
+    nan = float("nan")
+    frames = [PerceptionState(timestamp=datetime.now(), entities=[], sensor_data=sensors)
+              for sensors in ({"proximity": nan, "temperature": 20.0}, {"proximity": 10.0, "temperature": nan}, {})]
+    batch = engine.reason_batch(*ReasoningEngine.columnar(frames))
+    # NaN behaves like an absent reading: the default applies, and without one every comparison is False
+    expected = [["STATUS: Clear ahead (100.0 m)"], ["ALERT: Temperature nan"],
+                ["STATUS: Clear ahead (100.0 m)", "ALERT: Temperature nan"]]
+    for i, frame in enumerate(frames):
+        assert engine.reason(frame).logic_conclusions == expected[i], i
+        assert batch.conclusions(i) == expected[i], i
+
+if __name__ == "__main__":
+    test_batch_matches_per_frame()
+    test_batch_handles_empty_columns()
+    test_belief_smooths_flicker()
+    print("Batch reasoning matches per-frame reasoning.")
+
+    # Replay throughput on a synthetic day of telemetry at 10 Hz
+    n = 864_000
+    rng = np.random.default_rng(0)
+    sensors = {"proximity": rng.uniform(0, 50, n), "vibration": rng.uniform(0, 1, n)}
+    labels = {label: rng.poisson(0.2, n) for label in LABELS}
+    anomalies = rng.random(n) < 0.1
+    started = time.perf_counter()
+    batch = ReasoningEngine().reason_batch(sensors, labels, anomalies)
+    print(f"{n} frames in {time.perf_counter() - started:.2f}s: {batch.rules.rule_counts()}")
@@ -0,0 +1,44 @@
+import json
+import os
+
+import pytest
+
+from src.reasoning.rules import RuleError, RulePlan, RuleSet
+from src.schema import Entity
+
+BASE = {
+    "defaults": {"vibration": 0},
+    "counters": {"obstacle_count": ["person"]},
+    "rules": [{"id": "busy", "when": "obstacle_count > 0", "then": "CAUTION: {obstacle_count} people"}],
+}
+
+
+def _rule(then, when="temperature > 40"):
+    return {**BASE, "rules": [{"id": "hot", "when": when, "then": then}]}
+
+
+def test_templates_checked_at_compile_time():
+    RulePlan(_rule("ALERT: {temperature:.1f} C, vibration {vibration}, {obstacle_count} people"))
+    for then in ("ALERT: {temprature}", "ALERT: {}", "ALERT: {0}", "ALERT: {temperature", "ALERT: {temperature:q}",
+                 "ALERT: {temperature.real}"):
+        with pytest.raises(RuleError):
+            RulePlan(_rule(then))
+
+
+def test_missing_condition_variable_formats_as_nan():
+    plan = RulePlan(_rule("NOTE: temperature {temperature}", when={"not": "temperature > 40"}))
+    assert plan.evaluate({}, [])[0] == ["NOTE: temperature nan"]
+    batch = plan.evaluate_batch({}, {}, 1)
+    assert batch.conclusions(0) == ["NOTE: temperature nan"]
+
+
+def test_reload_rejects_bad_template(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(BASE))
+    rules = RuleSet(str(path))
+    path.write_text(json.dumps(_rule("ALERT: {temprature}")))
+    os.utime(path, ns=(0, rules.mtime + 1_000_000))
+    assert not rules.reload()
+    # The previous plan keeps running and still formats its own template
+    conclusions, _ = rules.plan.evaluate({}, [Entity(id="e0", label="person", confidence=0.9)])
+    assert conclusions == ["CAUTION: 1 people"]
@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Modules sim mode must never load (torch via ultralytics, OpenCV, TTS, ROS2, ONNX Runtime)
+HEAVY_MODULES = ["torch", "ultralytics", "cv2", "pyttsx3", "rclpy", "onnxruntime"]
+
+# Seconds for a cold import of the sim-mode API (override with RA3_STARTUP_BUDGET)
+STARTUP_BUDGET = float(os.getenv("RA3_STARTUP_BUDGET", "5.0"))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import src.api.server as server
+elapsed = time.perf_counter() - started
+server.agent.shutdown()
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _probe_startup():
+    """Imports the API in a fresh interpreter (sim mode, throwaway working dir) and reports timing."""
+    env = dict(os.environ, RA3_MODE="sim", PYTHONPATH=ROOT)
+    env.pop("RA3_VOICE", None)
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", PROBE], cwd=cwd, env=env,
+                             capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_sim_startup_skips_heavy_backends():
+    result = _probe_startup()
+    assert result["loaded"] == [], f"sim mode imported {result['loaded']}"
+
+
+def test_sim_startup_budget():
+    result = _probe_startup()
+    assert result["elapsed"] < STARTUP_BUDGET, f"sim API import took {result['elapsed']:.2f}s (budget {STARTUP_BUDGET}s)"
+
+
+if __name__ == "__main__":
+    result = _probe_startup()
+    print(f"Sim API startup: {result['elapsed']:.2f}s (budget {STARTUP_BUDGET}s), heavy modules loaded: {result['loaded']}")
@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.perception.tracker import Tracker, assign
+
+PERSON = ("person", 0.9, [100.0, 100.0, 200.0, 300.0])
+
+
+def _visible(tracker, t):
+    return [e.label for e in tracker.entities(t)]
+
+
+def test_person_persists_at_low_inference_rate():
+    # CPU-only host: one inference every 2 s (0.5 FPS), perception polled at 10 Hz in between
+    tracker = Tracker()
+    t = 0.0
+    for cycle in range(10):
+        tracker.update([PERSON], t, "cam0")
+        for step in range(20):
+            assert _visible(tracker, t + step * 0.1) == ["person"], (cycle, step)
+        t += 2.0
+    assert len({e.id for e in tracker.entities(t - 2.0)}) == 1
+
+
+def test_track_expires_after_missed_cycles():
+    tracker = Tracker(max_missed=2)
+    tracker.update([PERSON], 0.0, "cam0")
+    tracker.update([PERSON], 2.0, "cam0")
+    tracker.update([], 4.0, "cam0")
+    tracker.update([], 6.0, "cam0")
+    assert _visible(tracker, 6.0) == ["person"]
+    tracker.update([], 8.0, "cam0")
+    assert _visible(tracker, 8.0) == []
+
+
+def test_track_goes_stale_when_inference_stops():
+    tracker = Tracker(max_missed=2)
+    for i in range(5):
+        tracker.update([PERSON], i * 2.0, "cam0")
+    # Measured interval is 2 s: stale after (max_missed + 1) intervals without any update
+    assert _visible(tracker, 8.0 + 5.9) == ["person"]
+    assert _visible(tracker, 8.0 + 6.1) == []
+
+
+def test_fast_detector_keeps_occlusion_tolerance():
+    tracker = Tracker(max_missed=2, min_age=1.0)
+    tracker.update([PERSON], 0.0, "cam0")
+    for i in range(1, 25):
+        tracker.update([], i / 30.0, "cam0")
+    # 24 missed frames at 30 FPS, but still within min_age
+    assert _visible(tracker, 24 / 30.0) == ["person"]
+    tracker.update([PERSON], 25 / 30.0, "cam0")
+    assert len(tracker.tracks) == 1
+
+
+def test_assign_maximizes_total_score():
+    # Greedy would take (0, 0) first and leave row 1 with its 0.1 match
+    score = np.array([[0.9, 0.8], [0.85, 0.1]])
+    assert sorted(assign(score, 0.3)) == [(0, 1), (1, 0)]
+    assert assign(score, 0.82) == [(1, 0)]
+    assert assign(np.zeros((0, 3)), 0.3) == []
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    # The server builds its agent (and mission_history.db) at import time, in the working directory
+    mp = pytest.MonkeyPatch()
+    mp.chdir(tmp_path_factory.mktemp("api"))
+    mp.setenv("RA3_MODE", "sim")
+    from fastapi.testclient import TestClient
+    from src.api import server
+    yield TestClient(server.app)
+    server.agent.shutdown()
+    mp.undo()
+
+
+@pytest.mark.parametrize("path", ["/history", "/history/series"])
+def test_malformed_time_bounds_are_rejected(client, path):
+    r = client.get(path, params={"start": "garbage"})
+    assert r.status_code == 422
+    assert "start" in r.json()["detail"]
+    assert client.get(path, params={"start": "2026-10-17T00:00:00Z", "end": "2026-10-18T00:00:00"}).status_code == 200
@@ -0,0 +1,86 @@
+import asyncio
+
+from src.api.broadcast import ControlLoop, TelemetryHub
+from src.schema import ActionRecommendation
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+def test_full_queue_drops_the_oldest_state():
+    async def scenario():
+        hub = TelemetryHub(queue_size=3)
+        slow, fast = hub.subscribe(), hub.subscribe()
+        for i in range(5):
+            hub.publish(i)
+            fast.get_nowait()
+        return hub, _drain(slow), _drain(fast)
+
+    hub, slow, fast = asyncio.run(scenario())
+    assert slow == [2, 3, 4]
+    assert fast == []
+    assert hub.dropped == 2
+
+
+def test_new_subscriber_starts_from_the_latest_state():
+    async def scenario():
+        hub = TelemetryHub()
+        hub.publish("a")
+        hub.publish("b")
+        q = hub.subscribe()
+        hub.unsubscribe(q)
+        hub.publish("c")
+        return _drain(q), hub.subscribers
+
+    items, subscribers = asyncio.run(scenario())
+    assert items == ["b"]
+    assert not subscribers
+
+
+class _Agent:
+    def __init__(self, step_s=0.0, fail_on=()):
+        self.running = False
+        self.steps = 0
+        self.step_s = step_s
+        self.fail_on = fail_on
+
+    async def run_step(self):
+        self.steps += 1
+        if self.steps in self.fail_on:
+            raise RuntimeError("sensor glitch")
+        await asyncio.sleep(self.step_s)
+        return ActionRecommendation(action_id=str(self.steps), description="", confidence=1.0)
+
+
+def _run_loop(agent, rate_hz, seconds, queue_size=4):
+    async def scenario():
+        hub = TelemetryHub(queue_size=queue_size)
+        q = hub.subscribe()
+        loop = ControlLoop(agent, hub, rate_hz=rate_hz)
+        loop.start()
+        await asyncio.sleep(seconds)
+        await loop.stop()
+        return loop, _drain(q)
+
+    return asyncio.run(scenario())
+
+
+def test_loop_ticks_at_its_rate_without_clients_reading():
+    agent = _Agent()
+    loop, frames = _run_loop(agent, rate_hz=50.0, seconds=0.3, queue_size=2)
+    assert 5 <= loop.ticks <= 17
+    assert len(frames) == 2 and frames[-1].state.action_id == str(agent.steps)
+    stats = loop.stats()
+    assert stats["dropped_frames"] == loop.ticks - 2 and stats["clients"] == 1
+    assert not agent.running
+
+
+def test_loop_survives_step_errors_and_counts_overruns():
+    agent = _Agent(step_s=0.03, fail_on={2})
+    loop, frames = _run_loop(agent, rate_hz=100.0, seconds=0.2)
+    assert loop.ticks >= 3 and loop.overruns >= 1
+    assert "2" not in [f.state.action_id for f in frames]
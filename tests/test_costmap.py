@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from src.decision.costmap import InflationCostmap
+
+
+def _edit(rng, grid):
+    h, w = grid.shape
+    x0, y0 = rng.integers(0, h), rng.integers(0, w)
+    x1, y1 = min(h, x0 + rng.integers(1, 20)), min(w, y0 + rng.integers(1, 20))
+    roll = rng.random()
+    if roll < 0.05:
+        grid[:] = 1
+    elif roll < 0.35:
+        grid[x0:x1, y0:y1] = rng.random((x1 - x0, y1 - y0)) < 0.5
+    else:
+        grid[x0:x1, y0:y1] = rng.integers(0, 2)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_incremental_matches_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    shape = tuple(rng.integers(5, 50, 2))
+    resolution = float(rng.choice([0.25, 0.5, 1.0]))
+    costmap = InflationCostmap(shape, resolution, inflation_radius=1.5)
+    grid = np.zeros(shape)
+    for _ in range(8):
+        _edit(rng, grid)
+        costmap.update(grid)
+        blocked = grid != 0
+        full = InflationCostmap(shape, resolution, inflation_radius=1.5)
+        np.testing.assert_allclose(costmap.cost, full._cost_of(blocked), rtol=0, atol=1e-12)
+        if blocked.all():
+            continue
+        dist = ndimage.distance_transform_edt(blocked)
+        for cell in zip(*np.nonzero(blocked)):
+            free = costmap.nearest_free(cell)
+            assert not blocked[free], (cell, free)
+            # Any free cell at the minimum distance is a correct answer
+            assert np.hypot(free[0] - cell[0], free[1] - cell[1]) == pytest.approx(dist[cell]), (cell, free)
+        free_cells = np.argwhere(~blocked)[:5]
+        assert all(costmap.nearest_free(tuple(c)) == tuple(c) for c in free_cells)
+
+
+def test_update_only_touches_dirty_window():
+    costmap = InflationCostmap((200, 200), 0.5, inflation_radius=1.5)
+    grid = np.zeros((200, 200))
+    grid[100:104, 100:104] = 1
+    costmap.update(grid)
+    assert costmap.cells_recomputed < 0.05 * grid.size
+    assert not costmap.update(grid)
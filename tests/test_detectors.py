@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src.perception.detectors import Detector, OnnxDetector, create_detector, nms
+
+
+class _Counting(Detector):
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self, frames):
+        self.calls += 1
+        return [[] for _ in frames]
+
+
+def test_detector_requires_detect():
+    class Incomplete(Detector):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        Detector()
+
+
+def test_warmup_runs_the_requested_batches():
+    detector = _Counting()
+    assert detector.warmup(runs=3) >= 0.0
+    assert detector.calls == 3
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_detector("tensorrt")
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]], dtype=float)
+    scores = np.array([0.6, 0.9, 0.5])
+    assert nms(boxes, scores, 0.45).tolist() == [1, 2]
+    assert nms(boxes, scores, 0.9).tolist() == [1, 0, 2]
+
+
+class _FakeSession:
+    """Returns fixed raw YOLOv8 output (N, 4 + classes, anchors) for every frame."""
+
+    def __init__(self, anchors):
+        self.anchors = np.asarray(anchors, dtype=np.float32).T
+        self.batches = []
+
+    def run(self, _, feeds):
+        batch = next(iter(feeds.values()))
+        self.batches.append(batch)
+        return [np.repeat(self.anchors[None], len(batch), axis=0)]
+
+
+def _onnx_detector(anchors, imgsz=64):
+    pytest.importorskip("cv2")
+    detector = OnnxDetector.__new__(OnnxDetector)
+    detector.imgsz, detector.conf, detector.iou = imgsz, 0.25, 0.45
+    detector.session = _FakeSession(anchors)
+    detector.input_name = "images"
+    detector.names = {0: "person", 1: "vehicle"}
+    return detector
+
+
+def test_onnx_postprocessing_maps_boxes_back_to_the_frame():
+    # cx, cy, w, h, score(person), score(vehicle) in 64 px letterboxed input
+    detector = _onnx_detector([
+        [32, 32, 16, 16, 0.9, 0.1],
+        [33, 33, 16, 16, 0.8, 0.1], # suppressed by the first person box
+        [33, 33, 16, 16, 0.1, 0.7], # same place, other class: kept
+        [10, 10, 4, 4, 0.2, 0.1], # below conf
+    ])
+    # 128 x 64 frame: scale 0.5, padded 16 px top and bottom
+    frame = np.zeros((64, 128, 3), dtype=np.uint8)
+    (found,) = detector.detect([frame])
+    assert [(label, round(conf, 2)) for label, conf, _ in found] == [("person", 0.9), ("vehicle", 0.7)]
+    assert found[0][2] == pytest.approx([48, 16, 80, 48])
+    batch = detector.session.batches[0]
+    assert batch.shape == (1, 3, 64, 64) and batch.dtype == np.float32
+
+
+def test_onnx_detect_batches_frames_in_one_run():
+    detector = _onnx_detector([[32, 32, 16, 16, 0.9, 0.1]])
+    frames = [np.zeros((64, 64, 3), dtype=np.uint8)] * 3
+    assert len(detector.detect(frames)) == 3
+    assert len(detector.session.batches) == 1
+    assert detector.detect([]) == []
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.decision.dstar_lite import DStarLite
+from src.decision.search import INF, _dijkstra_grid
+
+
+def _fresh_cost(grid, start, goal, penalty):
+    width = grid.shape[1] + 2
+    flat = lambda c: (c[0] + 1) * width + c[1] + 1
+    return _dijkstra_grid(grid, flat(start), flat(goal), penalty)[1]["path_cost"]
+
+
+def _free_cell(rng, grid):
+    while True:
+        cell = (rng.randrange(grid.shape[0]), rng.randrange(grid.shape[1]))
+        if grid[cell] == 0:
+            return cell
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_replans_match_fresh_search(seed):
+    """Random obstacle edits and start moves: every repaired plan costs what a fresh search finds."""
+    rng = random.Random(seed)
+    nprng = np.random.default_rng(seed)
+    grid = (nprng.random((30, 30)) < 0.15).astype(float)
+    penalty = nprng.random(grid.shape) * 2.0
+    goal = _free_cell(rng, grid)
+    start = _free_cell(rng, grid)
+    planner = DStarLite(grid, start, goal, penalty=penalty)
+    for step in range(60):
+        if step % 3 == 0:
+            # Toggle a few cells and perturb the penalty around them
+            for _ in range(rng.randint(1, 6)):
+                cell = _free_cell(rng, grid) if rng.random() < 0.7 else (rng.randrange(30), rng.randrange(30))
+                if cell != goal:
+                    grid[cell] = 1 - grid[cell]
+                    penalty[max(cell[0] - 1, 0):cell[0] + 2, max(cell[1] - 1, 0):cell[1] + 2] = rng.random() * 2.0
+        # Moves without edits are what used to leave stale keys behind
+        start = _free_cell(rng, grid)
+        planner.update(start, grid, penalty=penalty, version=step)
+        expected = _fresh_cost(grid, start, goal, penalty)
+        got = planner.g.get(start, INF)
+        assert got == pytest.approx(expected, abs=1e-9) or got == expected == INF, (seed, step)
+        path = planner.extract_path()
+        assert (path[0], path[-1]) == (start, goal) if expected < INF else path == []
+
+
+def test_unchanged_version_skips_diff():
+    grid = np.zeros((10, 10))
+    planner = DStarLite(grid, (0, 0), (9, 9), version=1)
+    grid[5, :9] = 1
+    # Same version: the caller promises nothing changed, so the edit is not seen
+    planner.update((0, 0), grid, version=1)
+    assert planner.g[(0, 0)] == pytest.approx(9 * 2 ** 0.5)
+    planner.update((0, 0), grid, version=2)
+    assert planner.g[(0, 0)] > 9 * 2 ** 0.5
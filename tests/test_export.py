@@ -0,0 +1,62 @@
+import itertools
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from src.database import history
+from src.database.export import export_history, main
+from src.database.history import MissionDatabase
+
+STAMPS = ["2026-10-16 23:59:59.500", "2026-10-17 00:00:00.250", "2026-10-17 00:00:01.000", "2026-10-17 12:00:00.000"]
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    stamps = iter(STAMPS)
+    monkeypatch.setattr(history, "_utc_timestamp", lambda: next(stamps))
+    path = str(tmp_path / "history.db")
+    db = MissionDatabase(db_path=path, mission_id="m1")
+    for i in range(len(STAMPS)):
+        db.log_step(0.9, 0.1, ["CAUTION: x"] if i % 2 else [], f"scene {i}")
+    db.close()
+    return path
+
+
+def test_partition_layout_and_schema(db_path, tmp_path):
+    out = tmp_path / "out"
+    result = export_history(db_path, str(out))
+    assert result["rows"] == len(STAMPS)
+    assert sorted(os.path.relpath(f, out) for f in result["files"]) == [
+        os.path.join("mission_id=m1", "date=2026-10-16", "part-0.parquet"),
+        os.path.join("mission_id=m1", "date=2026-10-17", "part-0.parquet"),
+    ]
+    import pyarrow.dataset as ds
+    table = ds.dataset(str(out), format="parquet", partitioning="hive").to_table().sort_by("id")
+    assert table.column("alerts").to_pylist() == [[], ["CAUTION: x"], [], ["CAUTION: x"]]
+    assert table.column("date").to_pylist()[0] == "2026-10-16"
+
+
+def test_arrow_format(db_path, tmp_path):
+    result = export_history(db_path, str(tmp_path / "out"), format="arrow")
+    assert all(f.endswith("part-0.arrow") for f in result["files"])
+    total = sum(pa.ipc.open_file(f).read_all().num_rows for f in result["files"])
+    assert total == len(STAMPS)
+
+
+@pytest.mark.parametrize("start, end, rows", [
+    ("2026-10-17T00:00", None, 3),
+    ("2026-10-17 00:00:00", "2026-10-17T00:00:01", 1),
+    ("2026-10-17T02:00:00+02:00", "2026-10-17T12:00:00Z", 2),
+])
+def test_bounds_are_normalized(db_path, tmp_path, start, end, rows):
+    assert export_history(db_path, str(tmp_path / "out"), start=start, end=end)["rows"] == rows
+
+
+def test_bad_bounds_are_rejected(db_path, tmp_path):
+    with pytest.raises(ValueError):
+        export_history(db_path, str(tmp_path / "out"), start="yesterday")
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "out"), "--db", db_path, "--end", "2026-13-01"])
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,87 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from src.perception.frame_ring import FrameRing
+
+
+@pytest.fixture
+def ring():
+    r = FrameRing((4, 6, 3), slots=4)
+    yield r
+    r.close()
+
+
+def _frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_wraparound_keeps_serving_the_newest_frame(ring):
+    assert ring.acquire_latest() is None
+    for n in range(1, 12):
+        assert ring.write(_frame(n), timestamp=n / 10) == n
+        with ring.acquire_latest() as ref:
+            assert ref.seq == n and ref.timestamp == pytest.approx(n / 10)
+            assert (ref.frame == n).all()
+    assert ring.head == 11
+    assert ring.acquire_latest(after_seq=11) is None
+
+
+def test_pinned_slot_survives_many_writes(ring):
+    ring.write(_frame(1), 0.0)
+    ref = ring.acquire_latest()
+    for n in range(2, 30):
+        ring.write(_frame(n), 0.0)
+    assert (ref.frame == 1).all() and ref.seq == 1
+    assert not ref.frame.flags.writeable
+    ref.release()
+    ref.release() # idempotent
+    for n in range(30, 34):
+        ring.write(_frame(n), 0.0)
+    assert not any(ring._pins(i) for i in range(ring.slots))
+
+
+def test_writer_fails_loudly_when_every_free_slot_is_pinned(ring):
+    refs = []
+    for n in range(1, 4):
+        ring.write(_frame(n), 0.0)
+        refs.append(ring.acquire_latest())
+    # Three pinned slots (one of them the latest) leave the writer one slot, then none
+    ring.write(_frame(4), 0.0)
+    refs.append(ring.acquire_latest())
+    with pytest.raises(RuntimeError):
+        ring.begin_write()
+    refs[0].release()
+    assert ring.write(_frame(5), 0.0) == 5
+
+
+def test_aborted_write_is_never_published(ring):
+    ring.write(_frame(1), 0.0)
+    index, slot = ring.begin_write()
+    slot[:] = 99
+    ring.abort(index)
+    with ring.acquire_latest() as ref:
+        assert ref.seq == 1 and (ref.frame == 1).all()
+
+
+def _read_in_child(spec, out):
+    ring = FrameRing.attach(spec)
+    with ring.acquire_latest() as ref:
+        out.put((ref.seq, int(ref.frame.sum())))
+    ring.close()
+
+
+def test_another_process_reads_the_same_memory():
+    ctx = mp.get_context("spawn")
+    ring = FrameRing((4, 6, 3), slots=4, lock=ctx.Lock())
+    try:
+        ring.write(_frame(7), 1.0)
+        out = ctx.Queue()
+        child = ctx.Process(target=_read_in_child, args=(ring.spec(), out))
+        child.start()
+        assert out.get(timeout=20) == (1, 7 * 4 * 6 * 3)
+        child.join(timeout=20)
+        assert child.exitcode == 0
+    finally:
+        ring.close()
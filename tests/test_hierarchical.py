@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.decision.hierarchical import HierarchicalPathfinder
+from src.decision.search import _dijkstra_grid
+
+START, GOAL = [2.0, 2.0], [125.0, 125.0]
+
+
+def _scattered(seed, **options):
+    """1 m cells, 16-cell clusters, 60 disks over a 128 m square, endpoints kept clear."""
+    rng = np.random.default_rng(seed)
+    pf = HierarchicalPathfinder(resolution=1.0, cluster_size=16, **options)
+    centers = rng.uniform(0, 128, size=(200, 2))
+    far = np.minimum(np.abs(centers - START).max(axis=1), np.abs(centers - GOAL).max(axis=1)) > 8
+    pf.stamp_obstacles(centers[far][:60], rng.uniform(1, 5, size=60))
+    return pf
+
+
+def _flat_cost(pf, start, goal, margin=64):
+    """Optimal cost over one dense grid wide enough to hold any sensible detour."""
+    lo = (-margin, -margin)
+    grid = pf._window(lo, (128 + margin, 128 + margin)).astype(float)
+    width = grid.shape[1] + 2
+    flat = lambda c: (c[0] - lo[0] + 1) * width + c[1] - lo[1] + 1
+    return _dijkstra_grid(grid, flat(pf._to_grid(start)), flat(pf._to_grid(goal)), None)[1]["path_cost"]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_abstract_cost_stays_close_to_flat_optimum(seed):
+    pf = _scattered(seed)
+    path = pf.find_path(START, GOAL)
+    optimal = _flat_cost(pf, START, GOAL)
+    cost = pf.last_search_stats["path_cost"]
+    assert path and pf.last_path_cells[-1] == pf._to_grid(GOAL)
+    assert optimal - 1e-9 <= cost <= 1.15 * optimal
+    assert not any(pf._blocked(c) for c in pf.last_path_cells)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_refined_prefix_is_a_connected_fine_path(seed):
+    pf = _scattered(seed, local_window=10.0)
+    pf.find_path(START, GOAL)
+    cells = pf.last_path_cells
+    steps = [max(abs(a[0] - b[0]), abs(a[1] - b[1])) for a, b in zip(cells, cells[1:])]
+    # Fine cells first, then coarse waypoints once the path leaves the local window
+    fine = next(i for i, s in enumerate(steps) if s > 1)
+    assert fine >= 10 and pf._to_grid(START) == cells[0]
+
+
+def test_short_query_is_planned_at_full_resolution():
+    pf = _scattered(0, local_window=40.0)
+    start, goal = [20.0, 20.0], [45.0, 50.0]
+    pf.find_path(start, goal)
+    assert pf.last_search_stats["path_cost"] == pytest.approx(_flat_cost(pf, start, goal))
+
+
+def test_enclosed_goal_is_unreachable():
+    pf = HierarchicalPathfinder(resolution=1.0, cluster_size=16, max_abstract_expansions=5000)
+    angles = np.linspace(0, 2 * np.pi, 400, endpoint=False)
+    ring = np.stack([100 + 12 * np.cos(angles), 100 + 12 * np.sin(angles)], axis=1)
+    pf.stamp_obstacles(ring, 1.5)
+    assert pf.find_path([0.0, 0.0], [100.0, 100.0]) == []
@@ -0,0 +1,167 @@
+import itertools
+import sqlite3
+import time
+
+import pytest
+
+from src.database import history
+from src.database.history import MissionDatabase
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A database whose rows are stamped one second apart from 2026-10-17 00:00:00 UTC."""
+    ticks = itertools.count()
+    monkeypatch.setattr(history, "_utc_timestamp",
+                        lambda: "2026-10-17 00:%02d:%02d.250" % divmod(next(ticks), 60))
+    database = MissionDatabase(db_path=str(tmp_path / "history.db"), mission_id="m1")
+    yield database
+    database.close()
+
+
+def _log(db, n, alerts=()):
+    for i in range(n):
+        db.log_step(0.5 + i / (2 * n), 0.1, list(alerts), f"scene {i}")
+    assert db.flush()
+
+
+def test_keyset_pagination_walks_every_row_once(db):
+    _log(db, 25)
+    seen, before = [], None
+    while True:
+        page = db.query_history(limit=10, before_id=before)
+        seen += [r["id"] for r in page["rows"]]
+        before = page["next_before_id"]
+        if before is None:
+            break
+    assert seen == list(range(25, 0, -1))
+
+
+def test_filters(db):
+    _log(db, 5, alerts=["CRITICAL: stop"])
+    _log(db, 5, alerts=["CAUTION: slow"])
+    assert len(db.query_history(alert="CAUTION: slow")["rows"]) == 5
+    assert len(db.query_history(alert_prefix="CRIT")["rows"]) == 5
+    assert all(r["safety_score"] >= 0.8 for r in db.query_history(min_safety=0.8)["rows"])
+    assert db.query_history(mission_id="other")["rows"] == []
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("2026-10-17 00:00:05", "2026-10-17 00:00:08", [8, 7, 6]),
+    ("2026-10-17T00:00:05", "2026-10-17T00:00:08", [8, 7, 6]),
+    ("2026-10-17T00:00:05Z", "2026-10-17T02:00:08+02:00", [8, 7, 6]),
+    ("2026-10-17T00:00:05.300", None, [10, 9, 8, 7]),
+])
+def test_time_bounds_accept_iso_8601(db, start, end, expected):
+    _log(db, 10)
+    assert [r["id"] for r in db.query_history(start=start, end=end)["rows"]] == expected
+
+
+def test_malformed_bound_raises(db):
+    with pytest.raises(ValueError):
+        db.query_history(start="garbage")
+
+
+def _count(db):
+    conn = sqlite3.connect(db.db_path)
+    try:
+        return conn.execute("SELECT count(*) FROM mission_logs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_writer_commits_full_batches_without_flush(tmp_path):
+    db = MissionDatabase(db_path=str(tmp_path / "h.db"), batch_size=8, flush_interval=60.0)
+    for i in range(20):
+        db.log_step(0.9, 0.1, [], f"scene {i}")
+    assert _wait_for(lambda: db.rows_written == 16)
+    assert _count(db) == 16
+    db.close()
+    assert _count(db) == 20
+
+
+def test_writer_commits_a_partial_batch_after_flush_interval(tmp_path):
+    db = MissionDatabase(db_path=str(tmp_path / "h.db"), batch_size=1000, flush_interval=0.05)
+    db.log_step(0.9, 0.1, [], "scene")
+    assert _wait_for(lambda: _count(db) == 1)
+    db.close()
+
+
+def test_flush_is_a_barrier_and_close_stops_the_writer(tmp_path):
+    db = MissionDatabase(db_path=str(tmp_path / "h.db"), batch_size=1000, flush_interval=60.0)
+    _log(db, 3)
+    assert _count(db) == 3
+    conn = sqlite3.connect(db.db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    db.close()
+    assert not db.flush()
+    db.close() # idempotent
+
+
+def test_exit_hook_is_registered_once_per_database(tmp_path, monkeypatch):
+    hooks = []
+    monkeypatch.setattr(history.atexit, "register", hooks.append)
+    db = MissionDatabase(db_path=str(tmp_path / "h.db"))
+    db.start()
+    db.close()
+    db.start()
+    assert hooks == [db.close]
+    db.close()
+
+
+def test_rollup_triggers_aggregate_each_resolution(db):
+    # 130 rows at 00:00:00 .. 00:02:09; every tenth one carries two alerts
+    for i in range(130):
+        db.log_step(i / 130, float(i), ["A", "B"] if i % 10 == 0 else [], f"scene {i}")
+    assert db.flush()
+    minutes = db.query_series(start="2026-10-17 00:00:00", end="2026-10-17 00:03:00", resolution=60)["points"]
+    assert [(p["bucket"], p["samples"], p["alert_count"]) for p in minutes] == [
+        ("2026-10-17 00:00:00", 60, 12), ("2026-10-17 00:01:00", 60, 12), ("2026-10-17 00:02:00", 10, 2)]
+    assert minutes[1]["safety_min"] == pytest.approx(60 / 130)
+    assert minutes[1]["safety_max"] == pytest.approx(119 / 130)
+    assert minutes[1]["safety_mean"] == pytest.approx(89.5 / 130)
+    assert [p["last_mae"] for p in minutes] == [59.0, 119.0, 129.0]
+    hours = db.query_series(start="2026-10-17 00:00:00", end="2026-10-17 01:00:00", resolution=3600)["points"]
+    assert [(p["samples"], p["alert_count"]) for p in hours] == [(130, 26)]
+
+
+@pytest.mark.parametrize("max_points, resolution", [(500, 1), (10, 60), (2, 3600)])
+def test_series_picks_the_finest_resolution_within_max_points(db, max_points, resolution):
+    _log(db, 130)
+    series = db.query_series(start="2026-10-17 00:00:00", end="2026-10-17 00:03:00", max_points=max_points)
+    assert series["resolution"] == resolution
+    assert sum(p["samples"] for p in series["points"]) == 130
+
+
+def test_rollups_are_backfilled_for_an_existing_log(db):
+    _log(db, 90)
+    before = db.query_series(start="2026-10-17 00:00:00", end="2026-10-17 00:02:00", resolution=60)
+    db.close()
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("DROP TABLE mission_rollups")
+    conn.commit()
+    conn.close()
+    reopened = MissionDatabase(db_path=db.db_path)
+    after = reopened.query_series(start="2026-10-17 00:00:00", end="2026-10-17 00:02:00", resolution=60)
+    reopened.close()
+    assert after == before
+
+
+def test_prune_keeps_minute_and_hour_rollups(db, monkeypatch):
+    # Retention compares against the real clock, so these rows are years old
+    ticks = itertools.count()
+    monkeypatch.setattr(history, "_utc_timestamp", lambda: "2020-01-01 00:%02d:%02d.250" % divmod(next(ticks), 60))
+    _log(db, 90)
+    assert db.prune(days=1) == 90
+    assert db.query_history()["rows"] == []
+    assert db.query_series(start="2020-01-01 00:00:00", end="2020-01-01 00:02:00", resolution=1)["points"] == []
+    minutes = db.query_series(start="2020-01-01 00:00:00", end="2020-01-01 00:02:00", resolution=60)
+    assert [p["samples"] for p in minutes["points"]] == [60, 30]
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from src.decision.agent import DecisionAgent
+from src.decision.path_cache import PathCache
+from src.schema import ReasoningState
+
+CELLS = [(0, 0), (1, 1), (2, 2), (3, 2), (4, 2)]
+PATH = [[float(x), float(y)] for x, y in CELLS]
+
+
+def _reasoning(*conclusions):
+    return ReasoningState(timestamp=datetime.now(), logic_conclusions=list(conclusions),
+                          probabilistic_world_model={}, suggested_actions=[], safety_score=1.0)
+
+
+def test_lookup_from_any_cell_returns_the_suffix():
+    cache = PathCache()
+    cache.put("g", (4, 2), CELLS, PATH)
+    assert cache.get("g", (0, 0), (4, 2)) == PATH
+    assert cache.get("g", (2, 2), (4, 2)) == PATH[2:]
+    assert cache.get("g", (9, 9), (4, 2)) is None # off the path
+    assert cache.get("other", (2, 2), (4, 2)) is None # grid changed
+    assert cache.stats() == {"cache_hits": 2, "cache_misses": 2, "cache_size": 1}
+
+
+def test_anchored_lookup_returns_waypoints_from_the_current_segment():
+    cache = PathCache()
+    waypoints = [PATH[0], PATH[2], PATH[4]]
+    cache.put("g", (4, 2), CELLS, waypoints, anchors=[0, 2, 4])
+    assert cache.get("g", (0, 0), (4, 2)) == waypoints
+    assert cache.get("g", (1, 1), (4, 2)) == waypoints
+    assert cache.get("g", (2, 2), (4, 2)) == waypoints[1:]
+    assert cache.get("g", (3, 2), (4, 2)) == waypoints[1:]
+    assert cache.get("g", (4, 2), (4, 2)) == waypoints[2:]
+
+
+def test_revisited_cell_keeps_its_first_visit():
+    cache = PathCache()
+    cells = [(0, 0), (1, 0), (0, 0), (0, 1)]
+    cache.put("g", (0, 1), cells, [list(c) for c in cells])
+    assert len(cache.get("g", (0, 0), (0, 1))) == 4
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PathCache(capacity=2)
+    for goal in [(1, 0), (2, 0)]:
+        cache.put("g", goal, [(0, 0), goal], [[0, 0], list(goal)])
+    cache.get("g", (0, 0), (1, 0))
+    cache.put("g", (3, 0), [(0, 0), (3, 0)], [[0, 0], [3, 0]])
+    assert cache.get("g", (0, 0), (2, 0)) is None
+    assert cache.get("g", (0, 0), (1, 0)) is not None
+
+
+def test_agent_replans_only_when_the_grid_changes():
+    agent = DecisionAgent()
+    calm, hazard = _reasoning(), _reasoning("CAUTION: obstacle")
+    agent.decide(calm, [-15.0, -15.0], [15.0, 15.0])
+    agent.decide(calm, agent.current_path[1], [15.0, 15.0])
+    assert agent.path_cache.stats()["cache_hits"] == 1
+    agent.decide(hazard, agent.current_path[0], [15.0, 15.0])
+    stats = agent.planner_stats()
+    assert stats["cache_misses"] == 2 and stats["cache_size"] == 2
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.decision.pathfinding import TacticalPathfinder
+from src.decision.search import INF, astar_grid
+from src.schema import Entity
+
+
+def _disk_reference(pf, center, radius):
+    """Cell-by-cell rasterization of one disk, the loop stamp_obstacles replaced."""
+    grid = np.zeros_like(pf.grid)
+    cx, cy = pf._to_grid(center)
+    r = int(radius / pf.res)
+    for i in range(cx - r, cx + r + 1):
+        for j in range(cy - r, cy + r + 1):
+            if 0 <= i < pf.size and 0 <= j < pf.size and (i - cx) ** 2 + (j - cy) ** 2 <= r ** 2:
+                grid[i, j] = 1
+    return grid
+
+
+@pytest.mark.parametrize("center,radius", [([0.0, 0.0], 2.0), ([-19.5, 19.5], 3.0), ([5.2, -7.9], 0.4), ([30.0, 0.0], 1.0)])
+def test_stamp_matches_per_cell_disk(center, radius):
+    pf = TacticalPathfinder(grid_size=40, resolution=0.5)
+    pf.stamp_obstacles([center], [radius], inflation=0.0)
+    assert np.array_equal(pf.grid, _disk_reference(pf, center, radius))
+
+
+def test_batched_stamp_equals_sequential_stamps():
+    rng = np.random.default_rng(0)
+    centers = rng.uniform(-22, 22, size=(50, 2))
+    radii = rng.uniform(0.0, 3.0, size=50)
+    batched = TacticalPathfinder(robot_radius=0.5)
+    batched.stamp_obstacles(centers, radii)
+    sequential = TacticalPathfinder(robot_radius=0.5)
+    for c, r in zip(centers, radii):
+        sequential.stamp_obstacles([c], [r])
+    assert np.array_equal(batched.grid, sequential.grid)
+
+
+def test_update_obstacles_skips_unplaced_entities_and_bumps_version():
+    pf = TacticalPathfinder()
+    version = pf.grid_version
+    pf.update_obstacles([
+        Entity(id="a", label="vehicle", confidence=0.9, metadata={"position": [0.0, 0.0], "radius": 1.0}),
+        Entity(id="b", label="person", confidence=0.9, metadata={}),
+    ])
+    assert pf.grid_version > version
+    assert np.array_equal(pf.grid, _disk_reference(pf, [0.0, 0.0], 1.0))
+
+
+def _cluttered(seed, **options):
+    rng = np.random.default_rng(seed)
+    pf = TacticalPathfinder(**options)
+    pf.stamp_obstacles(rng.uniform(-20, 20, size=(25, 2)), rng.uniform(0.5, 2.5, size=25))
+    # The reference queries below read the costmap directly, so bring it up to date first
+    pf._sync_costmap()
+    return pf, rng
+
+
+@pytest.mark.parametrize("inflation_radius", [0.0, 1.5])
+def test_multi_goal_sweep_matches_single_queries(inflation_radius):
+    pf, rng = _cluttered(3, inflation_radius=inflation_radius)
+    start = [-18.0, -18.0]
+    goals = rng.uniform(-19, 19, size=(8, 2)).tolist() + [[100.0, 100.0]]
+    costs, paths = pf.find_paths_to_goals(start, goals)
+    for goal, cost, path in zip(goals, costs, paths):
+        s, g = pf._resolve_endpoints(start, goal)
+        cells, stats = astar_grid(pf.grid, s, g, penalty=pf._penalty())
+        assert cost == pytest.approx(stats["path_cost"] * pf.res)
+        if cost < INF:
+            assert path[0] == pf._to_coord(s) and path[-1] == pf._to_coord(g)
+
+
+def test_plan_many_matches_sequential_planning():
+    pf, rng = _cluttered(4, inflation_radius=1.5)
+    pairs = [(rng.uniform(-19, 19, 2).tolist(), rng.uniform(-19, 19, 2).tolist()) for _ in range(12)]
+    expected = []
+    for start, goal in pairs:
+        s, g = pf._resolve_endpoints(start, goal)
+        cells, _ = astar_grid(pf.grid, s, g, penalty=pf._penalty())
+        expected.append([pf._to_coord(c) for c in cells])
+    assert pf.plan_many(pairs, processes=2) == expected
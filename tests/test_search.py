@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from src.decision.costmap import InflationCostmap
+from src.decision.search import INF, _dijkstra_grid, astar_grid, segment_cost, theta_star_grid
+
+
+def _costmap_penalty(grid, weight=4.0):
+    costmap = InflationCostmap(grid.shape, 1.0, 1.5)
+    costmap.update(grid)
+    return costmap.cost * weight
+
+
+def _dijkstra_cost(grid, start, goal, penalty=None):
+    width = grid.shape[1] + 2
+    flat = lambda c: (c[0] + 1) * width + c[1] + 1
+    return _dijkstra_grid(grid, flat(start), flat(goal), penalty)[1]["path_cost"]
+
+
+def _polyline_cost(grid, penalty, waypoints):
+    blocked = np.ascontiguousarray(grid != 0, dtype=np.uint8).tobytes()
+    pen = penalty.ravel().tolist()
+    return sum(segment_cost(blocked, pen, grid.shape[1], a, b) for a, b in zip(waypoints, waypoints[1:]))
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("budget", [10**9, 50])
+def test_astar_is_optimal_with_and_without_fallback(seed, budget):
+    """A* (and its Dijkstra hand-off past the budget) returns a valid path of the optimal cost."""
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((40, 40)) < 0.25).astype(float)
+    start, goal = (int(rng.integers(40)), int(rng.integers(40))), (int(rng.integers(40)), int(rng.integers(40)))
+    grid[start] = grid[goal] = 0
+    penalty = rng.random(grid.shape) if seed % 2 else None
+    path, stats = astar_grid(grid, start, goal, penalty=penalty, budget=budget)
+    expected = _dijkstra_cost(grid, start, goal, penalty)
+    assert stats["path_cost"] == pytest.approx(expected)
+    if expected == INF:
+        assert path == []
+        return
+    assert path[0] == start and path[-1] == goal
+    assert all(grid[c] == 0 for c in path)
+    assert all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(path, path[1:]))
+    if budget == 50 and stats["nodes_expanded"] > 51:
+        assert stats["engine"] == "dijkstra"
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_penalized_theta_star_is_consistent_and_no_worse_than_grid(seed):
+    """The reported cost is the penalized cost of the returned segments, and never above grid A*."""
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((60, 60)) < 0.1).astype(float)
+    grid[0, 0] = grid[-1, -1] = 0
+    penalty = _costmap_penalty(grid)
+    path, stats = theta_star_grid(grid, (0, 0), (59, 59), penalty=penalty)
+    _, grid_stats = astar_grid(grid, (0, 0), (59, 59), penalty=penalty)
+    if grid_stats["path_cost"] == INF:
+        assert path == []
+        return
+    assert path[0] == (0, 0) and path[-1] == (59, 59)
+    assert stats["path_cost"] == pytest.approx(_polyline_cost(grid, penalty, path))
+    assert stats["path_cost"] <= grid_stats["path_cost"] + 1e-9
+
+
+def test_penalty_keeps_segments_clear_of_the_inflation_halo():
+    """A straight segment grazing a pillar's halo loses to a detour once the penalty counts."""
+    grid = np.zeros((30, 30))
+    grid[12:18, 14:16] = 1
+    penalty = _costmap_penalty(grid, weight=20.0)
+    plain, _ = theta_star_grid(grid, (15, 2), (15, 27))
+    weighted, _ = theta_star_grid(grid, (15, 2), (15, 27), penalty=penalty)
+    zero = np.zeros_like(penalty)
+    plain_length = _polyline_cost(grid, zero, plain)
+    assert _polyline_cost(grid, penalty, weighted) < _polyline_cost(grid, penalty, plain)
+    assert _polyline_cost(grid, zero, weighted) >= plain_length
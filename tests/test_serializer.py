@@ -0,0 +1,75 @@
+import copy
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.api.serializer import DeltaEncoder, EncodedState, merge_patch
+from src.schema import ActionRecommendation
+
+
+def _apply(target, patch):
+    """Client side of RFC 7386."""
+    out = copy.deepcopy(target)
+    for key, value in patch.items():
+        if value is None:
+            out.pop(key, None)
+        elif isinstance(value, dict) and isinstance(out.get(key), dict):
+            out[key] = _apply(out[key], value)
+        else:
+            out[key] = value
+    return out
+
+
+OLD = {"pos": {"x": 1.0, "y": 2.0}, "alerts": ["a"], "mode": "sim", "score": 0.9, "meta": {"k": 1}}
+NEW = {"pos": {"x": 1.5, "y": 2.0}, "alerts": ["a", "b"], "mode": "sim", "meta": {}, "extra": {"z": [1]}}
+
+
+def test_merge_patch_round_trip():
+    patch = merge_patch(OLD, NEW)
+    assert patch == {"pos": {"x": 1.5}, "alerts": ["a", "b"], "score": None, "meta": {"k": None}, "extra": {"z": [1]}}
+    assert _apply(OLD, patch) == NEW
+    assert merge_patch(NEW, NEW) == {}
+
+
+def _frame(i, params):
+    rec = ActionRecommendation(action_id=f"step-{i}", description="nav", confidence=1.0, parameters=params)
+    return EncodedState(rec)
+
+
+def _client(encoder, frames):
+    """Decodes frames as the dashboard does, returning (types, reconstructed states)."""
+    state, types, states = None, [], []
+    for frame in frames:
+        msg = json.loads(encoder.encode(frame))
+        types.append(msg["type"])
+        state = msg["state"] if msg["type"] == "keyframe" else _apply(state, msg["patch"])
+        states.append(state)
+    return types, states
+
+
+def test_delta_stream_reconstructs_every_state():
+    frames = [_frame(i, {"vx": 0.1 * (i % 3), "vy": 0.5, "path": list(range(i % 4))}) for i in range(10)]
+    types, states = _client(DeltaEncoder(keyframe_interval=4), frames)
+    assert types == ["keyframe", "delta", "delta", "delta"] * 2 + ["keyframe", "delta"]
+    assert states == [f.data() for f in frames]
+
+
+def test_field_becoming_null_is_sent_as_keyframe():
+    frames = [_frame(0, {"target": [1, 2]}), _frame(1, {"target": None}), _frame(2, {"target": None})]
+    types, states = _client(DeltaEncoder(), frames)
+    assert types == ["keyframe", "keyframe", "delta"]
+    assert states[1]["parameters"] == {"target": None}
+
+
+def test_keyframe_embeds_the_shared_encoding():
+    frame = EncodedState(ActionRecommendation(action_id="x", description="", confidence=0.5,
+                                              parameters={"at": datetime(2026, 1, 2, tzinfo=timezone.utc)}))
+    body = DeltaEncoder().encode(frame)
+    assert frame.json() in body
+    assert json.loads(body)["state"]["parameters"]["at"] == "2026-01-02T00:00:00Z"
+
+
+def test_keyframe_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        DeltaEncoder(keyframe_interval=0)
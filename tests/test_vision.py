@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from src.perception import detectors
+from src.perception.detectors import Detector
+from src.perception.vision import VisionEngine
+
+
+class _SlowDetector(Detector):
+    """Records every batch it is given; each call takes `delay` seconds like a CPU model would."""
+
+    calls = []
+
+    def __init__(self, delay=0.05, **_):
+        self.delay = delay
+
+    def detect(self, frames):
+        _SlowDetector.calls.append(len(frames))
+        time.sleep(self.delay)
+        return [[("person", 0.9, [10.0, 10.0, 60.0, 120.0])] for _ in frames]
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Builds VisionEngines on the fake backend; stops them at teardown."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(detectors.BACKENDS, "fake", _SlowDetector)
+    _SlowDetector.calls = []
+    engines = []
+
+    def build(**options):
+        e = VisionEngine(backend="fake", **options)
+        engines.append(e)
+        return e
+
+    yield build
+    for e in engines:
+        e.stop()
+
+
+def _run(e, seconds):
+    e.start()
+    time.sleep(seconds)
+    e.stop()
+
+
+def test_slow_model_skips_to_the_newest_frame(engine):
+    e = engine(source="synthetic:160x120@200", backend_options={"delay": 0.05})
+    _run(e, 0.6)
+    stats = e.stats()
+    assert stats["frames_inferred"] >= 3
+    # Capture is never held back by inference, so most frames are skipped rather than queued
+    assert stats["frames_skipped"] > stats["frames_inferred"]
+    assert stats["latency_ms"] < 200
+
+
+def test_inference_stride_waits_for_new_frames(engine):
+    e = engine(source="synthetic:160x120@100", inference_stride=5, backend_options={"delay": 0.0})
+    seqs = []
+    publish = e._publish
+
+    def record(batch, *args):
+        seqs.extend(seq for _, seq, _, _ in batch)
+        publish(batch, *args)
+
+    e._publish = record
+    _run(e, 0.4)
+    assert len(seqs) >= 2
+    assert all(b - a >= 5 for a, b in zip(seqs, seqs[1:]))
+
+
+def test_cameras_share_one_batched_forward_pass(engine):
+    e = engine(sources={"left": "synthetic:160x120@100", "right": "synthetic:160x120@100"},
+               backend_options={"delay": 0.03}, tracking=False)
+    _run(e, 0.5)
+    assert max(_SlowDetector.calls) == 2
+    # Frames of both cameras go through together instead of one call per camera
+    assert sum(_SlowDetector.calls) > len(_SlowDetector.calls)
+    state = e.get_perception_state({})
+    assert sorted(ent.metadata["camera_id"] for ent in state.entities) == ["left", "right"]
+    assert set(e.stats()["cameras"]) == {"left", "right"}
+
+
+def test_tracked_entities_keep_their_ids_across_batches(engine):
+    e = engine(sources=["synthetic:160x120@100", "synthetic:160x120@100"], backend_options={"delay": 0.01})
+    e.start()
+    time.sleep(0.2)
+    first = {ent.id for ent in e.get_perception_state({}).entities}
+    time.sleep(0.2)
+    e.stop()
+    later = e.get_perception_state({}).entities
+    assert len(first) == 2 and {ent.id for ent in later} == first
+    assert {ent.metadata["camera_id"] for ent in later} == {"cam0", "cam1"}
+
+
+@pytest.mark.parametrize("slots, readers", [(3, 2), (2, 1)])
+def test_ring_needs_a_slot_beyond_every_reader(engine, slots, readers):
+    with pytest.raises(ValueError):
+        engine(source="synthetic:160x120", ring_slots=slots, ring_readers=readers)
+
+
+def test_frame_ref_is_a_zero_copy_view_of_the_ring(engine):
+    e = engine(source="synthetic:160x120@100", backend_options={"delay": 0.0})
+    e.start()
+    time.sleep(0.2)
+    with e.frame_ref() as ref:
+        assert ref.frame.shape == (120, 160, 3)
+        assert np.shares_memory(ref.frame, e.cameras[0].ring._frames)
+    assert e.latest_frame.base is None
+    assert e.capture_snapshot().endswith(".jpg")